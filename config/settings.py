@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text search lookups (see core/search.py)
     
     # Third-party apps
     'django_cleanup.apps.CleanupConfig',  # Auto-delete old files
@@ -71,12 +72,18 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  
+    # Sampled per-view SQL profiling; outside the rest so their queries count too
+    'media_portfolio.core.middleware.SQLProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # 304s for @conditional_models views, before the page cache or view runs
+    'media_portfolio.core.middleware.ModelConditionalGetMiddleware',
+    # Must stay last: serves cached pages after session/CSRF/auth/messages checks
+    'media_portfolio.core.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -137,6 +144,13 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    # css/theme-<name>.css compiled from core/theme_css.py
+    'media_portfolio.core.finders.ThemeStylesheetFinder',
+]
+THEME_CSS_BUILD_DIR = BASE_DIR / 'build' / 'theme_css'
 
 # Media files
 MEDIA_URL = '/media/'
@@ -185,6 +199,26 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': 21600.0,  # 6 hours
         'args': (os.getenv('DEVTO_USERNAME', ''),),
     },
+    'flush-view-counts': {
+        'task': 'media_portfolio.core.tasks.flush_view_counts',
+        'schedule': float(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 60)),
+    },
+    'rebuild-project-similarity': {
+        'task': 'media_portfolio.projects.tasks.rebuild_project_similarity',
+        'schedule': 86400.0,  # 24 hours; saves refresh incrementally
+    },
+    'train-spam-classifier': {
+        'task': 'media_portfolio.core.tasks.train_spam_classifier',
+        'schedule': 3600.0,  # 1 hour; only rows relabelled since the last run
+    },
+    'score-pending-spam': {
+        'task': 'media_portfolio.core.tasks.score_pending_spam',
+        'schedule': 600.0,  # 10 minutes; new submissions are scored on save
+    },
+    'reconcile-comment-stats': {
+        'task': 'media_portfolio.comments.tasks.reconcile_comment_stats',
+        'schedule': 3600.0,  # 1 hour; writes adjust the rollup incrementally
+    },
 }
 
 # ============================================================================
@@ -204,6 +238,161 @@ CACHES = {
 # Cache timeout in seconds (24 hours)
 CACHE_TTL = 60 * 60 * 24
 
+# Rendered "load more comments" pages (core/comment_fragments.py); comment
+# changes bump a per-object version, so this only bounds memory use
+COMMENT_PAGE_CACHE_TIMEOUT = CACHE_TTL
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+# Hits per client IP on write endpoints ("count/period", period s/m/h/d with
+# an optional multiplier, e.g. "3/10m"); see core/ratelimit.py. Set a limit
+# to None to disable it.
+RATE_LIMITS = {
+    'like': '30/m',
+    'comment': '5/m',
+    'contact': '3/10m',
+    'theme': '20/m',
+}
+
+# Reverse proxies in front of the app that append to X-Forwarded-For. The
+# client address (rate limits, stored comment/like IPs) is the hop that many
+# places from the right; 0 uses REMOTE_ADDR and ignores the header.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))
+
+# ============================================================================
+# SPAM SCORING CONFIGURATION
+# ============================================================================
+
+# Comments and inquiries are scored after saving (core/spam.py); scores at or
+# above the threshold are flagged as spam. Scoring waits until moderators
+# labelled this many spam and legitimate submissions.
+SPAM_AUTO_FLAG_THRESHOLD = float(os.getenv('SPAM_AUTO_FLAG_THRESHOLD', 0.99))
+SPAM_MIN_TRAINING_DOCUMENTS = 20
+
+# ============================================================================
+# VIEW COUNTER CONFIGURATION
+# ============================================================================
+
+# Detail page views are buffered in the cache and written in bulk by the
+# flush-view-counts beat task every VIEW_COUNT_FLUSH_INTERVAL seconds
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 60))
+VIEW_COUNT_MODELS = ('projects.Project', 'media.MediaItem')
+
+# Views are counted once per visitor using a signed Bloom filter cookie
+# (core/seen_filter.py) instead of session keys, so browsing never creates
+# a session
+SEEN_COOKIE_NAME = 'seen'
+SEEN_COOKIE_MAX_AGE = 86400
+SEEN_COOKIE_CAPACITY = 100
+
+# ============================================================================
+# PAGE CACHE CONFIGURATION
+# ============================================================================
+
+# Views decorated with @cache_anonymous_page are cached per URL and theme for
+# anonymous visitors; saving any of PAGE_CACHE_MODELS drops every entry
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', str(not DEBUG)) == 'True'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', 600))
+PAGE_CACHE_MODELS = (
+    'projects.Project',
+    'projects.ProjectComment',
+    'categories.Category',
+    'collections.Collection',
+    'blog.BlogPost',
+    'comments.Comment',
+    'comments.Testimonial',
+    'core.SiteSettings',
+    'media.MediaItem',
+)
+
+# ============================================================================
+# SQL PROFILING
+# ============================================================================
+
+# Fraction of requests whose queries are timed and fingerprinted; results are
+# ranked per view at /admin/sql-profile/
+SQL_PROFILE_SAMPLE_RATE = float(os.getenv('SQL_PROFILE_SAMPLE_RATE', 0.01))
+# Same query shape run this many times in one request is flagged as N+1
+SQL_PROFILE_NPLUSONE_THRESHOLD = int(os.getenv('SQL_PROFILE_NPLUSONE_THRESHOLD', 5))
+# Aggregates expire after this many seconds without a new sample
+SQL_PROFILE_TIMEOUT = 7 * 86400
+
+# ============================================================================
+# CONDITIONAL GET
+# ============================================================================
+
+# Models every page depends on through the base template and context
+# processors; added to each @conditional_models declaration
+CONDITIONAL_GLOBAL_MODELS = (
+    'core.SiteSettings',
+    'projects.Project',
+    'media.MediaItem',
+    'blog.BlogPost',
+)
+
+# ============================================================================
+# GLOBAL TEMPLATE CONTEXT
+# ============================================================================
+
+# Site settings, counts and latest posts are cached until one of these changes
+GLOBAL_CONTEXT_MODELS = (
+    'projects.Project',
+    'media.MediaItem',
+    'blog.BlogPost',
+)
+GLOBAL_CONTEXT_TIMEOUT = 3600
+
+# SiteSettings is cached in each process; seconds between version checks
+SITE_SETTINGS_CHECK_INTERVAL = 1.0
+
+# ============================================================================
+# HOMEPAGE SNAPSHOT
+# ============================================================================
+
+# HomeView renders from a cached snapshot rebuilt by Celery this many
+# seconds after a change to one of HOMEPAGE_MODELS
+HOMEPAGE_REBUILD_DELAY = 10
+HOMEPAGE_MODELS = (
+    'projects.Project',
+    'media.MediaItem',
+    'categories.Category',
+    'comments.Testimonial',
+    'blog.BlogPost',
+)
+
+# ============================================================================
+# SEARCH CONFIGURATION
+# ============================================================================
+
+# Backend is picked from the database vendor (PostgreSQL tsvector, SQLite
+# FTS5, icontains fallback); set SEARCH_BACKEND to a dotted path to override
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND') or None
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'english')
+# SQLite FTS5 only: matches beyond the best N (by bm25) are dropped
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 500))
+
+# ============================================================================
+# RELATED PROJECTS CONFIGURATION
+# ============================================================================
+
+# Neighbors stored per project and the weight of each shared feature kind
+PROJECT_SIMILARITY_TOP_K = 6
+PROJECT_SIMILARITY_WEIGHTS = {
+    'category': 3.0,
+    'tech': 2.0,
+    'api': 1.5,
+    'tag': 1.0,
+}
+
+# ============================================================================
+# THUMBNAIL RENDITIONS
+# ============================================================================
+
+# Widths generated (as WebP, and AVIF when Pillow supports it) for srcset
+PROJECT_THUMBNAIL_WIDTHS = (320, 640, 1280)
+
 # ============================================================================
 # GITHUB API CONFIGURATION
 # ============================================================================
@@ -32,6 +32,10 @@ X_FRAME_OPTIONS = 'DENY'
 
 CSRF_TRUSTED_ORIGINS = os.environ.get('CSRF_TRUSTED_ORIGINS', 'https://*.leapcell.dev').split(',')
 
+# Leapcell terminates requests at one proxy that appends to X-Forwarded-For
+# (see core/ratelimit.py get_client_ip)
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 1))
+
 # ============================================================
 # DATABASE
 # ============================================================
@@ -50,6 +54,8 @@ DATABASES = {
 
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Hashed file names (served by WhiteNoise with immutable caching) plus gzip
+# and brotli precompression at collectstatic time
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
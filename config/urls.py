@@ -2,9 +2,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from media_portfolio.core.views import SetThemeView  # Add this import
+from media_portfolio.core.views import SetThemeView, SQLProfileView  # Add this import
 
 urlpatterns = [
+    path('admin/sql-profile/', SQLProfileView.as_view(), name='sql_profile'),
     path('admin/', admin.site.urls),
     path('', include('media_portfolio.core.urls')),
     path('media/', include('media_portfolio.media.urls')),
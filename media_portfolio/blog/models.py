@@ -1,8 +1,8 @@
 from django.db import models
-from media_portfolio.core.models import BaseModel
+from media_portfolio.core.models import BaseModel, UniqueSlugMixin
 
 
-class BlogPost(BaseModel):
+class BlogPost(UniqueSlugMixin, BaseModel):
     """
     Model for storing blog posts from external sources (Dev.to, Medium)
     """
@@ -1,8 +1,10 @@
 from django.views.generic import ListView, TemplateView
 from django.core.cache import cache
 from .models import BlogPost
+from media_portfolio.core.conditional import conditional_models
 
 
+@conditional_models('blog.BlogPost')
 class BlogListView(ListView):
     """
     View for listing blog posts
@@ -1,8 +1,8 @@
 from django.db import models
-from media_portfolio.core.models import BaseModel
+from media_portfolio.core.models import BaseModel, UniqueSlugMixin
 
 
-class Category(BaseModel):
+class Category(UniqueSlugMixin, BaseModel):
     """
     Category for media items with type classification
     """
@@ -16,6 +16,8 @@ class Category(BaseModel):
         ('personal', 'Personal Projects'),
     ]
 
+    slug_source_field = 'name'
+
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=120, unique=True)
     category_type = models.CharField(max_length=20, choices=CATEGORY_TYPES)
@@ -56,12 +58,6 @@ class Category(BaseModel):
     def __str__(self):
         return f"{self.get_category_type_display()}: {self.name}"
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            from django.utils.text import slugify
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
-
     # Rename this method to avoid conflict with annotated field
     def get_media_count(self):
         """Get count of media items in this category"""
@@ -3,9 +3,10 @@ from django.views.generic import ListView, DetailView
 from .models import Category
 from media_portfolio.media.models import MediaItem
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from media_portfolio.core.conditional import conditional_models
 
 
-
+@conditional_models('categories.Category', 'media.MediaItem')
 class CategoryListView(ListView):
     """
     View for listing all categories grouped by type
@@ -1,10 +1,10 @@
 from django.db import models
 from django.utils import timezone
-from media_portfolio.core.models import BaseModel
+from media_portfolio.core.models import BaseModel, UniqueSlugMixin
 from media_portfolio.media.models import MediaItem
 
 
-class Collection(BaseModel):
+class Collection(UniqueSlugMixin, BaseModel):
     """
     Model for grouping media items into collections/series
     """
@@ -70,12 +70,6 @@ class Collection(BaseModel):
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            from django.utils.text import slugify
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
-
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('collections:detail', args=[self.slug])
@@ -2,8 +2,11 @@ from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
 from django.core.paginator import Paginator
 from .models import Collection
+from media_portfolio.core.navigation import AdjacentNavigationMixin
+from media_portfolio.core.conditional import conditional_models
 
 
+@conditional_models('collections.Collection')
 class CollectionListView(ListView):
     """
     View for listing all collections
@@ -38,7 +41,7 @@ class CollectionListView(ListView):
         return context
 
 
-class CollectionDetailView(DetailView):
+class CollectionDetailView(AdjacentNavigationMixin, DetailView):
     """
     View for displaying a single collection
     """
@@ -1,20 +1,21 @@
 from django.contrib import admin
 from .models import Comment, Testimonial
+from media_portfolio.core.comment_counts import moderate_comments
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'media_item', 'is_approved', 'is_featured', 'created_at']
-    list_filter = ['is_approved', 'is_spam', 'is_featured', 'created_at']
+    list_display = ['name', 'email', 'media_item', 'is_approved', 'is_featured', 'spam_score', 'created_at']
+    list_filter = ['is_approved', 'is_spam', 'spam_auto_flagged', 'is_featured', 'created_at']
     search_fields = ['name', 'email', 'content']
-    readonly_fields = ['ip_address', 'user_agent', 'created_at', 'updated_at']  # Added updated_at here
+    readonly_fields = ['spam_score', 'ip_address', 'user_agent', 'created_at', 'updated_at']  # Added updated_at here
     
     fieldsets = (
         ('Comment', {
             'fields': ('media_item', 'parent', 'name', 'email', 'website', 'content')
         }),
         ('Moderation', {
-            'fields': ('is_approved', 'is_spam', 'is_featured', 'can_use_as_testimonial', 'testimonial_approved')
+            'fields': ('is_approved', 'is_spam', 'spam_score', 'is_featured', 'can_use_as_testimonial', 'testimonial_approved')
         }),
         ('Technical', {
             'fields': ('ip_address', 'user_agent', 'created_at', 'updated_at'),
@@ -25,15 +26,15 @@ class CommentAdmin(admin.ModelAdmin):
     actions = ['approve_comments', 'mark_as_spam', 'feature_comments']
     
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        moderate_comments(queryset, is_approved=True, is_spam=False, spam_auto_flagged=False)
     approve_comments.short_description = "Approve selected comments"
     
     def mark_as_spam(self, request, queryset):
-        queryset.update(is_spam=True, is_approved=False)
+        moderate_comments(queryset, is_spam=True, is_approved=False, spam_auto_flagged=False)
     mark_as_spam.short_description = "Mark selected as spam"
     
     def feature_comments(self, request, queryset):
-        queryset.update(is_featured=True)
+        moderate_comments(queryset, is_featured=True)
     feature_comments.short_description = "Feature selected comments"
 
 
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CommentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'media_portfolio.comments'
-    verbose_name = 'Comments'
\ No newline at end of file
+    verbose_name = 'Comments'
+
+    def ready(self):
+        import media_portfolio.comments.signals
\ No newline at end of file
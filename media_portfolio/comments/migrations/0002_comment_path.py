@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-17 15:10
+
+from django.db import migrations, models
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+# Frozen copies of core/threads.py as of this migration
+PATH_STEP = 10
+MAX_DEPTH = 255 // PATH_STEP - 1
+
+
+def backfill_paths(apps, schema_editor):
+    """Fill path/depth level by level in SQL"""
+    model = apps.get_model('comments', 'Comment')
+    own_segment = LPad(Cast('pk', output_field=CharField()), PATH_STEP, Value('0'))
+    model.objects.filter(parent__isnull=True).update(path=own_segment, depth=0)
+
+    # Each pass fills the rows whose parent already has a path
+    parent = model.objects.filter(pk=OuterRef('parent_id'))
+    for _ in range(MAX_DEPTH):
+        updated = model.objects.filter(path='', parent__isnull=False).exclude(parent__path='').update(
+            path=Concat(Subquery(parent.values('path')[:1]), own_segment, output_field=CharField()),
+            depth=Subquery(parent.values('depth')[:1]) + 1
+        )
+        if not updated:
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['media_item', 'path'], name='comments_co_media_i_66daa0_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db.models import Count, Q
+
+
+def backfill_stats(apps, schema_editor):
+    """One stats row per commented media item, plus the global row"""
+    Comment = apps.get_model('comments', 'Comment')
+    CommentStats = apps.get_model('comments', 'CommentStats')
+    aggregates = {
+        'total': Count('pk'),
+        'approved': Count('pk', filter=Q(is_approved=True)),
+        'featured': Count('pk', filter=Q(is_featured=True)),
+        'spam': Count('pk', filter=Q(is_spam=True)),
+    }
+    rows = [
+        CommentStats(**row)
+        for row in Comment.objects.order_by().values('media_item_id').annotate(**aggregates)
+    ]
+    rows.append(CommentStats(media_item_id=None, **Comment.objects.aggregate(**aggregates)))
+    CommentStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+        ('comments', '0002_comment_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('featured', models.PositiveIntegerField(default=0)),
+                ('spam', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('media_item', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comment_stats', to='media.mediaitem')),
+            ],
+            options={
+                'verbose_name': 'Comment statistics',
+                'verbose_name_plural': 'Comment statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='commentstats',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('media_item', models.Value(0)), name='comments_commentstats_one_scope'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
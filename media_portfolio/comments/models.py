@@ -1,13 +1,23 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.core.validators import EmailValidator
-from media_portfolio.core.models import BaseModel
+from media_portfolio.core.models import BaseModel, ThreadedModel, SpamScoredModel
+from media_portfolio.core.threads import build_tree
 from media_portfolio.media.models import MediaItem
 
 
-class Comment(BaseModel):
+class Comment(ThreadedModel, SpamScoredModel, BaseModel):
     """
     Model for comments on media items with threading support
     """
+    # Counters are stored on the target when it has the columns, otherwise
+    # annotated per list (core/comment_counts.py)
+    counter_target = 'media_item'
+    # Replies are looked up within one media item's thread
+    thread_scope = 'media_item'
+    spam_text_fields = ('name', 'email', 'website', 'content')
+
     media_item = models.ForeignKey(
         MediaItem,
         on_delete=models.CASCADE,
@@ -63,15 +73,44 @@ class Comment(BaseModel):
         indexes = [
             models.Index(fields=['media_item', 'is_approved']),
             models.Index(fields=['is_featured']),
+            models.Index(fields=['media_item', 'path']),
         ]
 
     def __str__(self):
         return f"Comment by {self.name} on {self.media_item.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the stats rollup counted this comment as (comments/stats.py)
+        instance._saved_stats = instance.get_stats_flags()
+        return instance
+
+    def get_stats_flags(self):
+        return (
+            self.__dict__.get('media_item_id'),
+            self.__dict__.get('is_approved'),
+            self.__dict__.get('is_featured'),
+            self.__dict__.get('is_spam'),
+        )
+
     def get_replies(self):
         """Get all approved replies to this comment"""
+        if hasattr(self, 'thread_replies'):
+            # Already loaded with the thread (core.threads.attach_replies)
+            return self.thread_replies
         return self.replies.filter(is_approved=True)
 
+    def get_thread(self):
+        """This comment with its approved replies as a tree, in one query"""
+        nodes = Comment.objects.filter(
+            media_item_id=self.media_item_id,
+            path__startswith=self.path,
+            is_approved=True
+        ).order_by('path')
+        roots = build_tree(nodes)
+        return roots[0] if roots else None
+
 
 class Testimonial(BaseModel):
     """
@@ -114,4 +153,38 @@ class Testimonial(BaseModel):
         verbose_name_plural = "Testimonials"
 
     def __str__(self):
-        return f"Testimonial from {self.name}"
\ No newline at end of file
+        return f"Testimonial from {self.name}"
+
+
+class CommentStats(models.Model):
+    """
+    Comment counts, kept current incrementally (see comments/stats.py).
+    The row without a media item holds the totals over all comments.
+    """
+    media_item = models.OneToOneField(
+        MediaItem,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='comment_stats'
+    )
+    total = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    featured = models.PositiveIntegerField(default=0)
+    spam = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'comments'
+        verbose_name = "Comment statistics"
+        verbose_name_plural = "Comment statistics"
+        constraints = [
+            # A single global row (media_item is NULL)
+            models.UniqueConstraint(Coalesce('media_item', Value(0)), name='comments_commentstats_one_scope'),
+        ]
+
+    def __str__(self):
+        return f"Comment stats for {self.media_item or 'all media'}"
+
+    def as_dict(self):
+        return {'total': self.total, 'approved': self.approved, 'featured': self.featured, 'spam': self.spam}
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Comment
+from .stats import record_comment_saved, record_comment_deleted, record_moderation
+from media_portfolio.core.comment_counts import comments_moderating
+
+
+@receiver(post_save, sender=Comment)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep the comment stats rollup current, in the saving transaction
+    """
+    if not raw:
+        record_comment_saved(instance, created)
+
+
+@receiver(post_delete, sender=Comment)
+def update_stats_on_delete(sender, instance, **kwargs):
+    record_comment_deleted(instance)
+
+
+@receiver(comments_moderating, sender=Comment)
+def update_stats_on_moderation(sender, queryset, changes, **kwargs):
+    record_moderation(queryset, changes)
@@ -0,0 +1,187 @@
+"""
+Incrementally maintained comment statistics.
+
+``CommentStats`` holds total/approved/featured/spam per media item plus one
+global row. Comment saves, deletes and moderation updates adjust them with
+``F()`` deltas in the same transaction as the change, so reading the stats
+is a single-row lookup. ``reconcile_comment_stats`` recounts everything
+(periodically, from comments/tasks.py) and fixes any drift, e.g. after
+bulk_create or raw SQL.
+"""
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ('total', 'approved', 'featured', 'spam')
+
+# Comment field -> stats field, for moderation updates
+FLAG_FIELDS = {'is_approved': 'approved', 'is_featured': 'featured', 'is_spam': 'spam'}
+
+
+def _get_models():
+    from .models import Comment, CommentStats
+    return Comment, CommentStats
+
+
+def _aggregates():
+    return {
+        'total': Count('pk'),
+        'approved': Count('pk', filter=Q(is_approved=True)),
+        'featured': Count('pk', filter=Q(is_featured=True)),
+        'spam': Count('pk', filter=Q(is_spam=True)),
+    }
+
+
+def _scope(stats_model, media_item_id):
+    if media_item_id is None:
+        return stats_model.objects.filter(media_item__isnull=True)
+    return stats_model.objects.filter(media_item_id=media_item_id)
+
+
+def recount_stats(media_item_id=None):
+    """Count the comments of one media item (or all) and store the row"""
+    Comment, CommentStats = _get_models()
+    comments = Comment.objects.all()
+    if media_item_id is not None:
+        if not Comment.media_item.field.related_model.objects.filter(pk=media_item_id).exists():
+            # Being deleted along with its stats row
+            return None
+        comments = comments.filter(media_item_id=media_item_id)
+    counts = comments.aggregate(**_aggregates())
+    if not _scope(CommentStats, media_item_id).update(**counts):
+        CommentStats.objects.create(media_item_id=media_item_id, **counts)
+    return counts
+
+
+def recount_stats_later(media_item_id):
+    with transaction.atomic():
+        recount_stats(media_item_id)
+        recount_stats(None)
+
+
+def apply_deltas(deltas, applied=True):
+    """
+    Add ``deltas`` ({media_item_id or None: {field: change}}) to the stats
+    rows. A missing row is counted from scratch instead; ``applied`` says
+    whether that count already includes the change.
+    """
+    _, CommentStats = _get_models()
+    for media_item_id, changes in deltas.items():
+        changes = {field: value for field, value in changes.items() if value}
+        if not changes:
+            continue
+        updated = _scope(CommentStats, media_item_id).update(
+            **{field: F(field) + value for field, value in changes.items()}
+        )
+        if not updated and recount_stats(media_item_id) is not None and not applied:
+            _scope(CommentStats, media_item_id).update(
+                **{field: F(field) + value for field, value in changes.items()}
+            )
+
+
+def _add_flags(deltas, flags, sign):
+    media_item_id, is_approved, is_featured, is_spam = flags
+    for key in (media_item_id, None):
+        deltas[key]['total'] += sign
+        deltas[key]['approved'] += sign * bool(is_approved)
+        deltas[key]['featured'] += sign * bool(is_featured)
+        deltas[key]['spam'] += sign * bool(is_spam)
+
+
+def record_comment_saved(comment, created):
+    """Count a saved comment, replacing what it was counted as before"""
+    deltas = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    flags = comment.get_stats_flags()
+    saved = None if created else getattr(comment, '_saved_stats', None)
+    if saved == flags:
+        return
+    if saved is not None:
+        _add_flags(deltas, saved, -1)
+    elif not created:
+        # Saved without having been loaded: the old state is unknown
+        transaction.on_commit(lambda: recount_stats_later(comment.media_item_id))
+        return
+    _add_flags(deltas, flags, 1)
+    apply_deltas(deltas)
+    comment._saved_stats = flags
+
+
+def record_comment_deleted(comment):
+    deltas = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    _add_flags(deltas, getattr(comment, '_saved_stats', None) or comment.get_stats_flags(), -1)
+    apply_deltas(deltas)
+
+
+def record_moderation(queryset, changes):
+    """
+    Adjust the stats for ``queryset.update(**changes)``; called before the
+    update, in its transaction
+    """
+    flags = {FLAG_FIELDS[name]: bool(value) for name, value in changes.items() if name in FLAG_FIELDS}
+    if not flags:
+        return
+    aggregates = {'rows': Count('pk')}
+    aggregates.update({
+        field: Count('pk', filter=Q(**{name: True}))
+        for name, field in FLAG_FIELDS.items() if field in flags
+    })
+    rows = queryset.order_by().values('media_item_id').annotate(**aggregates)
+
+    deltas = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    for row in rows:
+        for field, value in flags.items():
+            # Rows that become True minus rows that stop being True
+            change = row['rows'] - row[field] if value else -row[field]
+            deltas[row['media_item_id']][field] += change
+            deltas[None][field] += change
+    apply_deltas(deltas, applied=False)
+
+
+def get_comment_stats(media_item_id=None):
+    """Stats dict for one media item, or for all comments"""
+    _, CommentStats = _get_models()
+    stats = _scope(CommentStats, media_item_id).first()
+    if stats is not None:
+        return stats.as_dict()
+    with transaction.atomic():
+        counts = recount_stats(media_item_id)
+    return counts or dict.fromkeys(STAT_FIELDS, 0)
+
+
+def reconcile_comment_stats(comment_model=None, stats_model=None):
+    """
+    Recount every stats row and fix the ones that drifted. Works with
+    historical models (migrations). Returns the number of rows written.
+    """
+    if comment_model is None:
+        comment_model, stats_model = _get_models()
+
+    with transaction.atomic():
+        # Lock first: writers wait, and count after us on top of our values
+        stored = {row.media_item_id: row for row in stats_model.objects.select_for_update()}
+        actual = {
+            row.pop('media_item_id'): row
+            for row in comment_model.objects.order_by().values('media_item_id').annotate(**_aggregates())
+        }
+        actual[None] = comment_model.objects.aggregate(**_aggregates())
+
+        changed, created = [], []
+        for media_item_id in set(stored) | set(actual):
+            counts = actual.get(media_item_id, dict.fromkeys(STAT_FIELDS, 0))
+            row = stored.get(media_item_id)
+            if row is None:
+                created.append(stats_model(media_item_id=media_item_id, **counts))
+            elif any(getattr(row, field) != counts[field] for field in STAT_FIELDS):
+                for field in STAT_FIELDS:
+                    setattr(row, field, counts[field])
+                changed.append(row)
+
+        stats_model.objects.bulk_create(created)
+        stats_model.objects.bulk_update(changed, STAT_FIELDS)
+
+    if changed:
+        logger.warning(f"Comment stats drifted for {len(changed)} scope(s); corrected")
+    return len(changed) + len(created)
@@ -0,0 +1,18 @@
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_comment_stats():
+    """
+    Celery task to recount the comment stats rollup and fix any drift
+    """
+    from .stats import reconcile_comment_stats as reconcile
+
+    try:
+        return reconcile()
+    except Exception as e:
+        logger.error(f"Comment stats reconciliation failed: {str(e)}")
+        raise
@@ -1,8 +1,9 @@
 from django import template
 from django.utils import timezone
-from django.db.models import Count, Q
-from django.core.cache import cache
 from ..models import Comment
+from ..stats import get_comment_stats as get_stats
+from media_portfolio.core.threads import attach_replies
+from media_portfolio.core.comment_counts import prefetch_comment_counts as load_comment_counts
 
 register = template.Library()
 
@@ -55,7 +56,14 @@ def get_comment_count(media_item, include_replies=False):
         media_item: The media item object
         include_replies: If True, counts all comments including replies
                         If False, counts only top-level comments
+
+    Uses the stored or batch-loaded counters when the object has them
+    (see prefetch_comment_counts), so grids cost no query per card.
     """
+    counter = 'approved_comment_count' if include_replies else 'approved_top_level_count'
+    if hasattr(media_item, counter):
+        return getattr(media_item, counter)
+
     queryset = Comment.objects.filter(
         media_item=media_item,
         is_approved=True
@@ -117,27 +125,19 @@ def get_user_comments(user, limit=None):
 def get_comment_stats(media_item=None):
     """
     Get comment statistics, optionally filtered by media item.
-    Returns dictionary with counts.
+    Returns dictionary with counts, read from the CommentStats rollup.
     """
-    cache_key = f'comment_stats_{media_item.id if media_item else "global"}'
-    stats = cache.get(cache_key)
-    
-    if stats is None:
-        queryset = Comment.objects.all()
-        if media_item:
-            queryset = queryset.filter(media_item=media_item)
-        
-        stats = queryset.aggregate(
-            total=Count('id'),
-            approved=Count('id', filter=Q(is_approved=True)),
-            featured=Count('id', filter=Q(is_featured=True)),
-            spam=Count('id', filter=Q(is_spam=True))
-        )
-        
-        # Cache for 5 minutes
-        cache.set(cache_key, stats, 300)
-    
-    return stats
+    return get_stats(media_item.id if media_item else None)
+
+
+@register.simple_tag
+def prefetch_comment_counts(objects):
+    """
+    Load approved comment counts for a whole list in one query, so
+    get_comment_count does not COUNT per card.
+    Usage: {% prefetch_comment_counts media_items as media_items %}
+    """
+    return load_comment_counts(objects, Comment)
 
 
 @register.inclusion_tag('comments/comment_tree.html', takes_context=True)
@@ -149,9 +149,9 @@ def render_comment_tree(context, comments, media_item=None):
         comments: QuerySet or list of comments
         media_item: Optional media item for reply form
     """
-    # Prefetch replies for efficiency
-    if hasattr(comments, 'prefetch_related'):
-        comments = comments.prefetch_related('replies')
+    # Every approved reply, at any depth, in one query
+    if hasattr(comments, 'model'):
+        comments = attach_replies(comments, comments.model.objects.filter(is_approved=True))
     
     return {
         'comments': comments,
@@ -179,14 +179,7 @@ def comment_depth(comment):
     Get the depth of a comment in the thread.
     Useful for styling nested comments.
     """
-    depth = 0
-    current = comment
-    while current.parent:
-        depth += 1
-        current = current.parent
-        if depth > 10:  # Prevent infinite loops
-            break
-    return depth
+    return comment.depth
 
 
 @register.simple_tag
@@ -225,4 +218,6 @@ def get_comment_replies_count(comment):
     """
     Get count of replies for a comment.
     """
+    if hasattr(comment, 'thread_replies'):
+        return len(comment.thread_replies)
     return comment.replies.filter(is_approved=True).count()
\ No newline at end of file
@@ -0,0 +1,49 @@
+from collections import defaultdict
+from django.test import SimpleTestCase, TestCase
+
+from . import stats
+from .models import CommentStats
+
+
+class ApplyDeltasTests(TestCase):
+    def global_stats(self):
+        return CommentStats.objects.get(media_item__isnull=True).as_dict()
+
+    def delete_global_row(self):
+        # Migration 0003 creates it; drop it to exercise the recount path
+        CommentStats.objects.filter(media_item__isnull=True).delete()
+
+    def test_missing_row_is_counted_from_scratch(self):
+        self.delete_global_row()
+        # The recount already includes the change (no comments exist)
+        stats.apply_deltas({None: {'total': 1, 'approved': 1}})
+        self.assertEqual(self.global_stats(), dict.fromkeys(stats.STAT_FIELDS, 0))
+
+    def test_deltas_add_to_existing_row(self):
+        stats.recount_stats(None)
+        stats.apply_deltas({None: {'total': 3, 'approved': 2, 'spam': 1}})
+        stats.apply_deltas({None: {'total': -1, 'approved': -1, 'featured': 0}})
+        self.assertEqual(self.global_stats(), {'total': 2, 'approved': 1, 'featured': 0, 'spam': 1})
+
+    def test_unapplied_change_is_added_after_recount(self):
+        self.delete_global_row()
+        # Moderation adjusts the stats before its UPDATE runs
+        stats.apply_deltas({None: {'featured': 2}}, applied=False)
+        self.assertEqual(self.global_stats()['featured'], 2)
+
+    def test_reconcile_fixes_drift(self):
+        stats.recount_stats(None)
+        stats.apply_deltas({None: {'total': 5}})
+        self.assertEqual(stats.reconcile_comment_stats(), 1)
+        self.assertEqual(self.global_stats(), dict.fromkeys(stats.STAT_FIELDS, 0))
+        self.assertEqual(stats.reconcile_comment_stats(), 0)
+
+
+class AddFlagsTests(SimpleTestCase):
+    def test_media_item_and_global_row(self):
+        deltas = defaultdict(lambda: dict.fromkeys(stats.STAT_FIELDS, 0))
+        stats._add_flags(deltas, (7, True, False, False), 1)
+        stats._add_flags(deltas, (7, False, True, True), -1)
+        expected = {'total': 0, 'approved': 1, 'featured': -1, 'spam': -1}
+        self.assertEqual(deltas[7], expected)
+        self.assertEqual(deltas[None], expected)
@@ -7,8 +7,14 @@ from django.utils.decorators import method_decorator
 from .models import Comment
 from .forms import CommentForm
 from media_portfolio.media.models import MediaItem
+from media_portfolio.core.pagination import CursorPaginator, InvalidCursor
+from media_portfolio.core.threads import attach_replies
+from media_portfolio.core.comment_counts import moderate_comments
+from media_portfolio.core.comment_fragments import cached_comment_page, get_target_id
+from media_portfolio.core.ratelimit import rate_limit, get_client_ip
 
 
+@method_decorator(rate_limit('comment'), name='post')
 class AddCommentView(View):
     """
     View for adding a comment to a media item
@@ -31,11 +37,7 @@ class AddCommentView(View):
                     pass
             
             # Capture IP and user agent
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                comment.ip_address = x_forwarded_for.split(',')[0]
-            else:
-                comment.ip_address = request.META.get('REMOTE_ADDR')
+            comment.ip_address = get_client_ip(request)
             
             comment.user_agent = request.META.get('HTTP_USER_AGENT', '')
             
@@ -73,36 +75,56 @@ class LoadCommentsView(View):
     """
     
     def get(self, request, media_id):
-        media_item = get_object_or_404(MediaItem, id=media_id)
-        
+        # Cached per media item and page; moderation bumps the version
+        media_id = get_target_id(MediaItem, id=media_id)
+        return cached_comment_page(request, Comment, media_id, lambda: self.render_page(request, media_id))
+
+    def render_page(self, request, media_id):
         # Get approved comments
-        comments = Comment.objects.filter(
-            media_item=media_item,
-            is_approved=True,
-            parent=None
-        ).prefetch_related('replies')
+        approved = Comment.objects.filter(media_item_id=media_id, is_approved=True)
+        comments = approved.filter(parent=None)
         
-        # Paginate if needed
-        page = int(request.GET.get('page', 1))
         per_page = 10
-        start = (page - 1) * per_page
-        end = start + per_page
-        
-        comments_page = comments[start:end]
-        has_next = comments.count() > end
-        
+        next_page = next_cursor = None
+        paginator = CursorPaginator(comments, per_page, ('-created_at', '-id'))
+
+        if 'page' in request.GET:
+            # Offset pagination for old clients; one extra row tells us if
+            # there is more, and the cursor lets them switch to keyset paging
+            try:
+                page = int(request.GET.get('page', 1))
+            except ValueError:
+                page = 0
+            if page < 1:
+                return JsonResponse({'success': False, 'error': 'Invalid page'}, status=400)
+            start = (page - 1) * per_page
+            rows = list(comments.order_by(*paginator.ordering)[start:start + per_page + 1])
+            has_next = len(rows) > per_page
+            comments_page = rows[:per_page]
+            if has_next:
+                next_page = page + 1
+                next_cursor = paginator.encode_cursor(comments_page[-1], 'next')
+        else:
+            try:
+                comments_page = paginator.page(request.GET.get('cursor'))
+            except InvalidCursor:
+                return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+            has_next = comments_page.has_next()
+            next_cursor = comments_page.next_cursor
+
         # Render comments HTML
         from django.template.loader import render_to_string
         html = render_to_string('comments/comment_list_items.html', {
-            'comments': comments_page
+            'comments': attach_replies(comments_page, approved)
         })
-        
-        return JsonResponse({
+
+        return {
             'success': True,
             'html': html,
             'has_next': has_next,
-            'next_page': page + 1 if has_next else None
-        })
+            'next_page': next_page,
+            'next_cursor': next_cursor
+        }
 
 
 class ModerateCommentView(View):
@@ -116,26 +138,23 @@ class ModerateCommentView(View):
         
         comment = get_object_or_404(Comment, id=comment_id)
         action = request.POST.get('action')
+        # Transitions go through moderate_comments so the counters follow
+        comments = Comment.objects.filter(pk=comment.pk)
         
         if action == 'approve':
-            comment.is_approved = True
-            comment.save()
+            moderate_comments(comments, is_approved=True, is_spam=False, spam_auto_flagged=False)
             return JsonResponse({'success': True, 'message': 'Comment approved'})
         
         elif action == 'reject':
-            comment.is_approved = False
-            comment.save()
+            moderate_comments(comments, is_approved=False)
             return JsonResponse({'success': True, 'message': 'Comment rejected'})
         
         elif action == 'spam':
-            comment.is_spam = True
-            comment.is_approved = False
-            comment.save()
+            moderate_comments(comments, is_spam=True, is_approved=False, spam_auto_flagged=False)
             return JsonResponse({'success': True, 'message': 'Comment marked as spam'})
         
         elif action == 'feature':
-            comment.is_featured = True
-            comment.save()
+            moderate_comments(comments, is_featured=True)
             return JsonResponse({'success': True, 'message': 'Comment featured'})
         
         return JsonResponse({'error': 'Invalid action'}, status=400)
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Version stamps for cache namespaces.
+
+Cached entries embed the current version of their namespace in the key, so
+bumping the version invalidates every entry at once across all workers.
+"""
+import time
+from django.core.cache import cache
+
+KEY_PREFIX = 'cache_version'
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:{namespace}'
+
+
+def _initial_version():
+    # Start from the clock so a version lost to eviction is never reused
+    return int(time.time() * 1000)
+
+
+def get_cache_version(namespace):
+    """Return the current version of a cache namespace"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def bump_cache_version(namespace):
+    """Invalidate every cache entry of a namespace"""
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, None)
+        return version
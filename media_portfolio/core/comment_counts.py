@@ -0,0 +1,126 @@
+"""
+Denormalized approved-comment counters.
+
+A comment model names the object its comments belong to with
+``counter_target`` (e.g. ``'project'``). When that object's model has
+``approved_comment_count`` / ``approved_top_level_count`` columns they are
+recounted in a single UPDATE whenever comments change: on save/delete
+(core/signals.py) and in ``moderate_comments``, which admin actions and the
+moderation view use instead of a bare ``queryset.update``. Other rollups
+(e.g. comments/stats.py) follow moderation through ``comments_moderating``.
+
+Models without the columns get the same numbers from
+``annotate_comment_counts`` / ``prefetch_comment_counts`` in one query per
+list instead of a COUNT per object.
+"""
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from .conditional import touch_model
+from .page_cache import invalidate_page_cache
+from .comment_fragments import bump_comment_version
+
+COUNTER_FIELDS = ('approved_comment_count', 'approved_top_level_count')
+
+# Sent by moderate_comments inside its transaction, before the update, with
+# ``queryset`` and ``changes``
+comments_moderating = Signal()
+
+
+def get_target_field(comment_model):
+    return comment_model._meta.get_field(comment_model.counter_target)
+
+
+def has_counter_columns(model):
+    field_names = {field.name for field in model._meta.concrete_fields}
+    return all(name in field_names for name in COUNTER_FIELDS)
+
+
+def _count_subquery(comment_model, target_field, **filters):
+    return Coalesce(Subquery(
+        comment_model._default_manager.filter(
+            **{target_field.name: OuterRef('pk')}, is_approved=True, **filters
+        ).order_by().values(target_field.name).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def refresh_comment_counts(comment_model, target_ids):
+    """Recount the approved comments of the given targets in one UPDATE"""
+    target_field = get_target_field(comment_model)
+    target_model = target_field.related_model
+    target_ids = {pk for pk in target_ids if pk is not None}
+    if not target_ids or not has_counter_columns(target_model):
+        return 0
+    return target_model._default_manager.filter(pk__in=target_ids).update(
+        approved_comment_count=_count_subquery(comment_model, target_field),
+        approved_top_level_count=_count_subquery(comment_model, target_field, parent__isnull=True),
+    )
+
+
+def _changes_done(comment_model, target_ids):
+    invalidate_page_cache()
+    bump_comment_version(comment_model, target_ids)
+    touch_model(comment_model)
+    touch_model(get_target_field(comment_model).related_model)
+
+
+def moderate_comments(queryset, **changes):
+    """
+    Apply moderation ``changes`` (e.g. is_approved=True) to ``queryset`` and
+    keep the counters of the affected objects current. Returns the number
+    of comments updated.
+    """
+    comment_model = queryset.model
+    target_attname = get_target_field(comment_model).attname
+    with transaction.atomic():
+        target_ids = set(queryset.values_list(target_attname, flat=True))
+        comments_moderating.send(sender=comment_model, queryset=queryset, changes=changes)
+        updated = queryset.update(**changes)
+        refresh_comment_counts(comment_model, target_ids)
+        # update() skips the signals that invalidate caches
+        transaction.on_commit(lambda: _changes_done(comment_model, target_ids))
+    return updated
+
+
+def annotate_comment_counts(queryset, related_name='comments'):
+    """
+    Add the counters to a list queryset in the same query, unless the model
+    already stores them
+    """
+    if has_counter_columns(queryset.model):
+        return queryset
+    approved = Q(**{f'{related_name}__is_approved': True})
+    return queryset.annotate(
+        approved_comment_count=Count(related_name, filter=approved, distinct=True),
+        approved_top_level_count=Count(
+            related_name,
+            filter=approved & Q(**{f'{related_name}__parent__isnull': True}),
+            distinct=True
+        ),
+    )
+
+
+def prefetch_comment_counts(objects, comment_model):
+    """
+    Set the counters on already-loaded ``objects`` with one GROUP BY query;
+    objects that store them are left alone
+    """
+    objects = list(objects)
+    missing = [obj for obj in objects if not hasattr(obj, 'approved_comment_count')]
+    if not missing:
+        return objects
+    target_field = get_target_field(comment_model)
+    rows = comment_model._default_manager.filter(
+        **{f'{target_field.name}__in': missing}, is_approved=True
+    ).order_by().values(target_field.attname).annotate(
+        total=Count('pk'),
+        top_level=Count('pk', filter=Q(parent__isnull=True))
+    )
+    counts = {row[target_field.attname]: row for row in rows}
+    for obj in missing:
+        row = counts.get(obj.pk, {})
+        obj.approved_comment_count = row.get('total', 0)
+        obj.approved_top_level_count = row.get('top_level', 0)
+    return objects
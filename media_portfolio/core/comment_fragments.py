@@ -0,0 +1,82 @@
+"""
+Cached "load more comments" pages.
+
+Each commented object has a comment version (core/cache_versions.py),
+bumped when its comments are saved, deleted or moderated. A rendered page
+(HTML plus paging info) is cached under that version and the page/cursor
+asked for, and the same values make up its ETag, so a repeated AJAX load
+is answered from the cache, or with 304, without a query or a render.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from .cache_versions import get_cache_version, bump_cache_version
+from .conditional import get_model_stamps
+
+KEY_PREFIX = 'comment_page'
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def _namespace(comment_model, target_id):
+    return f'comments:{comment_model._meta.label_lower}:{target_id}'
+
+
+def bump_comment_version(comment_model, target_ids):
+    """Drop the cached comment pages of the given objects"""
+    for target_id in set(target_ids):
+        if target_id is not None:
+            bump_cache_version(_namespace(comment_model, target_id))
+
+
+def _digest(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def get_target_id(model, **lookup):
+    """
+    Primary key of the ``model`` row matching ``lookup`` (e.g. a published
+    project by slug), cached until any row of the model changes. Raises
+    Http404 when there is none.
+    """
+    label = model._meta.label_lower
+    stamp = get_model_stamps([label])[label]
+    key = f'{KEY_PREFIX}:target:{_digest(label, stamp, sorted(lookup.items()))}'
+    target_id = cache.get(key)
+    if target_id is None:
+        target_id = model._default_manager.filter(**lookup).values_list('pk', flat=True).first() or 0
+        cache.set(key, target_id, getattr(settings, 'COMMENT_PAGE_CACHE_TIMEOUT', 86400))
+    if not target_id:
+        raise Http404(f"No {model._meta.verbose_name} matches the given query.")
+    return target_id
+
+
+def cached_comment_page(request, comment_model, target_id, render_page):
+    """
+    JSON response for one page of comments on ``target_id``.
+    ``render_page()`` returns the response data, or an error response that
+    is passed through uncached.
+    """
+    version = get_cache_version(_namespace(comment_model, target_id))
+    params = [(name, request.GET.get(name, '')) for name in PAGE_PARAMS]
+    digest = _digest(comment_model._meta.label_lower, target_id, version, params)
+    etag = f'"{digest}"'
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        key = f'{KEY_PREFIX}:{digest}'
+        data = cache.get(key)
+        if data is None:
+            data = render_page()
+            if isinstance(data, HttpResponse):
+                return data
+            cache.set(key, data, getattr(settings, 'COMMENT_PAGE_CACHE_TIMEOUT', 86400))
+        response = JsonResponse(data)
+
+    response['ETag'] = etag
+    # Revalidate every time; a bumped version changes the ETag
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,108 @@
+"""
+Declarative conditional GET for read-only pages.
+
+Views declare the models their output depends on::
+
+    @conditional_models('projects.Project', 'categories.Category')
+    class ProjectListView(ListView): ...
+
+Every declared model (and every CONDITIONAL_GLOBAL_MODELS one) has a "last
+changed" stamp in the cache, touched by post_save/post_delete/m2m_changed
+(core/signals.py); writes that bypass the signals, like ``update()``, call
+``touch_model`` themselves. ``ModelConditionalGetMiddleware``
+resolves the view before it runs, derives ETag and Last-Modified from the
+stamps of its models (plus CONDITIONAL_GLOBAL_MODELS used by the base
+template), and answers a matching request with 304 without running any of
+the view's queries.
+"""
+import time
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import get_resolver
+from .page_cache import get_request_theme
+
+KEY_PREFIX = 'model_stamp'
+
+DEFAULT_GLOBAL_MODELS = (
+    'core.sitesettings',
+    'projects.project',
+    'media.mediaitem',
+    'blog.blogpost',
+)
+
+# Labels declared by @conditional_models
+_declared_models = set()
+_views_loaded = False
+
+
+def conditional_models(*labels):
+    """
+    Declare the models ("app_label.ModelName") a view's output depends on
+    Usage: @conditional_models('blog.BlogPost')
+    """
+    def decorator(view):
+        view.conditional_models = tuple(label.lower() for label in labels)
+        _declared_models.update(view.conditional_models)
+        return view
+    return decorator
+
+
+def get_global_models():
+    return {label.lower() for label in getattr(settings, 'CONDITIONAL_GLOBAL_MODELS', DEFAULT_GLOBAL_MODELS)}
+
+
+def get_stamped_models():
+    """Labels whose stamps some view reads; saves of other models need no stamp"""
+    global _views_loaded
+    if not _views_loaded:
+        # The declarations run when the views are imported, which processes
+        # that never route a request (e.g. Celery workers) have not done
+        get_resolver().url_patterns
+        _views_loaded = True
+    return _declared_models | get_global_models()
+
+
+def get_view_models(view_func):
+    view = getattr(view_func, 'view_class', view_func)
+    models = getattr(view, 'conditional_models', None)
+    if not models:
+        return None
+    return sorted(set(models) | get_global_models())
+
+
+def _stamp_key(label):
+    return f'{KEY_PREFIX}:{label}'
+
+
+def touch_model(model):
+    """Record that rows of ``model`` (class or label) just changed"""
+    label = model if isinstance(model, str) else model._meta.label_lower
+    cache.set(_stamp_key(label.lower()), time.time(), None)
+
+
+def get_model_stamps(labels):
+    """
+    Return {label: unix time of last change}. Models never seen changing
+    get "now", so validators issued before a cache flush are not trusted.
+    """
+    keys = {_stamp_key(label): label for label in labels}
+    found = cache.get_many(list(keys))
+    stamps = {keys[key]: value for key, value in found.items()}
+
+    now = time.time()
+    for key, label in keys.items():
+        if label not in stamps:
+            cache.add(key, now, None)
+            stamps[label] = cache.get(key, now)
+    return stamps
+
+
+def make_validators(request, labels):
+    """Return (etag, last_modified timestamp) for a request to a view over ``labels``"""
+    stamps = get_model_stamps(labels)
+    last_modified = int(max(stamps.values()))
+    parts = [request.get_full_path(), get_request_theme(request)]
+    parts.extend(f'{label}={stamps[label]}' for label in labels)
+    etag = '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return etag, last_modified
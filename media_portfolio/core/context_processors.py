@@ -1,40 +1,115 @@
+"""
+Template context shared by every page.
+
+Global counts and the latest blog posts are built once per content change
+and shared by all workers through the cache: the bundle is keyed by a
+version that core/signals.py bumps whenever one of the GLOBAL_CONTEXT_MODELS
+is saved or deleted. Site settings come from the per-process cache in
+core/site_settings.py. Values are lazy, so pages that never use them do not
+even read the cache.
+"""
+import time
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
 from .models import SiteSettings
-from media_portfolio.blog.models import BlogPost
-from media_portfolio.projects.models import Project
+from .cache_versions import get_cache_version, bump_cache_version
+from .page_cache import get_request_theme
+
+GLOBAL_CONTEXT_NAMESPACE = 'global_context'
+
+DEFAULT_GLOBAL_CONTEXT_MODELS = (
+    'projects.project',
+    'media.mediaitem',
+    'blog.blogpost',
+)
+
+
+def get_global_context_models():
+    labels = getattr(django_settings, 'GLOBAL_CONTEXT_MODELS', DEFAULT_GLOBAL_CONTEXT_MODELS)
+    return {label.lower() for label in labels}
+
+
+def invalidate_global_context():
+    bump_cache_version(GLOBAL_CONTEXT_NAMESPACE)
+
+
+def build_global_context():
+    """Run the queries behind the shared context"""
+    from media_portfolio.media.models import MediaItem
+    from media_portfolio.projects.models import Project
+    from media_portfolio.blog.models import BlogPost
+
+    return {
+        'total_projects': Project.objects.filter(is_published=True).count(),
+        'total_media': MediaItem.objects.filter(is_published=True).count(),
+        'total_blog_posts': BlogPost.objects.filter(is_published=True).count(),
+        'latest_blog_posts': list(
+            BlogPost.objects.filter(is_published=True).order_by('-published_at')[:3]
+        ),
+    }
+
+
+def get_global_context():
+    """
+    Return the shared context for the current content version.
+
+    Only one worker rebuilds a missing bundle; the others wait briefly for
+    it and build their own copy only if it does not show up.
+    """
+    version = get_cache_version(GLOBAL_CONTEXT_NAMESPACE)
+    key = f'{GLOBAL_CONTEXT_NAMESPACE}:{version}'
+    bundle = cache.get(key)
+    if bundle is not None:
+        return bundle
+
+    timeout = getattr(django_settings, 'GLOBAL_CONTEXT_TIMEOUT', 3600)
+    if cache.add(f'{key}:lock', 1, 30):
+        bundle = build_global_context()
+        cache.set(key, bundle, timeout)
+        return bundle
+
+    for _ in range(10):
+        time.sleep(0.05)
+        bundle = cache.get(key)
+        if bundle is not None:
+            return bundle
+    return build_global_context()
+
+
+def _request_bundle(request):
+    # One cache read per request, however many values the templates use
+    if not hasattr(request, '_global_context'):
+        request._global_context = get_global_context()
+    return request._global_context
+
+
+def _lazy(request, name):
+    return SimpleLazyObject(lambda: _request_bundle(request)[name])
+
 
 def site_settings(request):
     """Add site settings to all templates"""
-    try:
-        settings = SiteSettings.objects.first()
-    except:
-        settings = None
-    
     return {
-        'site_settings': settings
+        'site_settings': SimpleLazyObject(SiteSettings.get_current)
     }
 
 def theme_preference(request):
     """Add theme preference to templates"""
-    theme = request.session.get('theme', 'system')
     return {
-        'theme_preference': theme
+        'theme_preference': get_request_theme(request)
     }
 
 def global_stats(request):
     """Add global stats to all templates"""
-    from media_portfolio.media.models import MediaItem
-    from media_portfolio.projects.models import Project
-    from media_portfolio.blog.models import BlogPost
-    
     return {
-        'total_projects': Project.objects.filter(is_published=True).count(),
-        'total_media': MediaItem.objects.filter(is_published=True).count(),
-        'total_blog_posts': BlogPost.objects.filter(is_published=True).count(),
+        'total_projects': _lazy(request, 'total_projects'),
+        'total_media': _lazy(request, 'total_media'),
+        'total_blog_posts': _lazy(request, 'total_blog_posts'),
     }
 
 def latest_blog_posts(request):
     """Add latest blog posts to all templates"""
-    posts = BlogPost.objects.filter(is_published=True).order_by('-published_at')[:3]
     return {
-        'latest_blog_posts': posts
-    }
\ No newline at end of file
+        'latest_blog_posts': _lazy(request, 'latest_blog_posts')
+    }
@@ -0,0 +1,46 @@
+"""
+Staticfiles finder for the generated theme stylesheets.
+
+The stylesheets are written from core/theme_css.py into THEME_CSS_BUILD_DIR
+whenever the finder is asked for them, so ``collectstatic`` picks up the
+current palettes (and the manifest storage hashes and compresses them), and
+``runserver`` serves them in development.
+"""
+from pathlib import Path
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+from .theme_css import THEME_NAMES, build_theme_css, stylesheet_path
+
+
+def get_build_dir():
+    return Path(getattr(settings, 'THEME_CSS_BUILD_DIR', Path(settings.BASE_DIR) / 'build' / 'theme_css'))
+
+
+class ThemeStylesheetFinder(BaseFinder):
+    """Finds css/theme-<name>.css, compiling it first"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=str(get_build_dir()))
+        self.paths = {stylesheet_path(theme): theme for theme in THEME_NAMES}
+
+    def build(self, path):
+        """Write the stylesheet unless it is already current"""
+        target = get_build_dir() / path
+        css = build_theme_css(self.paths[path])
+        if not target.exists() or target.read_text() != css:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(css)
+        return str(target)
+
+    def find(self, path, all=False):
+        if path not in self.paths:
+            return []
+        found = self.build(path)
+        return [found] if all else found
+
+    def list(self, ignore_patterns):
+        for path in self.paths:
+            self.build(path)
+            yield path, self.storage
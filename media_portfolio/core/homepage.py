@@ -0,0 +1,159 @@
+"""
+Materialized homepage snapshot.
+
+Every section and statistic on the homepage is computed by
+``build_homepage_snapshot`` into plain dicts shaped like the objects the
+template reads (``project.thumbnail.url``, ``media.get_absolute_url``, ...)
+and stored in the cache. HomeView renders from that snapshot with a single
+cache read.
+
+Changes to HOMEPAGE_MODELS schedule a rebuild through the
+``rebuild_homepage_snapshot`` Celery task; a burst of saves within
+HOMEPAGE_REBUILD_DELAY seconds results in one rebuild.
+"""
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'homepage:snapshot'
+PENDING_KEY = 'homepage:rebuild_pending'
+
+DEFAULT_HOMEPAGE_MODELS = (
+    'projects.project',
+    'media.mediaitem',
+    'categories.category',
+    'comments.testimonial',
+    'blog.blogpost',
+)
+
+
+def get_homepage_models():
+    labels = getattr(settings, 'HOMEPAGE_MODELS', DEFAULT_HOMEPAGE_MODELS)
+    return {label.lower() for label in labels}
+
+
+def _file(field):
+    """{'url': ...} for a file field, or None when it is empty"""
+    if not field:
+        return None
+    try:
+        return {'url': field.url}
+    except ValueError:
+        return None
+
+
+def build_homepage_snapshot():
+    """Run every homepage query and return the serializable snapshot"""
+    from media_portfolio.media.models import MediaItem
+    from media_portfolio.categories.models import Category
+    from media_portfolio.comments.models import Testimonial
+    from media_portfolio.projects.models import Project
+    from media_portfolio.blog.models import BlogPost
+
+    published_media = MediaItem.objects.filter(is_published=True)
+    media_stats = published_media.aggregate(
+        total_media=models.Count('pk'),
+        total_videos=models.Count('pk', filter=models.Q(media_type='video')),
+        total_images=models.Count('pk', filter=models.Q(media_type='image')),
+    )
+
+    featured_projects = [
+        {
+            'title': project.title,
+            'short_summary': project.short_summary,
+            'technical_stack': project.technical_stack if isinstance(project.technical_stack, list) else [],
+            'stars_count': project.stars_count,
+            'thumbnail': _file(project.thumbnail),
+            'get_absolute_url': project.get_absolute_url(),
+        }
+        for project in Project.objects.filter(
+            is_published=True,
+            is_featured=True
+        ).order_by('-performance_score', '-published_date')[:3]
+    ]
+
+    recent_media = [
+        {
+            'title': media.title,
+            'media_type': media.media_type,
+            'file': _file(media.file),
+            'view_count': media.view_count,
+            'get_absolute_url': media.get_absolute_url(),
+        }
+        for media in published_media[:8]
+    ]
+
+    categories = [
+        {
+            'name': category.name,
+            'slug': category.slug,
+            'icon': category.icon,
+            'media_count': category.media_count,
+        }
+        for category in Category.objects.filter(
+            is_active=True
+        ).annotate(
+            media_count=models.Count('media_items')
+        )[:10]
+    ]
+
+    testimonials = [
+        {
+            'name': testimonial.name,
+            'title': testimonial.title,
+            'content': testimonial.content,
+            'rating': testimonial.rating,
+            'photo': _file(testimonial.photo),
+        }
+        for testimonial in Testimonial.objects.filter(featured=True)[:6]
+    ]
+
+    blog_posts = list(
+        BlogPost.objects.filter(is_published=True).order_by('-published_at').values(
+            'title', 'excerpt', 'cover_image', 'published_at', 'read_time_minutes',
+            'reactions_count', 'comments_count', 'external_url'
+        )[:3]
+    )
+
+    return {
+        'featured_projects': featured_projects,
+        'recent_media': recent_media,
+        'categories': categories,
+        'testimonials': testimonials,
+        'blog_posts': blog_posts,
+        'total_media': media_stats['total_media'],
+        'total_videos': media_stats['total_videos'],
+        'total_images': media_stats['total_images'],
+        'total_categories': Category.objects.filter(is_active=True).count(),
+        'total_projects': Project.objects.filter(is_published=True).count(),
+    }
+
+
+def rebuild_homepage_snapshot():
+    snapshot = build_homepage_snapshot()
+    cache.set(SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def get_homepage_snapshot():
+    """Return the cached snapshot, building it inline only on a cold cache"""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        logger.info("Homepage snapshot missing, building it inline")
+        snapshot = rebuild_homepage_snapshot()
+    return snapshot
+
+
+def schedule_homepage_rebuild():
+    """
+    Queue a snapshot rebuild unless one is already pending; the delay
+    collapses a burst of saves into one rebuild
+    """
+    from .tasks import rebuild_homepage
+
+    delay = getattr(settings, 'HOMEPAGE_REBUILD_DELAY', 10)
+    if cache.add(PENDING_KEY, 1, delay + 300):
+        rebuild_homepage.apply_async(countdown=delay)
@@ -0,0 +1,200 @@
+import json
+import math
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse, NoReverseMatch, URLPattern, URLResolver
+
+from media_portfolio.core.sitemaps import SECTIONS
+
+SKIPPED_NAMESPACES = {'admin'}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def iter_url_patterns(resolver=None, namespace=None):
+    """Yield (url name, pattern) for every named pattern, recursing into includes"""
+    resolver = resolver or get_resolver()
+    for entry in resolver.url_patterns:
+        if isinstance(entry, URLResolver):
+            child = entry.namespace or namespace
+            if entry.namespace and namespace:
+                child = f'{namespace}:{entry.namespace}'
+            if child in SKIPPED_NAMESPACES:
+                continue
+            yield from iter_url_patterns(entry, child)
+        elif isinstance(entry, URLPattern) and entry.name:
+            yield (f'{namespace}:{entry.name}' if namespace else entry.name), entry
+
+
+def _sample_object(model):
+    queryset = model._default_manager.order_by('pk')
+    field_names = {field.name for field in model._meta.get_fields()}
+    if 'is_published' in field_names:
+        queryset = queryset.filter(is_published=True)
+    elif 'is_active' in field_names:
+        queryset = queryset.filter(is_active=True)
+    return queryset.first()
+
+
+def sample_kwargs(pattern):
+    """
+    Concrete kwargs for a pattern with path converters, taken from the first
+    published row of the view's model; None when no sample exists
+    """
+    params = list(pattern.pattern.converters)
+    if not params:
+        return {}
+    if params == ['section', 'page']:
+        return {'section': next(iter(SECTIONS)), 'page': 1}
+
+    view_class = getattr(pattern.callback, 'view_class', None)
+    model = getattr(view_class, 'model', None)
+    if model is None:
+        return None
+    obj = _sample_object(model)
+    if obj is None:
+        return None
+    kwargs = {}
+    for param in params:
+        if param in ('slug', 'pk', 'id'):
+            kwargs[param] = getattr(obj, param if param != 'id' else 'pk')
+        else:
+            return None
+    return kwargs
+
+
+def accepts_get(pattern):
+    view_class = getattr(pattern.callback, 'view_class', None)
+    return view_class is None or hasattr(view_class, 'get')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every GET URL through the test client; compare with a saved JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per URL first')
+        parser.add_argument('--url', action='append', help='Only benchmark these URL names')
+        parser.add_argument(
+            '--baseline', type=str, default=str(Path(settings.BASE_DIR) / 'bench_baseline.json'),
+            help='Baseline JSON file to compare against'
+        )
+        parser.add_argument('--save', action='store_true', help='Write this run as the new baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Relative p95 slowdown reported as a regression (default 0.2 = 20%%)'
+        )
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+        client = Client(HTTP_HOST=host if host != '*' else 'localhost')
+
+        results = {}
+        for name, pattern in iter_url_patterns():
+            if options['url'] and name not in options['url']:
+                continue
+            if not accepts_get(pattern):
+                continue
+            kwargs = sample_kwargs(pattern)
+            if kwargs is None:
+                self.stdout.write(self.style.WARNING(f"  skip {name}: no sample arguments"))
+                continue
+            try:
+                url = reverse(name, kwargs=kwargs)
+            except NoReverseMatch:
+                self.stdout.write(self.style.WARNING(f"  skip {name}: cannot reverse"))
+                continue
+            results[name] = self.bench_url(client, url, options['warmup'], options['requests'])
+            self.report(name, results[name])
+
+        if not results:
+            raise CommandError("No URLs benchmarked")
+
+        baseline_path = Path(options['baseline'])
+        regressions = []
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            regressions = self.compare(baseline.get('results', {}), results, options['threshold'])
+
+        if options['save']:
+            baseline_path.write_text(json.dumps({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'requests': options['requests'],
+                'results': results,
+            }, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {baseline_path}"))
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} regressions: {', '.join(regressions)}")
+
+    def bench_url(self, client, url, warmup, requests):
+        for _ in range(warmup):
+            client.get(url)
+
+        timings = []
+        queries = []
+        sizes = []
+        status = None
+        for _ in range(requests):
+            with CaptureQueriesContext(connections['default']) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            sizes.append(len(body))
+            status = response.status_code
+
+        return {
+            'url': url,
+            'status': status,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries': max(queries),
+            'bytes': max(sizes),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"  {name:<32} {result['status']}  p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"{result['queries']:>4} queries  {result['bytes']:>9} bytes"
+        )
+
+    def compare(self, baseline, results, threshold):
+        """Print the diff against the baseline; return the names that regressed"""
+        self.stdout.write("\nCompared with baseline:")
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f"  {name:<32} new")
+                continue
+
+            p95_change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+            query_change = result['queries'] - before['queries']
+            byte_change = result['bytes'] - before['bytes']
+            line = (
+                f"  {name:<32} p95 {p95_change:+.0%}  queries {query_change:+d}  bytes {byte_change:+d}"
+            )
+            if p95_change > threshold or query_change > 0 or result['status'] != before['status']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line + '  REGRESSION'))
+            else:
+                self.stdout.write(line)
+
+        for name in baseline.keys() - results.keys():
+            self.stdout.write(f"  {name:<32} missing from this run")
+        return regressions
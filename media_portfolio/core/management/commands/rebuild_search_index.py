@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from media_portfolio.core.search import get_search_backend, get_registered_models
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for searchable models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', type=str, action='append',
+            help='Model label to reindex, e.g. projects.Project (default: all registered)'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        models = get_registered_models()
+
+        if options['model']:
+            try:
+                requested = [apps.get_model(label) for label in options['model']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            unregistered = [model for model in requested if model not in models]
+            if unregistered:
+                raise CommandError(f"Not searchable: {', '.join(m._meta.label for m in unregistered)}")
+            models = requested
+
+        self.stdout.write(f"Rebuilding search index with {type(backend).__name__}...")
+        for model in models:
+            count = backend.rebuild(model)
+            self.stdout.write(f"  {model._meta.label}: {count} rows indexed")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,264 @@
+import random
+from datetime import timedelta
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from media_portfolio.categories.models import Category
+from media_portfolio.projects.models import Project, ProjectLike, ProjectComment
+from media_portfolio.projects.facets import invalidate_facets
+from media_portfolio.projects.similarity import rebuild_similarities
+from media_portfolio.core.page_cache import invalidate_page_cache
+from media_portfolio.core.context_processors import invalidate_global_context
+from media_portfolio.core.homepage import SNAPSHOT_KEY
+from media_portfolio.core.conditional import touch_model
+from media_portfolio.core.threads import rebuild_paths
+from media_portfolio.core.comment_counts import refresh_comment_counts
+
+SEED_PREFIX = 'seed-'
+
+TECH_STACK = ['Django', 'Python', 'PostgreSQL', 'Redis', 'Celery', 'React', 'TypeScript', 'Docker', 'AWS', 'Go']
+API_INTEGRATIONS = ['Stripe', 'GitHub', 'OpenAI', 'Twilio', 'SendGrid', 'Google Maps']
+TAGS = ['web', 'api', 'ml', 'data', 'mobile', 'devops', 'saas', 'open-source']
+WORDS = (
+    'fast scalable portfolio media project system design cache query stream '
+    'image video client server render index search model view template'
+).split()
+
+
+def _sentence(rng, words=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _get_media_model():
+    try:
+        return apps.get_model('media', 'MediaItem')
+    except LookupError:
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset at scale for benchmarking (bulk inserts, no signals)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--projects', type=int, default=10000)
+        parser.add_argument('--media', type=int, default=100000)
+        parser.add_argument('--likes', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=200000, help='Threaded project comments')
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every count, e.g. 0.01 for a quick run')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+        parser.add_argument('--flush', action='store_true', help='Delete previously seeded rows first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        scale = options['scale']
+        counts = {
+            name: max(0, int(options[name] * scale))
+            for name in ('categories', 'projects', 'media', 'likes', 'comments')
+        }
+
+        if options['flush']:
+            self.flush()
+        elif Project.objects.filter(slug__startswith=SEED_PREFIX).exists():
+            raise CommandError("Seeded data already exists; pass --flush to replace it")
+
+        category_ids = self.seed_categories(counts['categories'])
+        project_ids = self.seed_projects(counts['projects'], category_ids)
+        self.seed_media(counts['media'], category_ids)
+        self.seed_likes(counts['likes'], project_ids)
+        self.seed_comments(counts['comments'], project_ids)
+
+        # bulk_create bypasses the signals that keep caches and counters current
+        if counts['likes']:
+            call_command('reconcile_like_counts', stdout=self.stdout)
+        call_command('rebuild_search_index', model=['projects.Project'], stdout=self.stdout)
+        self.stdout.write(f"  Related projects: {rebuild_similarities()} rows")
+        invalidate_facets()
+        invalidate_page_cache()
+        invalidate_global_context()
+        cache.delete(SNAPSHOT_KEY)
+        for model in (Category, Project, ProjectLike, ProjectComment, _get_media_model()):
+            if model is not None:
+                touch_model(model)
+
+        self.stdout.write(self.style.SUCCESS("Seeding complete"))
+
+    def flush(self):
+        media_model = _get_media_model()
+        if media_model is not None:
+            deleted, _ = media_model.objects.filter(slug__startswith=SEED_PREFIX).delete()
+            self.stdout.write(f"  Deleted {deleted} seeded media rows")
+        # Likes and comments cascade from projects
+        deleted, _ = Project.objects.filter(slug__startswith=SEED_PREFIX).delete()
+        self.stdout.write(f"  Deleted {deleted} seeded project rows")
+        Category.objects.filter(slug__startswith=SEED_PREFIX).delete()
+
+    def bulk_insert(self, model, rows):
+        """Insert an iterable of unsaved instances in batches; return their pks"""
+        pks = []
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                pks.extend(obj.pk for obj in self._insert(model, batch))
+                batch = []
+        if batch:
+            pks.extend(obj.pk for obj in self._insert(model, batch))
+        self.stdout.write(f"  {model._meta.label}: {len(pks)} rows")
+        return pks
+
+    def _insert(self, model, batch):
+        with transaction.atomic():
+            return model.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def seed_categories(self, count):
+        types = [value for value, _ in Category._meta.get_field('category_type').choices]
+        return self.bulk_insert(Category, (
+            Category(
+                name=f'Seed category {i}',
+                slug=f'{SEED_PREFIX}category-{i}',
+                category_type=self.rng.choice(types),
+                description=_sentence(self.rng, 12),
+            )
+            for i in range(count)
+        ))
+
+    def seed_projects(self, count, category_ids):
+        rng = self.rng
+        now = timezone.now()
+        levels = [value for value, _ in Project.DIFFICULTY_LEVELS]
+        project_ids = self.bulk_insert(Project, (
+            Project(
+                title=f'Seed project {i}',
+                slug=f'{SEED_PREFIX}project-{i}',
+                short_summary=_sentence(rng, 10)[:200],
+                description=' '.join(_sentence(rng, 12) for _ in range(5)),
+                technical_stack=rng.sample(TECH_STACK, rng.randint(1, 5)),
+                api_integrations=rng.sample(API_INTEGRATIONS, rng.randint(0, 3)),
+                tags=', '.join(rng.sample(TAGS, rng.randint(1, 4))),
+                difficulty_level=rng.choice(levels),
+                is_featured=rng.random() < 0.02,
+                performance_score=rng.randint(40, 100),
+                stars_count=int(rng.paretovariate(1.5)) - 1,
+                published_date=now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            )
+            for i in range(count)
+        ))
+
+        if category_ids:
+            through = Project.categories.through
+            self.bulk_insert(through, (
+                through(project_id=project_id, category_id=category_id)
+                for project_id in project_ids
+                for category_id in rng.sample(category_ids, min(len(category_ids), rng.randint(1, 3)))
+            ))
+        return project_ids
+
+    def seed_media(self, count, category_ids):
+        media_model = _get_media_model()
+        if media_model is None:
+            if count:
+                self.stdout.write(self.style.WARNING("  media app not installed; skipping media items"))
+            return []
+        return self.bulk_insert(media_model, (
+            self.build_instance(media_model, i, category_ids) for i in range(count)
+        ))
+
+    def build_instance(self, model, index, category_ids):
+        """
+        Fill every column that cannot be left to its default; used for models
+        whose exact schema this command does not hard-code
+        """
+        values = {}
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.has_default() or field.null:
+                continue
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                continue
+            if field.name == 'slug' or isinstance(field, models.SlugField):
+                values[field.attname] = f'{SEED_PREFIX}{model._meta.model_name}-{index}'
+            elif field.choices:
+                values[field.attname] = self.rng.choice(field.choices)[0]
+            elif isinstance(field, models.ForeignKey):
+                if field.related_model is not Category or not category_ids:
+                    raise CommandError(f"Cannot seed {model._meta.label}: no rows for {field.name}")
+                values[field.attname] = self.rng.choice(category_ids)
+            elif isinstance(field, models.FileField):
+                values[field.attname] = f'seed/{model._meta.model_name}-{index}.jpg'
+            elif isinstance(field, (models.DateTimeField, models.DateField)):
+                values[field.attname] = timezone.now()
+            elif isinstance(field, (models.IntegerField, models.FloatField, models.DecimalField)):
+                values[field.attname] = 0
+            elif isinstance(field, models.BooleanField):
+                values[field.attname] = True
+            elif isinstance(field, models.TextField):
+                values[field.attname] = _sentence(self.rng, 12)
+            elif isinstance(field, models.CharField):
+                values[field.attname] = f'Seed {model._meta.verbose_name} {index}'[:field.max_length]
+        return model(**values)
+
+    def seed_likes(self, count, project_ids):
+        if not project_ids:
+            return []
+        rng = self.rng
+        # Popularity follows a power law like real traffic
+        weights = [rng.paretovariate(1.2) for _ in project_ids]
+        chosen = rng.choices(project_ids, weights=weights, k=count)
+        return self.bulk_insert(ProjectLike, (
+            ProjectLike(
+                project_id=project_id,
+                session_key=f'seed{i:036x}',
+                ip_address=f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}',
+            )
+            for i, project_id in enumerate(chosen)
+        ))
+
+    def seed_comments(self, count, project_ids):
+        """Top-level comments first, then replies in rounds so parents have pks"""
+        if not project_ids:
+            return []
+        rng = self.rng
+        top_level = int(count * 0.6)
+        projects = [rng.choice(project_ids) for _ in range(top_level)]
+        created = self.bulk_insert(ProjectComment, (
+            self.build_comment(i, project_id, None) for i, project_id in enumerate(projects)
+        ))
+        # pk -> project id, so replies stay on their parent's project
+        parents = dict(zip(created, projects))
+
+        # Each round replies to half of the previous one, so threads get deeper
+        remaining = count - top_level
+        offset = top_level
+        while remaining > 0 and parents:
+            round_size = min(remaining, max(1, len(parents) // 2))
+            parent_ids = rng.choices(list(parents), k=round_size)
+            reply_ids = self.bulk_insert(ProjectComment, (
+                self.build_comment(offset + i, parents[parent_id], parent_id)
+                for i, parent_id in enumerate(parent_ids)
+            ))
+            parents = dict(zip(reply_ids, (parents[parent_id] for parent_id in parent_ids)))
+            remaining -= round_size
+            offset += round_size
+
+        # bulk_create skips save(), which maintains the materialized paths
+        rebuild_paths(ProjectComment, ProjectComment.objects.filter(project__slug__startswith=SEED_PREFIX))
+        # ... and the approved comment counters
+        refresh_comment_counts(ProjectComment, project_ids)
+        return created
+
+    def build_comment(self, index, project_id, parent_id):
+        return ProjectComment(
+            project_id=project_id,
+            parent_id=parent_id,
+            name=f'Visitor {index}',
+            email=f'visitor{index}@example.com',
+            content=_sentence(self.rng, self.rng.randint(5, 30)),
+            is_approved=self.rng.random() < 0.9,
+            ip_address='10.0.0.1',
+        )
@@ -0,0 +1,178 @@
+import random
+from contextlib import ExitStack
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.urls import resolve, Resolver404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .conditional import get_view_models, make_validators
+from .sql_profile import QueryRecorder, get_sample_rate, record_profile
+from .page_cache import (
+    CSRF_PLACEHOLDER,
+    get_view_cache_timeout,
+    page_cache_key,
+    strip_csrf_tokens
+)
+
+
+class SQLProfilerMiddleware:
+    """
+    Time and fingerprint the queries of a sampled fraction of requests and
+    aggregate them per view (see core/sql_profile.py)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_sample_rate()
+        if rate <= 0 or random.random() >= rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        record_profile(self.get_view_name(request), recorder)
+        return response
+
+    def get_view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            # Answered by middleware (304, page cache hit) before URL resolution
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return 'unresolved'
+        return match.view_name or match._func_path
+
+
+def is_anonymous_without_messages(request):
+    """
+    True for visitors that are not logged in and have no pending flash
+    messages. Only visitors with a session cookie cost a session lookup.
+    """
+    if CookieStorage.cookie_name in request.COOKIES:
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        if request.user.is_authenticated or '_messages' in request.session:
+            return False
+    return True
+
+
+class ModelConditionalGetMiddleware:
+    """
+    ETag / Last-Modified for views declared with @conditional_models.
+
+    The view is resolved up front so a matching If-None-Match or
+    If-Modified-Since gets a 304 before the view (or the page cache) runs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        labels = self.get_models(request)
+        if labels is None:
+            return self.get_response(request)
+
+        etag, last_modified = make_validators(request, labels)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.get_response(request)
+            if response.status_code != 200 or response.has_header('ETag'):
+                return response
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Always revalidate; never store in shared caches (pages carry CSRF tokens)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_models(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        labels = get_view_models(match.func)
+        if labels is None or not is_anonymous_without_messages(request):
+            return None
+        return labels
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve opted-in pages to anonymous visitors from the cache.
+
+    Must come after the session, CSRF, auth and messages middleware so that
+    a cache hit still gets its CSRF cookie and so a session cookie can be
+    checked for a logged-in user or pending messages.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            return self.build_cached_response(request, entry)
+
+        response = self.get_response(request)
+        timeout = getattr(request, '_page_cache_timeout', None)
+        if timeout is not None and self.is_cacheable_response(request, response):
+            self.store(key, response, timeout)
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._page_cache_timeout = get_view_cache_timeout(view_func)
+
+    def is_cacheable_request(self, request):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+            return False
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        return is_anonymous_without_messages(request)
+
+    def is_cacheable_response(self, request, response):
+        if request.method != 'GET' or response.status_code != 200 or response.streaming:
+            return False
+        if response.cookies:
+            return False
+        if getattr(request, 'session', None) is not None and request.session.modified:
+            return False
+        messages = getattr(request, '_messages', None)
+        if messages is not None and getattr(messages, 'added_new', False):
+            return False
+        return True
+
+    def store(self, key, response, timeout):
+        content, has_csrf = strip_csrf_tokens(response.content)
+        cache.set(key, {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'csrf': has_csrf,
+        }, timeout)
+
+    def build_cached_response(self, request, entry):
+        content = entry['content']
+        if entry['csrf']:
+            # The visitor's own token; also makes CsrfViewMiddleware set the cookie
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+
+        response = HttpResponse(content, content_type=entry['content_type'])
+        response['X-Page-Cache'] = 'HIT'
+        patch_vary_headers(response, ('Cookie',))
+        return response
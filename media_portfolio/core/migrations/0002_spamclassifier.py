@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-17 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpamClassifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spam_documents', models.PositiveIntegerField(default=0)),
+                ('ham_documents', models.PositiveIntegerField(default=0)),
+                ('feature_counts', models.BinaryField(blank=True, default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Spam Classifier',
+                'verbose_name_plural': 'Spam Classifier',
+            },
+        ),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
+import logging
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
+from .utils import allocate_unique_slug
+from .threads import MAX_DEPTH, move_subtree, path_segment
+
+logger = logging.getLogger(__name__)
 
 
 class BaseModel(models.Model):
@@ -17,6 +22,181 @@ class BaseModel(models.Model):
         ordering = ['sort_order', '-created_at']
 
 
+class UniqueSlugMixin:
+    """
+    Keep ``slug`` unique on save.
+
+    A blank slug is generated from ``slug_source_field``; a taken one gets
+    the next free numeric suffix. Re-saving a loaded row whose slug did not
+    change skips the lookup. If a concurrent insert grabs the same slug the
+    save is retried in a savepoint with a freshly allocated one.
+    """
+    slug_field = 'slug'
+    slug_source_field = 'title'
+    slug_max_attempts = 5
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_slug = instance.__dict__.get(cls.slug_field)
+        return instance
+
+    def _slug_is_current(self):
+        """Already saved with this (non-empty) slug; nothing to allocate"""
+        slug = getattr(self, self.slug_field)
+        return bool(slug) and self.pk is not None and slug == getattr(self, '_saved_slug', None)
+
+    def _allocate_slug(self):
+        current = getattr(self, self.slug_field)
+        value = current or getattr(self, self.slug_source_field)
+        setattr(self, self.slug_field, allocate_unique_slug(
+            type(self), value, self.slug_field, exclude_pk=self.pk
+        ))
+
+    def _slug_is_taken(self):
+        return type(self)._default_manager.filter(
+            **{self.slug_field: getattr(self, self.slug_field)}
+        ).exclude(pk=self.pk).exists()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.slug_field not in update_fields:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(self.slug_max_attempts):
+            if attempt or not self._slug_is_current():
+                self._allocate_slug()
+            try:
+                with transaction.atomic():
+                    result = super().save(*args, **kwargs)
+                self._saved_slug = getattr(self, self.slug_field)
+                return result
+            except IntegrityError:
+                # Only retry slug races; other constraint errors propagate
+                if attempt == self.slug_max_attempts - 1 or not self._slug_is_taken():
+                    raise
+
+
+class ThreadedModel(models.Model):
+    """
+    Materialized path for self-referencing threads (see core/threads.py).
+
+    Subclasses need a nullable ``parent`` ForeignKey to themselves and may
+    name the object their threads belong to in ``thread_scope``. ``path``
+    and ``depth`` are maintained on save, including when a comment is moved
+    to another parent; replies beyond MAX_DEPTH become siblings of their
+    parent instead (logged). A new row's path needs its primary key, so it
+    is written right after the INSERT: post_save receivers of a create see
+    the final ``depth`` but an empty ``path``. Saves of existing rows write
+    both in the same UPDATE.
+    """
+    path = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    thread_scope = None
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_parent_id = instance.__dict__.get('parent_id')
+        return instance
+
+    def _path_is_current(self):
+        return bool(self.path) and self.parent_id == getattr(self, '_saved_parent_id', None)
+
+    def save(self, *args, **kwargs):
+        if self._path_is_current():
+            return super().save(*args, **kwargs)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'path', 'depth'}
+
+        manager = type(self)._default_manager
+        with transaction.atomic():
+            parent = None
+            if self.parent_id:
+                parent = manager.values('path', 'depth', 'parent_id').get(pk=self.parent_id)
+                if self.path and parent['path'].startswith(self.path):
+                    raise ValueError("A comment cannot be moved under its own reply")
+                if parent['depth'] >= MAX_DEPTH:
+                    logger.warning(
+                        f"{type(self).__name__} {self.pk or '(new)'}: parent {self.parent_id} is at the "
+                        f"maximum depth ({MAX_DEPTH}); replying to {parent['parent_id']} instead"
+                    )
+                    self.parent_id = parent['parent_id']
+                    parent = manager.values('path', 'depth').get(pk=self.parent_id)
+
+            old_path, old_depth = self.path, self.depth
+            prefix = parent['path'] if parent else ''
+            self.depth = parent['depth'] + 1 if parent else 0
+            if self.pk is not None:
+                self.path = prefix + path_segment(self.pk)
+                if old_path and old_path != self.path:
+                    deepest = manager.filter(path__startswith=old_path).aggregate(
+                        deepest=models.Max('depth')
+                    )['deepest'] or old_depth
+                    if deepest + self.depth - old_depth > MAX_DEPTH:
+                        self.path, self.depth = old_path, old_depth
+                        raise ValueError(
+                            f"Moving this comment would nest its replies deeper than {MAX_DEPTH} levels"
+                        )
+                super().save(*args, **kwargs)
+                if old_path and old_path != self.path:
+                    # The row itself is done; re-root its replies
+                    move_subtree(type(self), old_path, self.path, self.depth - old_depth)
+            else:
+                self.path = ''
+                super().save(*args, **kwargs)
+                self.path = prefix + path_segment(self.pk)
+                manager.filter(pk=self.pk).update(path=self.path)
+            self._saved_parent_id = self.parent_id
+
+
+class SpamScoredModel(models.Model):
+    """
+    Submissions scored by the spam classifier (see core/spam.py).
+
+    Subclasses name the text to score in ``spam_text_fields`` and need an
+    ``is_spam`` flag. ``spam_score`` is the probability of spam, set by a
+    Celery task after the submission is saved; ``spam_trained_as`` records
+    which class the row currently contributes to the classifier, so
+    relabelled rows can be retrained incrementally.
+    """
+    SPAM, HAM = 1, 0
+
+    spam_score = models.FloatField(null=True, blank=True, editable=False)
+    spam_auto_flagged = models.BooleanField(default=False, editable=False)
+    spam_trained_as = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+
+    spam_text_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def spam_label_filters(cls):
+        """(spam, ham) filters for rows a moderator has labelled"""
+        return (
+            models.Q(is_spam=True, spam_auto_flagged=False),
+            models.Q(is_approved=True, is_spam=False),
+        )
+
+    @classmethod
+    def flag_spam(cls, queryset):
+        """Flag rows the classifier is confident about"""
+        if hasattr(cls, 'counter_target'):
+            # Comments: keep the counters and caches current
+            from .comment_counts import moderate_comments
+            moderate_comments(queryset, is_spam=True, is_approved=False, spam_auto_flagged=True)
+        else:
+            queryset.update(is_spam=True, spam_auto_flagged=True)
+
+    def get_spam_text(self):
+        return '\n'.join(str(getattr(self, field) or '') for field in self.spam_text_fields)
+
+
 class SiteSettings(models.Model):
     """
     Global site settings
@@ -63,4 +243,29 @@ class SiteSettings(models.Model):
         # Ensure only one instance exists
         if not self.pk and SiteSettings.objects.exists():
             return
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_current(cls):
+        """The settings row (or None), served from a per-process cache"""
+        from .site_settings import get_site_settings
+        return get_site_settings()
+
+
+class SpamClassifier(models.Model):
+    """
+    Naive Bayes token counts for the spam classifier (core/spam.py), kept
+    in a single row and updated incrementally
+    """
+    spam_documents = models.PositiveIntegerField(default=0)
+    ham_documents = models.PositiveIntegerField(default=0)
+    feature_counts = models.BinaryField(blank=True, default=b'')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'core'
+        verbose_name = "Spam Classifier"
+        verbose_name_plural = "Spam Classifier"
+
+    def __str__(self):
+        return f"Spam classifier ({self.spam_documents} spam, {self.ham_documents} ham)"
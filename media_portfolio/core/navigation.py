@@ -0,0 +1,67 @@
+"""
+Previous/next navigation for detail pages in a single query.
+
+LAG/LEAD over the navigation ordering give every row the pk of its
+neighbors; filtering on those window columns (Django wraps the query in a
+subquery) returns just the two neighbor rows of the current object.
+"""
+from django.db.models import F, Q, Window
+from django.db.models.functions import Lag, Lead
+
+
+def _order_expressions(ordering):
+    expressions = []
+    for name in ordering:
+        if name.startswith('-'):
+            expressions.append(F(name[1:]).desc())
+        else:
+            expressions.append(F(name).asc())
+    return expressions
+
+
+def get_adjacent_objects(queryset, obj, ordering=('published_date', 'id')):
+    """
+    Return (previous, next) of ``obj`` within ``queryset`` sorted by ``ordering``.
+    The ordering should end in a unique column so ties are resolved.
+    """
+    order_by = _order_expressions(ordering)
+    neighbors = queryset.order_by().annotate(
+        nav_prev_pk=Window(Lag('pk'), order_by=order_by),
+        nav_next_pk=Window(Lead('pk'), order_by=order_by),
+    ).filter(
+        Q(nav_next_pk=obj.pk) | Q(nav_prev_pk=obj.pk)
+    )
+
+    previous = next_ = None
+    for neighbor in neighbors:
+        if neighbor.nav_next_pk == obj.pk:
+            previous = neighbor
+        if neighbor.nav_prev_pk == obj.pk:
+            next_ = neighbor
+    return previous, next_
+
+
+class AdjacentNavigationMixin:
+    """
+    DetailView mixin adding ``prev_object``/``next_object`` to the context,
+    plus ``prev_<context_object_name>``/``next_<context_object_name>``.
+    """
+    navigation_ordering = ('published_date', 'id')
+
+    def get_navigation_queryset(self):
+        # Neighbors only need their own columns, not the detail prefetches
+        return self.get_queryset().prefetch_related(None).select_related(None)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        previous, next_ = get_adjacent_objects(
+            self.get_navigation_queryset(), self.object, self.navigation_ordering
+        )
+        context['prev_object'] = previous
+        context['next_object'] = next_
+
+        name = self.get_context_object_name(self.object)
+        if name:
+            context[f'prev_{name}'] = previous
+            context[f'next_{name}'] = next_
+        return context
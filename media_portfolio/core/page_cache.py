@@ -0,0 +1,87 @@
+"""
+Full-page cache for anonymous visitors.
+
+Views opt in with ``@cache_anonymous_page()``. Rendered HTML is stored per
+URL and theme cookie, and served by ``AnonymousPageCacheMiddleware`` without
+running the view. Per-visitor bits are kept out of the cached copy:
+
+* CSRF tokens in forms are replaced by a placeholder and filled in from the
+  visitor's own token when the page is served;
+* liked state and view recording come from a small JSON fragments endpoint;
+* requests with flash messages or a logged-in user bypass the cache.
+
+All entries are invalidated at once by bumping a cache version whenever one
+of ``PAGE_CACHE_MODELS`` is saved or deleted (see core/signals.py).
+"""
+import re
+import hashlib
+from django.conf import settings
+from .cache_versions import get_cache_version, bump_cache_version
+
+PAGE_CACHE_NAMESPACE = 'page_cache'
+THEMES = ('light', 'dark', 'system')
+THEME_COOKIE = 'theme'
+
+CSRF_PLACEHOLDER = b'__csrf_token_placeholder__'
+CSRF_INPUT_RE = re.compile(rb'(name=["\']csrfmiddlewaretoken["\'] value=["\'])[^"\']*(["\'])')
+
+DEFAULT_PAGE_CACHE_MODELS = (
+    'projects.project',
+    'projects.projectcomment',
+    'categories.category',
+    'collections.collection',
+    'blog.blogpost',
+    'comments.comment',
+    'comments.testimonial',
+    'core.sitesettings',
+    'media.mediaitem',
+)
+
+
+def cache_anonymous_page(timeout=None):
+    """
+    Mark a view (function or class-based) as cacheable for anonymous visitors
+    Usage: @cache_anonymous_page() or @cache_anonymous_page(timeout=300)
+    """
+    def decorator(view):
+        view.anonymous_page_cache = True
+        view.page_cache_timeout = timeout
+        return view
+    return decorator
+
+
+def get_view_cache_timeout(view_func):
+    """Return the cache timeout for an opted-in view, or None if it did not opt in"""
+    view = getattr(view_func, 'view_class', view_func)
+    if not getattr(view, 'anonymous_page_cache', False):
+        return None
+    timeout = getattr(view, 'page_cache_timeout', None)
+    return timeout if timeout is not None else getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+
+def get_page_cache_models():
+    labels = getattr(settings, 'PAGE_CACHE_MODELS', DEFAULT_PAGE_CACHE_MODELS)
+    return {label.lower() for label in labels}
+
+
+def get_request_theme(request):
+    """The visitor's theme, from a plain cookie so reading it never loads a session"""
+    theme = request.COOKIES.get(THEME_COOKIE)
+    return theme if theme in THEMES else 'system'
+
+
+def page_cache_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    version = get_cache_version(PAGE_CACHE_NAMESPACE)
+    return f'pagecache:{version}:{get_request_theme(request)}:{url}'
+
+
+def strip_csrf_tokens(content):
+    """Replace form CSRF token values with a placeholder; returns (content, replaced)"""
+    content, count = CSRF_INPUT_RE.subn(rb'\1' + CSRF_PLACEHOLDER + rb'\2', content)
+    return content, count > 0
+
+
+def invalidate_page_cache():
+    """Drop every cached page"""
+    bump_cache_version(PAGE_CACHE_NAMESPACE)
@@ -0,0 +1,177 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by an opaque signed cursor holding the ordering values
+of the row at the page boundary, so deep pages cost the same as the first
+one and no COUNT query is needed: one extra row is fetched to know whether
+another page exists.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from django.core import signing
+from django.db.models import Q
+from django.http import Http404
+
+CURSOR_SALT = 'media_portfolio.core.pagination'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _serialize(value):
+    # isoformat keeps microseconds, which keyset equality depends on
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class CursorPage:
+    """
+    One page of a CursorPaginator. Quacks like a Django Page where it can.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.number = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``, e.g. ('-is_featured', '-published_date', 'id').
+
+    The ordering must end in a unique column; the primary key is appended if
+    it is missing. Ordering columns must not be nullable.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = self._normalize_ordering(queryset.model, ordering)
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    @staticmethod
+    def _normalize_ordering(model, ordering):
+        ordering = list(ordering)
+        pk_names = {'pk', 'id', model._meta.pk.name}
+        if not any(name.lstrip('-') in pk_names for name in ordering):
+            ordering.append('pk')
+        return ordering
+
+    def _model_field_name(self, name):
+        return self.queryset.model._meta.pk.name if name == 'pk' else name
+
+    def encode_cursor(self, obj, direction):
+        values = [_serialize(getattr(obj, self._model_field_name(name))) for name, _ in self.fields]
+        return signing.dumps({'v': values, 'd': direction}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+            raw_values, direction = payload['v'], payload['d']
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+        if direction not in ('next', 'prev') or len(raw_values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor')
+
+        values = []
+        for (name, _), raw in zip(self.fields, raw_values):
+            field = self.queryset.model._meta.get_field(self._model_field_name(name))
+            try:
+                values.append(field.to_python(raw))
+            except Exception:
+                raise InvalidCursor('Invalid cursor')
+        return values, direction
+
+    def _after(self, values, reverse):
+        """Q matching rows strictly after ``values`` in (possibly reversed) ordering"""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != reverse else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[i]})
+            for j in range(i):
+                step &= Q(**{self.fields[j][0]: values[j]})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        """Return the page after (or before) ``cursor``; the first page if None"""
+        direction = 'next'
+        queryset = self.queryset
+        if cursor:
+            values, direction = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._after(values, reverse=direction == 'prev'))
+
+        reverse = direction == 'prev'
+        ordering = [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ] if reverse else self.ordering
+
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if cursor and (has_more or not reverse):
+                previous_cursor = self.encode_cursor(rows[0], 'prev')
+        return CursorPage(rows, self, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+
+class CursorPaginationMixin:
+    """
+    Opt-in keyset pagination for ListView.
+
+    Set ``cursor_ordering`` (or override ``get_cursor_ordering``) to enable it.
+    Requests carrying ``?page=`` keep the regular page-number paginator so
+    existing links and page-number UIs continue to work.
+    """
+    cursor_ordering = None
+    cursor_kwarg = 'cursor'
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def uses_cursor_pagination(self):
+        if self.get_cursor_ordering() is None:
+            return False
+        return self.page_kwarg not in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.get_cursor_ordering())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return (paginator, page, page.object_list, page.has_other_pages())
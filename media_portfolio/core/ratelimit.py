@@ -0,0 +1,154 @@
+"""
+Per-client rate limits for write endpoints.
+
+A sliding window approximated from two fixed windows: the hits of the
+current window plus the previous window's hits weighted by how much of it
+still overlaps the sliding one. Hits are counted with an atomic INCR on the
+configured cache; if that cache is unavailable, a local-memory cache takes
+over so limits still hold per process. Limits come from RATE_LIMITS::
+
+    @method_decorator(rate_limit('comment'), name='post')
+    class AddCommentView(View): ...
+
+The check runs before the view, so a rejected request costs no queries.
+"""
+import hashlib
+import ipaddress
+import logging
+import math
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit'
+
+DEFAULT_RATES = {
+    'like': '30/m',
+    'comment': '5/m',
+    'contact': '3/10m',
+    'theme': '20/m',
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_local_cache = LocMemCache('ratelimit', {})
+
+
+def get_client_ip(request):
+    """
+    The client address. Behind RATE_LIMIT_TRUSTED_PROXIES reverse proxies it
+    is the X-Forwarded-For hop the outermost proxy appended; hops further
+    left are whatever the client sent and cannot be trusted.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+    if not proxies:
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if len(hops) < proxies:
+        # Did not come through every proxy
+        return remote_addr
+    try:
+        return str(ipaddress.ip_address(hops[-proxies]))
+    except ValueError:
+        return remote_addr
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60); '3/10m' -> (3, 600)"""
+    count, period = rate.split('/')
+    multiplier = int(period[:-1] or 1)
+    return int(count), multiplier * PERIODS[period[-1]]
+
+
+def get_rate(name):
+    rates = {**DEFAULT_RATES, **getattr(settings, 'RATE_LIMITS', {})}
+    rate = rates.get(name)
+    return parse_rate(rate) if rate else None
+
+
+def hit(name, ident, limit, window):
+    """
+    Count a hit of ``ident`` on the ``name`` limit. Returns the seconds to
+    wait before retrying, or 0 if the hit is allowed. Rejected hits count
+    too, so a client that keeps hammering stays blocked.
+    """
+    now = time.time()
+    index, elapsed = divmod(now, window)
+    digest = hashlib.md5(str(ident).encode()).hexdigest()
+    base = f'{KEY_PREFIX}:{name}:{digest}'
+    current_key, previous_key = f'{base}:{int(index)}', f'{base}:{int(index) - 1}'
+
+    current = _count(current_key, window * 2)
+    previous = _peek(previous_key)
+
+    # Share of the previous window still inside the sliding window
+    weight = (window - elapsed) / window
+    if previous * weight + current <= limit:
+        return 0
+
+    if current > limit:
+        # Wait for this window to end and its weight to decay below the limit
+        wait = (window - elapsed) + window * (1 - limit / current)
+    else:
+        wait = (window - elapsed) - (limit - current) * window / previous
+    return max(1, math.ceil(wait))
+
+
+def _incr(backend, key, timeout):
+    backend.add(key, 0, timeout)
+    try:
+        return backend.incr(key)
+    except ValueError:
+        # Evicted or expired between add and incr
+        backend.set(key, 1, timeout)
+        return 1
+
+
+def _count(key, timeout):
+    try:
+        return _incr(cache, key, timeout)
+    except Exception as e:
+        logger.warning(f"Rate limit cache unavailable, using local memory: {str(e)}")
+        return _incr(_local_cache, key, timeout)
+
+
+def _peek(key):
+    try:
+        return cache.get(key, 0)
+    except Exception:
+        return _local_cache.get(key, 0)
+
+
+def rate_limited_response(request, retry_after):
+    message = 'Too many requests. Please try again later.'
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = JsonResponse({'success': False, 'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(name):
+    """
+    Limit a view to RATE_LIMITS[name] hits per client IP
+    Usage: @method_decorator(rate_limit('like'), name='post')
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            rate = get_rate(name)
+            if rate:
+                retry_after = hit(name, get_client_ip(request), *rate)
+                if retry_after:
+                    logger.info(f"Rate limit '{name}' hit by {get_client_ip(request)}")
+                    return rate_limited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
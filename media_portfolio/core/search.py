@@ -0,0 +1,252 @@
+"""
+Pluggable full-text search for listing filters.
+
+Models opt in with ``register(Model)``; the model declares
+``search_fields = {'field': weight}`` with weights 'A' (highest) to 'D'.
+
+* PostgreSQL: a ``search_vector`` tsvector column with a GIN index
+  (``SearchVectorIndex`` in the model's Meta.indexes), kept up to date by
+  post_save and ranked with ``SearchRank``.
+* SQLite: an FTS5 shadow table ``<db_table>_fts`` kept in sync by signals and
+  ranked with bm25(). Only the best ``SEARCH_MAX_RESULTS`` matches (default
+  500) are returned.
+* Anything else: the old OR of ``icontains`` lookups, unranked.
+
+``get_search_backend()`` picks the backend from the database vendor unless
+``settings.SEARCH_BACKEND`` names one explicitly.
+"""
+import re
+import logging
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connection
+from django.db.models import Index
+from django.db.models import Q, F, Case, When, Value, FloatField
+from django.db.models.signals import post_save, post_delete
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS = ('A', 'B', 'C', 'D')
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+_registry = []
+_backend = None
+
+
+class SearchVectorIndex(GinIndex):
+    """
+    GIN index on a ``search_vector`` column. Only PostgreSQL has GIN; other
+    databases get a plain index so the same migrations (and SQLite table
+    rebuilds) run everywhere.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
+def register(model):
+    """Make a model searchable and keep its index in sync on save/delete"""
+    if model in _registry:
+        return
+    for field, weight in model.search_fields.items():
+        if weight not in WEIGHTS:
+            raise ValueError(f"{model.__name__}.search_fields['{field}'] has invalid weight {weight!r}")
+    _registry.append(model)
+    post_save.connect(_index_on_save, sender=model, dispatch_uid=f'search_index_{model._meta.label_lower}')
+    post_delete.connect(_remove_on_delete, sender=model, dispatch_uid=f'search_remove_{model._meta.label_lower}')
+
+
+def get_registered_models():
+    return list(_registry)
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite' and SQLiteFTSSearchBackend.is_available():
+            _backend = SQLiteFTSSearchBackend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
+
+
+def _index_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        get_search_backend().index_instance(instance)
+    except Exception as e:
+        logger.error(f"Search indexing failed for {sender.__name__} {instance.pk}: {str(e)}")
+
+
+def _remove_on_delete(sender, instance, **kwargs):
+    try:
+        get_search_backend().remove_instance(sender, instance.pk)
+    except Exception as e:
+        logger.error(f"Search index removal failed for {sender.__name__} {instance.pk}: {str(e)}")
+
+
+class SimpleSearchBackend:
+    """
+    Unindexed fallback: OR of icontains over the search fields
+    """
+    ranked = False
+
+    def search(self, queryset, query):
+        condition = Q()
+        for field in queryset.model.search_fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+    def index_instance(self, instance):
+        pass
+
+    def remove_instance(self, model, pk):
+        pass
+
+    def rebuild(self, model):
+        return 0
+
+
+class PostgresSearchBackend:
+    """
+    tsvector column + GIN index, ranked with SearchRank
+    """
+    ranked = True
+    vector_field = 'search_vector'
+
+    @property
+    def config(self):
+        return getattr(settings, 'SEARCH_CONFIG', 'english')
+
+    def get_vector(self, model):
+        from django.contrib.postgres.search import SearchVector
+        vector = None
+        for field, weight in model.search_fields.items():
+            part = SearchVector(field, weight=weight, config=self.config)
+            vector = part if vector is None else vector + part
+        return vector
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        search_query = SearchQuery(query, search_type='websearch', config=self.config)
+        return queryset.annotate(
+            search_rank=SearchRank(F(self.vector_field), search_query)
+        ).filter(
+            **{self.vector_field: search_query}
+        ).order_by('-search_rank', '-pk')
+
+    def index_instance(self, instance):
+        model = type(instance)
+        model.objects.filter(pk=instance.pk).update(**{self.vector_field: self.get_vector(model)})
+
+    def remove_instance(self, model, pk):
+        pass  # The vector lives on the row itself
+
+    def rebuild(self, model):
+        return model.objects.update(**{self.vector_field: self.get_vector(model)})
+
+
+class SQLiteFTSSearchBackend:
+    """
+    FTS5 shadow table per model, ranked with bm25()
+    """
+    ranked = True
+
+    @property
+    def max_results(self):
+        # bm25() ranks every match; only the best ones are worth filtering on
+        return getattr(settings, 'SEARCH_MAX_RESULTS', 500)
+
+    @staticmethod
+    def is_available():
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            return any('FTS5' in row[0] for row in cursor.fetchall())
+
+    @staticmethod
+    def table_name(model):
+        return f'{model._meta.db_table}_fts'
+
+    def ensure_table(self, model):
+        columns = ', '.join(model.search_fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table_name(model)} '
+                f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    @staticmethod
+    def build_match(query):
+        """Quote every term so user input cannot inject FTS5 syntax; prefix-match each"""
+        terms = re.findall(r'\w+', query)
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        model = queryset.model
+        match = self.build_match(query)
+        if not match:
+            return queryset.none()
+
+        table = self.table_name(model)
+        weights = ', '.join(str(BM25_WEIGHTS[weight]) for weight in model.search_fields.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({table}, {weights}) AS score FROM {table} '
+                f'WHERE {table} MATCH %s ORDER BY score LIMIT %s',
+                [match, self.max_results]
+            )
+            rows = cursor.fetchall()
+
+        if not rows:
+            return queryset.none()
+
+        # bm25() is lower-is-better; flip it so rank sorts like SearchRank
+        return queryset.filter(
+            pk__in=[pk for pk, _ in rows]
+        ).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(-score)) for pk, score in rows],
+                output_field=FloatField()
+            )
+        ).order_by('-search_rank', '-pk')
+
+    def index_instance(self, instance):
+        model = type(instance)
+        table = self.table_name(model)
+        fields = list(model.search_fields)
+        values = [getattr(instance, field) or '' for field in fields]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(fields))})',
+                [instance.pk] + values
+            )
+
+    def remove_instance(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table_name(model)} WHERE rowid = %s', [pk])
+
+    def rebuild(self, model):
+        self.ensure_table(model)
+        table = self.table_name(model)
+        fields = list(model.search_fields)
+        columns = ', '.join(
+            f"COALESCE({model._meta.get_field(field).column}, '')" for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+                f'SELECT {model._meta.pk.column}, {columns} FROM {model._meta.db_table}'
+            )
+            return cursor.rowcount
@@ -0,0 +1,77 @@
+"""
+"Already viewed" tracking for anonymous visitors without a session.
+
+A small Bloom filter over "<model label>:<pk>" lives in a signed cookie, so
+counting a view once per visitor needs neither a session row nor a cache
+lookup. False positives (a first view treated as a repeat) stay around 1%
+until SEEN_COOKIE_CAPACITY objects were added; the filter then starts over.
+"""
+import base64
+import hashlib
+from django.conf import settings
+
+COOKIE_SALT = 'media_portfolio.seen'
+FILTER_BITS = 1024
+HASH_COUNT = 4
+
+
+def get_cookie_name():
+    return getattr(settings, 'SEEN_COOKIE_NAME', 'seen')
+
+
+class SeenFilter:
+    """Bloom filter of viewed objects, loaded from and saved to a cookie"""
+
+    def __init__(self, bits=None, count=0):
+        self.bits = bytearray(bits or bytes(FILTER_BITS // 8))
+        self.count = count
+        self.changed = False
+
+    @classmethod
+    def from_request(cls, request):
+        value = request.get_signed_cookie(
+            get_cookie_name(), default=None, salt=COOKIE_SALT,
+            max_age=getattr(settings, 'SEEN_COOKIE_MAX_AGE', 86400)
+        )
+        if value:
+            try:
+                count, encoded = value.split(':', 1)
+                bits = base64.urlsafe_b64decode(encoded)
+                if len(bits) == FILTER_BITS // 8:
+                    return cls(bits, int(count))
+            except ValueError:
+                pass
+        return cls()
+
+    def _positions(self, instance):
+        key = f'{instance._meta.label_lower}:{instance.pk}'.encode()
+        digest = hashlib.blake2b(key, digest_size=HASH_COUNT * 2).digest()
+        for i in range(HASH_COUNT):
+            yield int.from_bytes(digest[i * 2:i * 2 + 2], 'big') % FILTER_BITS
+
+    def __contains__(self, instance):
+        return all(self.bits[pos // 8] & (1 << pos % 8) for pos in self._positions(instance))
+
+    def add(self, instance):
+        """Add ``instance``; return True if it was not (probably) seen before"""
+        if instance in self:
+            return False
+        if self.count >= getattr(settings, 'SEEN_COOKIE_CAPACITY', 100):
+            self.bits = bytearray(FILTER_BITS // 8)
+            self.count = 0
+        for pos in self._positions(instance):
+            self.bits[pos // 8] |= 1 << pos % 8
+        self.count += 1
+        self.changed = True
+        return True
+
+    def save(self, response):
+        if not self.changed:
+            return
+        encoded = base64.urlsafe_b64encode(bytes(self.bits)).decode()
+        response.set_signed_cookie(
+            get_cookie_name(), f'{self.count}:{encoded}', salt=COOKIE_SALT,
+            max_age=getattr(settings, 'SEEN_COOKIE_MAX_AGE', 86400),
+            secure=getattr(settings, 'SESSION_COOKIE_SECURE', False),
+            httponly=True, samesite='Lax'
+        )
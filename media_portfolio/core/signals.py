@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .page_cache import get_page_cache_models, invalidate_page_cache
+from .context_processors import get_global_context_models, invalidate_global_context
+from .models import SiteSettings, SpamScoredModel
+from .site_settings import invalidate_site_settings
+from .homepage import get_homepage_models, schedule_homepage_rebuild
+from .conditional import get_stamped_models, touch_model
+from .comment_counts import get_target_field, refresh_comment_counts
+from .comment_fragments import bump_comment_version
+
+
+def _is_page_cache_model(model):
+    return model is not None and model._meta.label_lower in get_page_cache_models()
+
+
+def _is_hidden(instance):
+    """An unapproved row (e.g. a comment awaiting moderation) that no page shows"""
+    return getattr(instance, 'is_approved', True) is False and not getattr(instance, '_was_approved', False)
+
+
+@receiver(pre_save)
+def note_unapproval(sender, instance, raw=False, **kwargs):
+    """
+    Remember whether an unapproved row was approved before this save, so
+    that taking it off the pages still drops them
+    """
+    if raw or instance.pk is None or getattr(instance, 'is_approved', True) is not False:
+        return
+    if _is_page_cache_model(sender):
+        instance._was_approved = sender._default_manager.filter(pk=instance.pk, is_approved=True).exists()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_pages_on_change(sender, instance, raw=False, **kwargs):
+    """
+    Drop cached pages once content shown on them is saved or deleted;
+    comments awaiting moderation change no page
+    """
+    if not raw and _is_page_cache_model(sender) and not _is_hidden(instance):
+        transaction.on_commit(invalidate_page_cache)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def touch_model_stamp(sender, raw=False, **kwargs):
+    """
+    Keep the per-model "last changed" stamps behind ETag/Last-Modified current
+    """
+    if not raw and sender is not None and sender._meta.label_lower in get_stamped_models():
+        touch_model(sender)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_global_context_on_change(sender, raw=False, **kwargs):
+    """
+    Rebuild the shared template context (counts, latest posts) after changes
+    """
+    if not raw and sender is not None and sender._meta.label_lower in get_global_context_models():
+        transaction.on_commit(invalidate_global_context)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def rebuild_homepage_on_change(sender, raw=False, **kwargs):
+    """
+    Queue a (debounced) homepage snapshot rebuild after content changes
+    """
+    if not raw and sender is not None and sender._meta.label_lower in get_homepage_models():
+        transaction.on_commit(schedule_homepage_rebuild)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_comment_counts_on_change(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Recount the approved comments of the commented object and drop its
+    cached comment pages; new comments awaiting moderation change nothing
+    """
+    if raw or not hasattr(sender, 'counter_target'):
+        return
+    if created and not instance.is_approved:
+        return
+    target_id = getattr(instance, get_target_field(sender).attname)
+    refresh_comment_counts(sender, [target_id])
+    transaction.on_commit(lambda: bump_comment_version(sender, [target_id]))
+    # The counters were written with update()
+    transaction.on_commit(lambda: touch_model(get_target_field(sender).related_model))
+
+
+@receiver(post_save)
+def score_new_submission(sender, instance, created, raw=False, **kwargs):
+    """
+    Queue spam scoring for new comments and inquiries once they are committed
+    """
+    if raw or not created or not issubclass(sender, SpamScoredModel):
+        return
+    from .tasks import score_spam
+    label, pk = sender._meta.label, instance.pk
+    transaction.on_commit(lambda: score_spam.delay(label, [pk]))
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def invalidate_site_settings_on_change(sender, **kwargs):
+    invalidate_site_settings()
+
+
+@receiver(m2m_changed)
+def invalidate_pages_on_m2m_change(sender, instance, action, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if type(instance)._meta.label_lower in get_stamped_models():
+        touch_model(type(instance))
+    if _is_page_cache_model(type(instance)):
+        transaction.on_commit(invalidate_page_cache)
@@ -0,0 +1,63 @@
+"""
+Process-local cache for the SiteSettings singleton.
+
+Each process (web or Celery worker) keeps its own copy of the row and checks
+a version stamp in the shared cache at most once per
+SITE_SETTINGS_CHECK_INTERVAL seconds. Saving or deleting the settings bumps
+the stamp (core/signals.py), so every process reloads within that interval.
+"""
+import time
+import logging
+import threading
+from django.conf import settings
+from django.db import transaction
+from .cache_versions import get_cache_version, bump_cache_version
+
+logger = logging.getLogger(__name__)
+
+SITE_SETTINGS_NAMESPACE = 'site_settings'
+
+_lock = threading.Lock()
+_state = {
+    'settings': None,
+    'version': None,
+    'checked_at': 0.0,
+}
+
+
+def _load():
+    from .models import SiteSettings
+    return SiteSettings.objects.first()
+
+
+def get_site_settings():
+    """Return the SiteSettings row (or None), cached per process"""
+    now = time.monotonic()
+    interval = getattr(settings, 'SITE_SETTINGS_CHECK_INTERVAL', 1.0)
+    if _state['version'] is not None and now - _state['checked_at'] < interval:
+        return _state['settings']
+
+    with _lock:
+        version = get_cache_version(SITE_SETTINGS_NAMESPACE)
+        if version != _state['version']:
+            try:
+                _state['settings'] = _load()
+            except Exception as e:
+                # Table missing (e.g. before migrate) or database down: keep
+                # what we had and try again on the next call
+                logger.warning(f"Could not load site settings: {str(e)}")
+                return _state['settings']
+            _state['version'] = version
+        _state['checked_at'] = now
+        return _state['settings']
+
+
+def _bump():
+    bump_cache_version(SITE_SETTINGS_NAMESPACE)
+    with _lock:
+        _state['version'] = None
+
+
+def invalidate_site_settings():
+    """Make every process reload the settings on its next check, once committed"""
+    transaction.on_commit(_bump)
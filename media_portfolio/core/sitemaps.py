@@ -0,0 +1,232 @@
+"""
+Sitemap index and sections.
+
+``/sitemap.xml`` is an index pointing at one or more pages per section
+(``/sitemap-<section>-<page>.xml``); a section is split into another page
+every SITEMAP_MAX_URLS URLs. Pages are streamed row by row with
+``.iterator()`` and only the columns needed for <loc> and <lastmod>.
+
+Each section's URL count and newest ``updated_at`` (one aggregate query)
+drive the ETag and Last-Modified headers, so unchanged sitemaps are answered
+with 304. Gzipped bodies are cached per ETag and served precompressed.
+"""
+import zlib
+import hashlib
+import logging
+from calendar import timegm
+from datetime import timezone as dt_timezone
+from xml.sax.saxutils import escape
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse, NoReverseMatch
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+
+def get_max_urls():
+    return getattr(settings, 'SITEMAP_MAX_URLS', 50000)
+
+
+class StaticSection:
+    """Fixed pages, addressed by URL name"""
+    name = 'pages'
+    pages = (
+        ('core:home', '1.0', 'daily'),
+        ('core:about', '0.8', 'monthly'),
+        ('projects:list', '0.9', 'weekly'),
+        ('collections:list', '0.8', 'weekly'),
+        ('categories:list', '0.7', 'weekly'),
+        ('blog:list', '0.8', 'weekly'),
+        ('inquiries:contact', '0.7', 'monthly'),
+        ('core:privacy', '0.3', 'yearly'),
+        ('core:terms', '0.3', 'yearly'),
+    )
+
+    def stats(self):
+        return {'count': len(self.pages), 'lastmod': None}
+
+    def entries(self, start, stop):
+        for url_name, priority, changefreq in self.pages[start:stop]:
+            try:
+                yield reverse(url_name), None, priority, changefreq
+            except NoReverseMatch:
+                continue
+
+
+class ModelSection:
+    """Published rows of a model, one <url> per slug"""
+    priority = '0.6'
+    changefreq = 'monthly'
+
+    def __init__(self, name, get_queryset, location, priority=None):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.location = location
+        if priority:
+            self.priority = priority
+
+    def stats(self):
+        return self.get_queryset().order_by().aggregate(
+            count=Count('pk'),
+            lastmod=Max('updated_at')
+        )
+
+    def entries(self, start, stop):
+        rows = self.get_queryset().order_by('pk').only('slug', 'updated_at')[start:stop]
+        for row in rows.iterator(chunk_size=2000):
+            yield self.location(row.slug), row.updated_at, self.priority, self.changefreq
+
+
+def _published_projects():
+    from media_portfolio.projects.models import Project
+    return Project.objects.filter(is_published=True)
+
+
+def _published_media():
+    from media_portfolio.media.models import MediaItem
+    return MediaItem.objects.filter(is_published=True)
+
+
+def _active_categories():
+    from media_portfolio.categories.models import Category
+    return Category.objects.filter(is_active=True)
+
+
+def _published_collections():
+    from media_portfolio.collections.models import Collection
+    return Collection.objects.filter(is_published=True)
+
+
+SECTIONS = {
+    section.name: section
+    for section in (
+        StaticSection(),
+        ModelSection('projects', _published_projects,
+                     lambda slug: reverse('projects:detail', args=[slug]), '0.7'),
+        ModelSection('media', _published_media, lambda slug: reverse('media:detail', args=[slug])),
+        ModelSection('categories', _active_categories,
+                     lambda slug: reverse('categories:detail', args=[slug]), '0.5'),
+        ModelSection('collections', _published_collections,
+                     lambda slug: reverse('collections:detail', args=[slug])),
+    )
+}
+
+
+def get_section_stats():
+    """{section name: {'count': n, 'lastmod': datetime or None, 'pages': n}}"""
+    max_urls = get_max_urls()
+    stats = {}
+    for name, section in SECTIONS.items():
+        try:
+            # Savepoint: a failed query must not break the request's transaction
+            with transaction.atomic():
+                section_stats = section.stats()
+        except DatabaseError as e:
+            # e.g. an app whose tables are missing; leave the section out
+            logger.warning(f"Sitemap section '{name}' left out: {str(e)}")
+            continue
+        section_stats['pages'] = max(1, -(-section_stats['count'] // max_urls))
+        stats[name] = section_stats
+    return stats
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _w3c(value):
+    """W3C datetime in UTC, as sitemaps expect"""
+    if value.utcoffset() is None:
+        return value.date().isoformat()
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def render_index(base_url, stats):
+    """Yield the sitemap index XML"""
+    yield XML_HEADER + INDEX_OPEN
+    for name, section_stats in stats.items():
+        for page in range(1, section_stats['pages'] + 1):
+            loc = base_url + reverse('core:sitemap_section', args=[name, page])
+            lastmod = section_stats['lastmod']
+            yield '  <sitemap><loc>%s</loc>%s</sitemap>\n' % (
+                escape(loc),
+                f'<lastmod>{_w3c(lastmod)}</lastmod>' if lastmod else ''
+            )
+    yield '</sitemapindex>\n'
+
+
+def render_section(base_url, section, page):
+    """Yield one page of a section's <urlset>"""
+    max_urls = get_max_urls()
+    start = (page - 1) * max_urls
+    yield XML_HEADER + URLSET_OPEN
+    for path, lastmod, priority, changefreq in section.entries(start, start + max_urls):
+        parts = [f'<loc>{escape(base_url + path)}</loc>']
+        if lastmod:
+            parts.append(f'<lastmod>{_w3c(lastmod)}</lastmod>')
+        parts.append(f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority>')
+        yield '  <url>%s</url>\n' % ''.join(parts)
+    yield '</urlset>\n'
+
+
+def gzip_stream(chunks, cache_key=None, timeout=None):
+    """
+    Gzip a stream of text chunks on the fly; the full compressed body is
+    cached under ``cache_key`` once the stream completes
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    body = []
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            body.append(data)
+            yield data
+    data = compressor.flush()
+    body.append(data)
+    yield data
+    if cache_key:
+        cache.set(cache_key, b''.join(body), timeout)
+
+
+def sitemap_response(request, etag, last_modified, render):
+    """
+    Build a (conditional) response for a sitemap document.
+
+    ``render`` is called only when the body is actually needed: never for a
+    304, and not for gzip clients once the compressed body is cached.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    if response is None:
+        content_type = 'application/xml; charset=utf-8'
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            cache_key = 'sitemap:gzip:%s' % etag.strip('"')
+            body = cache.get(cache_key)
+            if body is not None:
+                response = HttpResponse(body, content_type=content_type)
+            else:
+                timeout = getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 86400)
+                response = StreamingHttpResponse(
+                    gzip_stream(render(), cache_key, timeout), content_type=content_type
+                )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = StreamingHttpResponse(
+                (chunk.encode() for chunk in render()), content_type=content_type
+            )
+
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
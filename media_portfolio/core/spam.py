@@ -0,0 +1,187 @@
+"""
+Spam scoring for comments and inquiries.
+
+A multinomial naive Bayes classifier over hashed tokens. Submissions
+(``SpamScoredModel`` subclasses) are saved as pending and scored by a Celery
+task; the classifier learns from what moderators approve or mark as spam.
+Its token counts live in the single ``SpamClassifier`` row, and training
+only adds (or moves) the rows whose label changed since they were last
+counted. Both steps work on a sparse document-token matrix, so a backlog
+of thousands of submissions is one matrix product.
+"""
+import io
+import logging
+import re
+import zlib
+import numpy as np
+from scipy import sparse
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from .models import SpamClassifier, SpamScoredModel
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 16
+BATCH_SIZE = 5000
+TOKEN_RE = re.compile(r"https?://|www\.|[a-z0-9][a-z0-9'_-]*|[$€£!@]")
+
+
+def get_scored_models():
+    return [model for model in apps.get_models() if issubclass(model, SpamScoredModel)]
+
+
+def get_threshold():
+    return getattr(settings, 'SPAM_AUTO_FLAG_THRESHOLD', 0.99)
+
+
+def get_min_documents():
+    return getattr(settings, 'SPAM_MIN_TRAINING_DOCUMENTS', 20)
+
+
+def vectorize(texts):
+    """CSR matrix of hashed token counts, one row per text"""
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        tokens = TOKEN_RE.findall(text.lower())
+        rows.extend([row] * len(tokens))
+        cols.extend(zlib.crc32(token.encode()) % N_FEATURES for token in tokens)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(texts), N_FEATURES)
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _load_counts(classifier):
+    """(2, N_FEATURES) token counts; row HAM (0) and row SPAM (1)"""
+    if not classifier.feature_counts:
+        return np.zeros((2, N_FEATURES), dtype=np.float64)
+    return np.load(io.BytesIO(bytes(classifier.feature_counts)))
+
+
+def _dump_counts(counts):
+    buffer = io.BytesIO()
+    np.save(buffer, counts)
+    return buffer.getvalue()
+
+
+def _batches(queryset, fields):
+    """Rows of ``queryset`` as dicts, BATCH_SIZE at a time by primary key"""
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by('pk').values('pk', *fields)[:BATCH_SIZE])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]['pk']
+
+
+def _texts(model, rows):
+    return ['\n'.join(str(row[field] or '') for field in model.spam_text_fields) for row in rows]
+
+
+def train(model=None):
+    """
+    Bring the classifier up to date with the moderators' labels: rows that
+    gained, lost or changed their label are added to, removed from or moved
+    between the class counts. Returns the number of rows retrained.
+    """
+    SPAM, HAM = SpamScoredModel.SPAM, SpamScoredModel.HAM
+    retrained = 0
+    for model in ([model] if model else get_scored_models()):
+        spam, ham = model.spam_label_filters()
+        ham = ham & ~spam
+        stale = (
+            (spam & ~Q(spam_trained_as=SPAM))
+            | (ham & ~Q(spam_trained_as=HAM))
+            | (~spam & ~ham & Q(spam_trained_as__isnull=False))
+        )
+        queryset = model._default_manager.filter(stale).annotate(
+            labelled_spam=ExpressionWrapper(spam, output_field=BooleanField()),
+            labelled_ham=ExpressionWrapper(ham, output_field=BooleanField()),
+        )
+        fields = ('labelled_spam', 'labelled_ham', 'spam_trained_as', *model.spam_text_fields)
+        for rows in _batches(queryset, fields):
+            _train_batch(model, rows)
+            retrained += len(rows)
+    return retrained
+
+
+def _train_batch(model, rows):
+    SPAM, HAM = SpamScoredModel.SPAM, SpamScoredModel.HAM
+    pks = np.array([row['pk'] for row in rows])
+    new = np.array([SPAM if row['labelled_spam'] else HAM if row['labelled_ham'] else -1 for row in rows])
+    old = np.array([-1 if row['spam_trained_as'] is None else row['spam_trained_as'] for row in rows])
+    matrix = vectorize(_texts(model, rows))
+
+    with transaction.atomic():
+        classifier, _ = SpamClassifier.objects.select_for_update().get_or_create(pk=1)
+        counts = _load_counts(classifier)
+        documents = {SPAM: classifier.spam_documents, HAM: classifier.ham_documents}
+        for label in (SPAM, HAM):
+            added, removed = new == label, old == label
+            counts[label] += np.asarray(matrix[added].sum(axis=0)).ravel()
+            counts[label] -= np.asarray(matrix[removed].sum(axis=0)).ravel()
+            documents[label] += int(added.sum()) - int(removed.sum())
+        classifier.feature_counts = _dump_counts(np.maximum(counts, 0))
+        classifier.spam_documents = max(documents[SPAM], 0)
+        classifier.ham_documents = max(documents[HAM], 0)
+        classifier.save()
+
+        for label, trained_as in ((SPAM, SPAM), (HAM, HAM), (-1, None)):
+            model._default_manager.filter(pk__in=pks[new == label].tolist()).update(spam_trained_as=trained_as)
+
+
+def score_matrix(matrix, classifier=None):
+    """Spam probability for every row of a vectorized matrix, or None when untrained"""
+    SPAM, HAM = SpamScoredModel.SPAM, SpamScoredModel.HAM
+    classifier = classifier or SpamClassifier.objects.filter(pk=1).first()
+    minimum = get_min_documents()
+    if classifier is None or classifier.spam_documents < minimum or classifier.ham_documents < minimum:
+        return None
+
+    counts = _load_counts(classifier)
+    alpha = 1.0  # Laplace smoothing
+    log_probs = np.log(counts + alpha) - np.log(counts.sum(axis=1, keepdims=True) + alpha * N_FEATURES)
+    total = classifier.spam_documents + classifier.ham_documents
+    priors = np.log(np.array([classifier.ham_documents, classifier.spam_documents], dtype=np.float64) / total)
+
+    # (documents x features) @ (features x 2) -> joint log likelihood per class
+    joint = matrix @ log_probs.T + priors
+    return 1.0 / (1.0 + np.exp(np.clip(joint[:, HAM] - joint[:, SPAM], -500, 500)))
+
+
+def score(model, pks=None):
+    """
+    Score unscored rows of ``model`` (optionally only ``pks``) and flag
+    high-confidence spam. Returns the number of rows scored.
+    """
+    classifier = SpamClassifier.objects.filter(pk=1).first()
+    queryset = model._default_manager.filter(spam_score__isnull=True)
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+
+    scored = 0
+    threshold = get_threshold()
+    for rows in _batches(queryset, model.spam_text_fields):
+        probabilities = score_matrix(vectorize(_texts(model, rows)), classifier)
+        if probabilities is None:
+            logger.info(f"Spam classifier not trained yet; {model._meta.label} left unscored")
+            return scored
+
+        pk_array = np.array([row['pk'] for row in rows])
+        model._default_manager.bulk_update(
+            [model(pk=int(pk), spam_score=float(p)) for pk, p in zip(pk_array, probabilities)],
+            ['spam_score'], batch_size=1000
+        )
+        flagged = pk_array[probabilities >= threshold].tolist()
+        if flagged:
+            # Never overrule a moderator (e.g. comments approved before scoring existed)
+            _, ham = model.spam_label_filters()
+            model.flag_spam(model._default_manager.filter(pk__in=flagged, is_spam=False).exclude(ham))
+            logger.info(f"Flagged {len(flagged)} {model._meta.verbose_name_plural} as spam")
+        scored += len(rows)
+    return scored
@@ -0,0 +1,161 @@
+"""
+Sampled per-view SQL profiling.
+
+``SQLProfilerMiddleware`` profiles SQL_PROFILE_SAMPLE_RATE of requests: every
+query is timed through ``connection.execute_wrapper`` and fingerprinted (SQL
+text with placeholders, whitespace and IN lists normalized). A fingerprint
+run SQL_PROFILE_NPLUSONE_THRESHOLD or more times in one request is flagged
+as an N+1 pattern.
+
+Per-view totals are aggregated in the cache and ranked by DB time on the
+staff page at ``/admin/sql-profile/``. Unsampled requests only pay for one
+random number. Aggregation is a plain read-modify-write, so two sampled
+requests finishing at the same moment can lose one sample; that is fine for
+statistics.
+"""
+import re
+import time
+import hashlib
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'sql_profile'
+INDEX_KEY = f'{KEY_PREFIX}:views'
+MAX_FINGERPRINTS = 20
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,)*\s*%s\s*\)', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACE = re.compile(r'\s+')
+
+
+def get_sample_rate():
+    return getattr(settings, 'SQL_PROFILE_SAMPLE_RATE', 0.0)
+
+
+def get_nplusone_threshold():
+    return getattr(settings, 'SQL_PROFILE_NPLUSONE_THRESHOLD', 5)
+
+
+def normalize_sql(sql):
+    """Collapse a query to its shape: literals and IN lists become placeholders"""
+    sql = _STRING.sub('%s', sql)
+    sql = _NUMBER.sub('%s', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable timing every query of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = defaultdict(lambda: {'sql': '', 'count': 0, 'duration': 0.0, 'params': set()})
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+
+            shape = self.shapes[fingerprint(sql)]
+            if not shape['sql']:
+                shape['sql'] = normalize_sql(sql)[:500]
+            shape['count'] += 1
+            shape['duration'] += elapsed
+            shape['params'].add(repr(params)[:200])
+
+    def summary(self):
+        """Per-request figures: duplicates are identical queries run again"""
+        threshold = get_nplusone_threshold()
+        duplicates = sum(shape['count'] - len(shape['params']) for shape in self.shapes.values())
+        nplusone = {
+            key: shape for key, shape in self.shapes.items()
+            if shape['count'] >= threshold
+        }
+        return {
+            'queries': self.count,
+            'duration': self.duration,
+            'duplicates': duplicates,
+            'nplusone': nplusone,
+        }
+
+
+def _view_key(view_name):
+    return f'{KEY_PREFIX}:view:{view_name}'
+
+
+def record_profile(view_name, recorder):
+    """Fold one sampled request into the per-view totals"""
+    summary = recorder.summary()
+    timeout = getattr(settings, 'SQL_PROFILE_TIMEOUT', 7 * 86400)
+
+    key = _view_key(view_name)
+    stats = cache.get(key) or {
+        'view': view_name,
+        'requests': 0,
+        'queries': 0,
+        'duration': 0.0,
+        'max_queries': 0,
+        'duplicates': 0,
+        'nplusone_requests': 0,
+        'fingerprints': {},
+    }
+    stats['requests'] += 1
+    stats['queries'] += summary['queries']
+    stats['duration'] += summary['duration']
+    stats['max_queries'] = max(stats['max_queries'], summary['queries'])
+    stats['duplicates'] += summary['duplicates']
+    if summary['nplusone']:
+        stats['nplusone_requests'] += 1
+
+    fingerprints = stats['fingerprints']
+    for key_hash, shape in summary['nplusone'].items():
+        entry = fingerprints.setdefault(key_hash, {'sql': shape['sql'], 'count': 0, 'requests': 0, 'duration': 0.0})
+        entry['count'] += shape['count']
+        entry['requests'] += 1
+        entry['duration'] += shape['duration']
+    if len(fingerprints) > MAX_FINGERPRINTS:
+        ranked = sorted(fingerprints.items(), key=lambda item: item[1]['duration'], reverse=True)
+        stats['fingerprints'] = dict(ranked[:MAX_FINGERPRINTS])
+
+    cache.set(key, stats, timeout)
+
+    views = cache.get(INDEX_KEY) or set()
+    if view_name not in views:
+        views.add(view_name)
+        cache.set(INDEX_KEY, views, timeout)
+
+
+def get_profiles():
+    """Per-view stats ranked by total DB time, with per-request averages"""
+    views = cache.get(INDEX_KEY) or set()
+    found = cache.get_many([_view_key(name) for name in views])
+    profiles = []
+    for stats in found.values():
+        requests = stats['requests'] or 1
+        stats['avg_queries'] = stats['queries'] / requests
+        stats['avg_ms'] = stats['duration'] * 1000 / requests
+        stats['total_ms'] = stats['duration'] * 1000
+        stats['nplusone'] = sorted(
+            stats['fingerprints'].values(), key=lambda entry: entry['duration'], reverse=True
+        )
+        for entry in stats['nplusone']:
+            entry['avg_per_request'] = entry['count'] / (entry['requests'] or 1)
+        profiles.append(stats)
+    profiles.sort(key=lambda stats: stats['duration'], reverse=True)
+    return profiles
+
+
+def reset_profiles():
+    views = cache.get(INDEX_KEY) or set()
+    cache.delete_many([_view_key(name) for name in views] + [INDEX_KEY])
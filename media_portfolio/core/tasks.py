@@ -0,0 +1,81 @@
+import logging
+from celery import shared_task
+from .view_counts import flush_pending_views
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_view_counts():
+    """
+    Celery task to write buffered view counts to the database
+    """
+    try:
+        return flush_pending_views()
+    except Exception as e:
+        logger.error(f"View count flush failed: {str(e)}")
+        raise
+
+
+@shared_task
+def rebuild_homepage():
+    """
+    Celery task to rebuild the cached homepage snapshot
+    """
+    from django.core.cache import cache
+    from .homepage import PENDING_KEY, rebuild_homepage_snapshot
+
+    # Clear the flag first so changes made during the rebuild queue another one
+    cache.delete(PENDING_KEY)
+    try:
+        rebuild_homepage_snapshot()
+        logger.info("Rebuilt homepage snapshot")
+    except Exception as e:
+        logger.error(f"Homepage snapshot rebuild failed: {str(e)}")
+        raise
+
+
+@shared_task
+def score_spam(label, pks):
+    """
+    Celery task to score new submissions and flag confident spam
+    """
+    from django.apps import apps
+    from .spam import score
+
+    try:
+        return score(apps.get_model(label), pks)
+    except Exception as e:
+        logger.error(f"Spam scoring failed for {label} {pks}: {str(e)}")
+        raise
+
+
+@shared_task
+def score_pending_spam():
+    """
+    Celery task to score the backlog (submissions saved while the classifier
+    was untrained or a scoring task failed)
+    """
+    from .spam import get_scored_models, score
+
+    try:
+        return sum(score(model) for model in get_scored_models())
+    except Exception as e:
+        logger.error(f"Spam backlog scoring failed: {str(e)}")
+        raise
+
+
+@shared_task
+def train_spam_classifier():
+    """
+    Celery task to fold new moderation decisions into the spam classifier
+    """
+    from .spam import train
+
+    try:
+        count = train()
+        logger.info(f"Spam classifier retrained on {count} rows")
+        return count
+    except Exception as e:
+        logger.error(f"Spam classifier training failed: {str(e)}")
+        raise
@@ -0,0 +1,24 @@
+from django import template
+from media_portfolio.core.models import SiteSettings
+
+register = template.Library()
+
+
+@register.simple_tag
+def get_site_settings():
+    """
+    Returns the SiteSettings row without a query in the common case
+    Usage: {% get_site_settings as settings %}
+    """
+    return SiteSettings.get_current()
+
+
+@register.simple_tag
+def site_setting(name, default=''):
+    """
+    Returns a single site setting
+    Usage: {% site_setting 'contact_email' %}
+    """
+    site = SiteSettings.get_current()
+    value = getattr(site, name, None) if site else None
+    return value if value not in (None, '') else default
@@ -1,8 +1,20 @@
 from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
 from django.utils.safestring import mark_safe
+from media_portfolio.core.theme_css import THEME_NAMES, build_critical_css, stylesheet_path
+from media_portfolio.core.page_cache import get_request_theme
 
 register = template.Library()
 
+CRITICAL_CSS = mark_safe(build_critical_css())
+
+
+def _get_theme(request):
+    if request is None:
+        return None
+    return get_request_theme(request)
+
 
 @register.simple_tag(takes_context=True)
 def theme_class(context, light_class='light', dark_class='dark'):
@@ -10,10 +22,10 @@ def theme_class(context, light_class='light', dark_class='dark'):
     Returns appropriate class based on theme preference
     Usage: {% theme_class 'bg-light' 'bg-dark' %}
     """
-    request = context.get('request')
-    if request and request.session.get('theme') == 'dark':
+    theme = _get_theme(context.get('request'))
+    if theme == 'dark':
         return dark_class
-    elif request and request.session.get('theme') == 'light':
+    elif theme == 'light':
         return light_class
     return ''  # System preference - handled by CSS
 
@@ -23,10 +35,10 @@ def theme_attr(context, light_attr, dark_attr):
     """
     Returns appropriate attribute based on theme preference
     """
-    request = context.get('request')
-    if request and request.session.get('theme') == 'dark':
+    theme = _get_theme(context.get('request'))
+    if theme == 'dark':
         return dark_attr
-    elif request and request.session.get('theme') == 'light':
+    elif theme == 'light':
         return light_attr
     return ''
 
@@ -36,9 +48,8 @@ def theme_switcher(context):
     """
     Render theme switcher component
     """
-    request = context.get('request')
     return {
-        'current_theme': request.session.get('theme', 'system') if request else 'system',
+        'current_theme': _get_theme(context.get('request')) or 'system',
     }
 
 
@@ -51,139 +62,27 @@ def theme_image(image_light, image_dark, theme='light'):
     return image_dark if theme == 'dark' else image_light
 
 
+@register.simple_tag(takes_context=True)
+def theme_preload(context):
+    """
+    Critical background CSS and a preload of the visitor's theme stylesheet
+    Usage: {% theme_preload %} early in <head>
+    """
+    theme = _get_theme(context.get('request')) or 'system'
+    return format_html(
+        '<style>{}</style>\n<link rel="preload" href="{}" as="style">',
+        CRITICAL_CSS, static(stylesheet_path(theme))
+    )
+
+
 @register.simple_tag
 def theme_styles():
     """
-    Returns CSS for theme support
-    """
-    css = """
-    <style>
-        /* Light theme (default) */
-        :root {
-            --bg-primary: #ffffff;
-            --bg-secondary: #f8f9fa;
-            --text-primary: #212529;
-            --text-secondary: #6c757d;
-            --border-color: #dee2e6;
-            --link-color: #0d6efd;
-            --link-hover: #0a58ca;
-            --card-bg: #ffffff;
-            --card-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            --navbar-bg: #f8f9fa;
-            --footer-bg: #f8f9fa;
-            --input-bg: #ffffff;
-            --input-border: #ced4da;
-            --btn-primary: #0d6efd;
-            --btn-primary-hover: #0b5ed7;
-        }
-
-        /* Dark theme */
-        [data-theme="dark"] {
-            --bg-primary: #1a1a2e;
-            --bg-secondary: #16213e;
-            --text-primary: #e9ecef;
-            --text-secondary: #adb5bd;
-            --border-color: #2d3748;
-            --link-color: #9d4edd;
-            --link-hover: #c77dff;
-            --card-bg: #16213e;
-            --card-shadow: 0 4px 20px rgba(106, 76, 156, 0.3);
-            --navbar-bg: #0f3460;
-            --footer-bg: #0f3460;
-            --input-bg: #1a1a2e;
-            --input-border: #2d3748;
-            --btn-primary: #6a4c9c;
-            --btn-primary-hover: #7d5fb0;
-        }
-
-        /* System preference detection */
-        @media (prefers-color-scheme: dark) {
-            :root:not([data-theme="light"]) {
-                --bg-primary: #1a1a2e;
-                --bg-secondary: #16213e;
-                --text-primary: #e9ecef;
-                --text-secondary: #adb5bd;
-                --border-color: #2d3748;
-                --link-color: #9d4edd;
-                --link-hover: #c77dff;
-                --card-bg: #16213e;
-                --card-shadow: 0 4px 20px rgba(106, 76, 156, 0.3);
-                --navbar-bg: #0f3460;
-                --footer-bg: #0f3460;
-                --input-bg: #1a1a2e;
-                --input-border: #2d3748;
-                --btn-primary: #6a4c9c;
-                --btn-primary-hover: #7d5fb0;
-            }
-        }
-
-        /* Apply variables */
-        body {
-            background-color: var(--bg-primary);
-            color: var(--text-primary);
-            transition: background-color 0.3s ease, color 0.3s ease;
-        }
-
-        .navbar {
-            background-color: var(--navbar-bg) !important;
-            border-bottom: 1px solid var(--border-color);
-        }
-
-        .footer {
-            background-color: var(--footer-bg) !important;
-            border-top: 1px solid var(--border-color);
-        }
-
-        .card {
-            background-color: var(--card-bg);
-            border: 1px solid var(--border-color);
-            box-shadow: var(--card-shadow);
-        }
-
-        a {
-            color: var(--link-color);
-        }
-
-        a:hover {
-            color: var(--link-hover);
-        }
-
-        .btn-primary {
-            background-color: var(--btn-primary);
-            border-color: var(--btn-primary);
-        }
-
-        .btn-primary:hover {
-            background-color: var(--btn-primary-hover);
-            border-color: var(--btn-primary-hover);
-        }
-
-        .form-control, .form-select {
-            background-color: var(--input-bg);
-            border-color: var(--input-border);
-            color: var(--text-primary);
-        }
-
-        .form-control:focus, .form-select:focus {
-            background-color: var(--input-bg);
-            color: var(--text-primary);
-        }
-
-        .text-muted {
-            color: var(--text-secondary) !important;
-        }
-
-        hr {
-            border-color: var(--border-color);
-        }
-
-        /* Smooth transitions */
-        * {
-            transition: background-color 0.3s ease, 
-                        border-color 0.3s ease, 
-                        box-shadow 0.3s ease,
-                        color 0.3s ease;
-        }
-    </style>
+    Links to the compiled theme stylesheets, after the site stylesheet. All
+    themes are linked (they are small and cached forever) so the toggle can
+    switch without a reload.
     """
-    return mark_safe(css)
\ No newline at end of file
+    return format_html_join(
+        '\n', '<link rel="stylesheet" href="{}">',
+        ((static(stylesheet_path(theme)),) for theme in THEME_NAMES)
+    )
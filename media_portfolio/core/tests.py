@@ -0,0 +1,470 @@
+import gzip
+import time
+from contextlib import contextmanager
+from unittest import mock
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from media_portfolio.categories.models import Category
+from media_portfolio.projects.models import Project, ProjectComment
+from . import conditional, homepage, ratelimit, site_settings, spam, tasks, view_counts
+from .context_processors import get_global_context, global_stats, latest_blog_posts
+from .middleware import AnonymousPageCacheMiddleware, ModelConditionalGetMiddleware
+from .models import SiteSettings, SpamClassifier
+from .page_cache import CSRF_PLACEHOLDER, cache_anonymous_page, invalidate_page_cache
+from .pagination import CursorPaginator, InvalidCursor
+from .seen_filter import SeenFilter, get_cookie_name
+from .search import SimpleSearchBackend, SQLiteFTSSearchBackend
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@contextmanager
+def committed(test_case):
+    """Run the block's on_commit callbacks, without queueing Celery tasks"""
+    with mock.patch('celery.app.task.Task.apply_async'), test_case.captureOnCommitCallbacks(execute=True):
+        yield
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        for name in ('Delta', 'Alpha', 'Echo', 'Charlie', 'Bravo'):
+            Category.objects.create(name=name, category_type='medium')
+        self.paginator = CursorPaginator(Category.objects.all(), 2, ('name',))
+
+    def names(self, page):
+        return [category.name for category in page]
+
+    def test_round_trip(self):
+        first = self.paginator.page()
+        self.assertEqual(self.names(first), ['Alpha', 'Bravo'])
+        self.assertFalse(first.has_previous())
+
+        second = self.paginator.page(first.next_cursor)
+        third = self.paginator.page(second.next_cursor)
+        self.assertEqual(self.names(second), ['Charlie', 'Delta'])
+        self.assertEqual(self.names(third), ['Echo'])
+        self.assertFalse(third.has_next())
+
+        back = self.paginator.page(third.previous_cursor)
+        self.assertEqual(self.names(back), ['Charlie', 'Delta'])
+        self.assertEqual(self.names(self.paginator.page(back.previous_cursor)), ['Alpha', 'Bravo'])
+
+    def test_descending_ordering(self):
+        paginator = CursorPaginator(Category.objects.all(), 3, ('-name',))
+        first = paginator.page()
+        self.assertEqual(self.names(first), ['Echo', 'Delta', 'Charlie'])
+        self.assertEqual(self.names(paginator.page(first.next_cursor)), ['Bravo', 'Alpha'])
+
+    def test_tampered_cursor(self):
+        cursor = self.paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            self.paginator.page(cursor[:-2] + 'xx')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        ratelimit.cache.clear()
+
+    def hit_at(self, now, limit=2, window=60):
+        with mock.patch.object(ratelimit.time, 'time', return_value=now):
+            return ratelimit.hit('test', '10.0.0.1', limit, window)
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('5/m'), (5, 60))
+        self.assertEqual(ratelimit.parse_rate('3/10m'), (3, 600))
+        self.assertEqual(ratelimit.parse_rate('100/d'), (100, 86400))
+
+    def test_limit_within_window(self):
+        self.assertEqual(self.hit_at(120.0), 0)
+        self.assertEqual(self.hit_at(121.0), 0)
+        self.assertGreater(self.hit_at(121.0), 0)
+        # 4 hits of 2 allowed: wait out this window (59s) and half the next
+        self.assertEqual(self.hit_at(121.0), 89)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            self.hit_at(120.0)
+        # 55s of the previous window overlap: 4 * 55/60 + 1 > 2, and the
+        # weight falls to 1/4 after 40 more seconds
+        self.assertEqual(self.hit_at(185.0), 40)
+        # A quiet window later the old hits no longer count
+        self.assertEqual(self.hit_at(300.0), 0)
+
+    def test_client_ip_ignores_spoofed_hops(self):
+        request = RequestFactory().post(
+            '/', REMOTE_ADDR='10.0.0.254', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7'
+        )
+        with self.settings(RATE_LIMIT_TRUSTED_PROXIES=0):
+            self.assertEqual(ratelimit.get_client_ip(request), '10.0.0.254')
+        with self.settings(RATE_LIMIT_TRUSTED_PROXIES=1):
+            self.assertEqual(ratelimit.get_client_ip(request), '203.0.113.7')
+        with self.settings(RATE_LIMIT_TRUSTED_PROXIES=3):
+            self.assertEqual(ratelimit.get_client_ip(request), '10.0.0.254')
+
+    def test_clients_are_counted_separately(self):
+        self.hit_at(120.0)
+        self.hit_at(120.0)
+        with mock.patch.object(ratelimit.time, 'time', return_value=120.0):
+            self.assertEqual(ratelimit.hit('test', '10.0.0.2', 2, 60), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SPAM_MIN_TRAINING_DOCUMENTS=2, SPAM_AUTO_FLAG_THRESHOLD=0.9)
+class SpamClassifierTests(TestCase):
+    SPAM = ['Buy cheap pills now at www.pills.example!!!', 'Cheap pills, free $$$ at http://pills.example', 'Win cash now, cheap pills']
+    HAM = ['Great write-up on the caching layer', 'How did you handle the database migrations?', 'Thanks, the search section was helpful']
+
+    def setUp(self):
+        self.project = Project.objects.create(title='Project', short_summary='Summary')
+        for text in self.SPAM:
+            self.comment(text, is_spam=True)
+        for text in self.HAM:
+            self.comment(text, is_approved=True)
+
+    def comment(self, content, **kwargs):
+        return ProjectComment.objects.create(
+            project=self.project, name='Visitor', email='visitor@example.com', content=content, **kwargs
+        )
+
+    def test_train_is_incremental(self):
+        self.assertEqual(spam.train(ProjectComment), 6)
+        classifier = SpamClassifier.objects.get(pk=1)
+        self.assertEqual((classifier.spam_documents, classifier.ham_documents), (3, 3))
+        self.assertEqual(spam.train(ProjectComment), 0)
+
+        # A moderator relabels one spam comment as ham
+        relabelled = ProjectComment.objects.filter(is_spam=True).first()
+        ProjectComment.objects.filter(pk=relabelled.pk).update(is_spam=False, is_approved=True)
+        self.assertEqual(spam.train(ProjectComment), 1)
+        classifier.refresh_from_db()
+        self.assertEqual((classifier.spam_documents, classifier.ham_documents), (2, 4))
+
+    def test_score_flags_confident_spam(self):
+        spam.train(ProjectComment)
+        pending_spam = self.comment('cheap pills now, buy at www.pills.example')
+        pending_ham = self.comment('Helpful write-up on the search migrations')
+
+        self.assertEqual(spam.score(ProjectComment, [pending_spam.pk, pending_ham.pk]), 2)
+        pending_spam.refresh_from_db()
+        pending_ham.refresh_from_db()
+        self.assertGreater(pending_spam.spam_score, 0.9)
+        self.assertLess(pending_ham.spam_score, 0.5)
+        self.assertTrue(pending_spam.is_spam and pending_spam.spam_auto_flagged)
+        self.assertFalse(pending_ham.is_spam)
+
+    def test_untrained_classifier_scores_nothing(self):
+        pending = self.comment('cheap pills')
+        self.assertEqual(spam.score(ProjectComment, [pending.pk]), 0)
+        pending.refresh_from_db()
+        self.assertIsNone(pending.spam_score)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ViewCountTests(TestCase):
+    def setUp(self):
+        view_counts.cache.clear()
+        self.project = Project.objects.create(title='Viewed', short_summary='Summary')
+        self.other = Project.objects.create(title='Other', short_summary='Summary')
+
+    def test_views_are_buffered_then_flushed(self):
+        view_counts.record_view(self.project)
+        view_counts.record_view(self.project)
+        view_counts.record_view(self.other)
+        self.assertEqual(view_counts.get_live_view_count(self.project), 2)
+
+        # The first flush only closes the generation the views landed in
+        self.assertEqual(view_counts.flush_pending_views(), 0)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).view_count, 0)
+        self.assertEqual(view_counts.get_live_view_count(self.project), 2)
+
+        self.assertEqual(view_counts.flush_pending_views(), 3)
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(project.view_count, 2)
+        self.assertEqual(Project.objects.get(pk=self.other.pk).view_count, 1)
+        # Flushed views are no longer pending
+        self.assertEqual(view_counts.get_live_view_count(project), 2)
+        self.assertEqual(view_counts.flush_pending_views(), 0)
+
+    def test_crawlers_are_not_counted(self):
+        request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0 (compatible; Googlebot/2.1)')
+        self.assertFalse(view_counts.record_view(self.project, request))
+        self.assertEqual(view_counts.get_live_view_count(self.project), 0)
+
+
+class BuildMatchTests(SimpleTestCase):
+    def test_terms_are_quoted_and_prefixed(self):
+        self.assertEqual(SQLiteFTSSearchBackend.build_match('media server'), '"media"* "server"*')
+
+    def test_fts_syntax_is_not_passed_through(self):
+        self.assertEqual(SQLiteFTSSearchBackend.build_match('title:x OR "y'), '"title"* "x"* "OR"* "y"*')
+        self.assertEqual(SQLiteFTSSearchBackend.build_match('"*:()'), '')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchBackendTests(TestCase):
+    def setUp(self):
+        self.in_title = Project.objects.create(title='Streaming server', short_summary='Summary')
+        self.in_description = Project.objects.create(
+            title='Archive', short_summary='Summary', description='Also runs a streaming job'
+        )
+        Project.objects.create(title='Unrelated', short_summary='Summary')
+
+    def test_simple_backend_matches_any_field(self):
+        results = SimpleSearchBackend().search(Project.objects.all(), 'streaming')
+        self.assertEqual(set(results), {self.in_title, self.in_description})
+
+    def test_fts_backend_ranks_title_matches_first(self):
+        if connection.vendor != 'sqlite' or not SQLiteFTSSearchBackend.is_available():
+            self.skipTest('SQLite FTS5 is not available')
+        backend = SQLiteFTSSearchBackend()
+        self.assertEqual(list(backend.search(Project.objects.all(), 'stream')), [self.in_title, self.in_description])
+        self.assertFalse(backend.search(Project.objects.all(), '"*').exists())
+
+        with override_settings(SEARCH_MAX_RESULTS=1):
+            self.assertEqual(list(backend.search(Project.objects.all(), 'streaming')), [self.in_title])
+
+        # Deleting a project drops it from the index
+        self.in_title.delete()
+        self.assertEqual(list(backend.search(Project.objects.all(), 'streaming')), [self.in_description])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnonymousPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.renders = 0
+        self.middleware = AnonymousPageCacheMiddleware(self.handle)
+
+    @cache_anonymous_page()
+    def view(self, request):
+        self.renders += 1
+        token = get_token(request)
+        return HttpResponse(f'<input type="hidden" name="csrfmiddlewaretoken" value="{token}">')
+
+    def handle(self, request):
+        self.middleware.process_view(request, self.view, (), {})
+        return self.view(request)
+
+    def get(self, **cookies):
+        request = self.factory.get('/projects/')
+        request.COOKIES.update(cookies)
+        return request, self.middleware(request)
+
+    def test_hit_carries_the_visitors_own_csrf_token(self):
+        self.assertEqual(self.get()[1]['X-Page-Cache'], 'MISS')
+
+        with mock.patch('media_portfolio.core.middleware.get_token', return_value='visitor-token'):
+            response = self.get()[1]
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.renders, 1)
+        self.assertContains(response, 'value="visitor-token"')
+        self.assertNotIn(CSRF_PLACEHOLDER, response.content)
+
+    def test_theme_and_invalidation_get_fresh_renders(self):
+        self.get()
+        self.assertEqual(self.get(theme='dark')[1]['X-Page-Cache'], 'MISS')
+        invalidate_page_cache()
+        self.assertEqual(self.get()[1]['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.renders, 3)
+
+    def test_flash_messages_bypass_the_cache(self):
+        self.get()
+        response = self.get(messages='pending')[1]
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertEqual(self.renders, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GlobalContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bundle_is_shared_until_content_changes(self):
+        Project.objects.create(title='One', short_summary='Summary', is_published=True)
+        self.assertEqual(get_global_context()['total_projects'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_global_context()['total_projects'], 1)
+
+        with committed(self):
+            Project.objects.create(title='Two', short_summary='Summary', is_published=True)
+        self.assertEqual(get_global_context()['total_projects'], 2)
+
+    def test_values_are_lazy_and_read_once_per_request(self):
+        request = RequestFactory().get('/')
+        bundle = {'total_projects': 3, 'total_media': 0, 'total_blog_posts': 0, 'latest_blog_posts': []}
+        with mock.patch('media_portfolio.core.context_processors.get_global_context', return_value=bundle) as get:
+            context = {**global_stats(request), **latest_blog_posts(request)}
+            get.assert_not_called()
+            self.assertEqual(str(context['total_projects']), '3')
+            self.assertEqual(list(context['latest_blog_posts']), [])
+        get.assert_called_once()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SITE_SETTINGS_CHECK_INTERVAL=60)
+class SiteSettingsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.dict(site_settings._state, {'settings': None, 'version': None, 'checked_at': 0.0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_row_is_cached_until_saved(self):
+        with committed(self):
+            current = SiteSettings.objects.create(site_title='First')
+        self.assertEqual(SiteSettings.get_current().site_title, 'First')
+        with self.assertNumQueries(0):
+            SiteSettings.get_current()
+
+        current.site_title = 'Second'
+        with committed(self):
+            current.save()
+        self.assertEqual(SiteSettings.get_current().site_title, 'Second')
+
+    def test_failed_load_is_not_cached(self):
+        SiteSettings.objects.create(site_title='Site')
+        with mock.patch.object(site_settings, '_load', side_effect=DatabaseError('no such table')):
+            with self.assertLogs('media_portfolio.core.site_settings', 'WARNING'):
+                self.assertIsNone(SiteSettings.get_current())
+        self.assertEqual(SiteSettings.get_current().site_title, 'Site')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, HOMEPAGE_REBUILD_DELAY=5)
+class HomepageSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(homepage, 'build_homepage_snapshot', side_effect=lambda: {'total_projects': 4})
+        self.build = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cold_cache_builds_once(self):
+        self.assertEqual(homepage.get_homepage_snapshot(), {'total_projects': 4})
+        self.assertEqual(homepage.get_homepage_snapshot(), {'total_projects': 4})
+        self.assertEqual(self.build.call_count, 1)
+
+    def test_burst_of_changes_queues_one_rebuild(self):
+        with mock.patch.object(tasks.rebuild_homepage, 'apply_async') as apply_async:
+            for _ in range(3):
+                homepage.schedule_homepage_rebuild()
+            apply_async.assert_called_once_with(countdown=5)
+
+            # The rebuild clears the pending flag, so the next change queues again
+            tasks.rebuild_homepage()
+            self.assertEqual(cache.get(homepage.SNAPSHOT_KEY), {'total_projects': 4})
+            homepage.schedule_homepage_rebuild()
+            self.assertEqual(apply_async.call_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SitemapTests(TestCase):
+    url = '/sitemap-projects-1.xml'
+
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(title='Media Server', short_summary='Summary')
+
+    def test_unchanged_section_is_answered_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http://testserver/projects/media-server/', b''.join(response.streaming_content))
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Absolute URLs differ per scheme and host, and so does the ETag
+        self.assertNotEqual(self.client.get(self.url, secure=True)['ETag'], etag)
+
+        self.project.short_summary = 'Edited'
+        self.project.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_gzip_body_is_cached(self):
+        first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(first.streaming)
+        body = b''.join(first.streaming_content)
+
+        # Served from the cache, without streaming the rows again
+        second = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(second.streaming)
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertEqual(second.content, body)
+        self.assertIn(b'<urlset', gzip.decompress(body))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalGetTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.renders = 0
+        self.middleware = ModelConditionalGetMiddleware(self.view)
+
+    def view(self, request):
+        self.renders += 1
+        return HttpResponse('Projects')
+
+    def get(self, path='/projects/', **extra):
+        return self.middleware(self.factory.get(path, **extra))
+
+    def test_matching_etag_skips_the_view(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.renders, 1)
+
+    def test_touching_a_declared_model_changes_the_etag(self):
+        etag = self.get()['ETag']
+        with mock.patch.object(conditional.time, 'time', return_value=time.time() + 10):
+            conditional.touch_model('categories.category')
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.renders, 2)
+
+    def test_undeclared_views_are_left_alone(self):
+        self.assertFalse(self.get('/about/').has_header('ETag'))
+
+
+class SeenFilterTests(SimpleTestCase):
+    def reload(self, seen, value=None):
+        """Round-trip ``seen`` through a response cookie into a new request"""
+        response = HttpResponse()
+        seen.save(response)
+        request = RequestFactory().get('/')
+        request.COOKIES[get_cookie_name()] = value or response.cookies[get_cookie_name()].value
+        return SeenFilter.from_request(request)
+
+    def test_views_are_remembered_across_requests(self):
+        first, second = Project(pk=1), Project(pk=2)
+        seen = SeenFilter()
+        self.assertTrue(seen.add(first))
+        self.assertFalse(seen.add(first))
+
+        seen = self.reload(seen)
+        self.assertIn(first, seen)
+        self.assertNotIn(second, seen)
+        self.assertTrue(seen.add(second))
+
+    def test_unchanged_filter_sets_no_cookie(self):
+        response = HttpResponse()
+        SeenFilter().save(response)
+        self.assertNotIn(get_cookie_name(), response.cookies)
+
+    def test_tampered_cookie_starts_over(self):
+        seen = SeenFilter()
+        seen.add(Project(pk=1))
+        self.assertNotIn(Project(pk=1), self.reload(seen, value='1:AAAA:forged'))
+
+    @override_settings(SEEN_COOKIE_CAPACITY=2)
+    def test_full_filter_starts_over(self):
+        seen = SeenFilter()
+        for pk in (1, 2, 3):
+            seen.add(Project(pk=pk))
+        self.assertEqual(seen.count, 1)
+        self.assertIn(Project(pk=3), seen)
+        self.assertNotIn(Project(pk=1), seen)
@@ -0,0 +1,78 @@
+"""
+Theme palettes, compiled to static stylesheets.
+
+Each theme becomes ``css/theme-<name>.css`` (see core/finders.py), scoped to
+``[data-theme="<name>"]`` so switching themes in the browser needs no
+reload. collectstatic hashes and precompresses them like any other static
+file. ``CRITICAL`` is the page background of each theme, inlined in the
+page head so the first paint already has the right colour.
+"""
+
+THEMES = {
+    'dark': {
+        'variables': {
+            '--glass-bg': 'rgba(10, 10, 20, 0.4)',
+            '--glass-border': 'rgba(255, 255, 255, 0.05)',
+        },
+        'rules': {},
+    },
+    'light': {
+        'variables': {
+            '--glass-bg': 'rgba(255, 255, 255, 0.7)',
+            '--glass-border': 'rgba(255, 255, 255, 0.5)',
+            '--text-light': '#1a1a2e',
+            '--text-muted': 'rgba(26, 26, 46, 0.7)',
+        },
+        'rules': {
+            'body': {'background': 'linear-gradient(135deg, #f5f0ff 0%, #e6e9ff 100%)'},
+            '.glass-input': {'color': '#1a1a2e'},
+            '.glass-input::placeholder': {'color': 'rgba(26, 26, 46, 0.5)'},
+        },
+    },
+}
+
+CRITICAL = {
+    'dark': '#1a1a2e',
+    'light': '#f5f0ff',
+}
+
+THEME_NAMES = ('dark', 'light', 'system')
+
+
+def stylesheet_path(theme):
+    return f'css/theme-{theme}.css'
+
+
+def _declarations(values, indent='    '):
+    return '\n'.join(f'{indent}{name}: {value};' for name, value in values.items())
+
+
+def _theme_blocks(selector, palette, indent=''):
+    inner = indent + '    '
+    blocks = [f'{indent}{selector} {{\n{_declarations(palette["variables"], inner)}\n{indent}}}']
+    for rule, values in palette['rules'].items():
+        blocks.append(f'{indent}{selector} {rule} {{\n{_declarations(values, inner)}\n{indent}}}')
+    return blocks
+
+
+def build_theme_css(theme):
+    """Return the stylesheet text for ``theme`` ('dark', 'light' or 'system')"""
+    if theme == 'system':
+        # The base palette (css/site.css), or light when the OS asks for it
+        light = _theme_blocks('[data-theme="system"]', THEMES['light'], indent='    ')
+        blocks = ['@media (prefers-color-scheme: light) {\n%s\n}' % '\n\n'.join(light)]
+    else:
+        blocks = _theme_blocks(f'[data-theme="{theme}"]', THEMES[theme])
+    return '/* Generated from core/theme_css.py; do not edit */\n' + '\n\n'.join(blocks) + '\n'
+
+
+def build_critical_css():
+    """
+    Minified inline CSS for the page background. It targets <html>, so the
+    body gradient from the stylesheets still paints over it.
+    """
+    return (
+        'html{background-color:%(dark)s}'
+        'html[data-theme="light"]{background-color:%(light)s}'
+        '@media (prefers-color-scheme: light){html[data-theme="system"]{background-color:%(light)s}}'
+    ) % CRITICAL
@@ -0,0 +1,117 @@
+"""
+Materialized paths for threaded comments.
+
+A comment's ``path`` is its ancestors' primary keys followed by its own,
+each zero-padded to PATH_STEP digits, and ``depth`` is its nesting level.
+Ordering by path therefore lists a thread depth-first with siblings
+oldest first, and a subtree is a single indexed prefix match. The tree is
+assembled in Python from that one ordered query.
+"""
+from django.db.models import CharField, Q, OuterRef, Subquery, Value, F
+from django.db.models.functions import Cast, Concat, LPad, Substr
+
+PATH_STEP = 10
+MAX_DEPTH = 255 // PATH_STEP - 1  # deepest level that fits the path column
+
+
+def path_segment(pk):
+    return str(pk).zfill(PATH_STEP)
+
+
+def parent_path(path):
+    return path[:-PATH_STEP]
+
+
+def build_tree(nodes):
+    """
+    Link path-ordered ``nodes`` into trees: every node gets a
+    ``thread_replies`` list. Nodes whose parent is not in ``nodes`` (e.g. an
+    unapproved parent) are dropped with their subtree. Returns the roots,
+    i.e. the nodes of the smallest depth present.
+    """
+    nodes = list(nodes)
+    if not nodes:
+        return []
+    top = min(node.depth for node in nodes)
+    by_path = {}
+    roots = []
+    for node in nodes:
+        node.thread_replies = []
+        if node.depth == top:
+            roots.append(node)
+        else:
+            parent = by_path.get(parent_path(node.path))
+            if parent is None:
+                continue
+            parent.thread_replies.append(node)
+        by_path[node.path] = node
+    return roots
+
+
+def attach_replies(roots, queryset):
+    """
+    Load the descendants of ``roots`` from ``queryset`` (e.g. approved
+    comments) in one query and set ``thread_replies`` throughout the trees.
+    Only the threads of the roots' ``thread_scope`` objects are searched.
+    Roots without a path yet (bulk_create before rebuild_paths) get no
+    replies. Returns ``roots`` in their original order.
+    """
+    roots = list(roots)
+    for root in roots:
+        root.thread_replies = []
+    # An empty prefix would match every row
+    pathed = [root for root in roots if root.path]
+    if not pathed:
+        return roots
+
+    prefixes = Q()
+    for root in pathed:
+        prefixes |= Q(path__startswith=root.path)
+    descendants = queryset.filter(prefixes)
+    scope = getattr(queryset.model, 'thread_scope', None)
+    if scope:
+        attname = queryset.model._meta.get_field(scope).attname
+        descendants = descendants.filter(**{f'{attname}__in': {getattr(root, attname) for root in pathed}})
+    descendants = descendants.exclude(pk__in=[root.pk for root in pathed]).order_by('path')
+
+    by_path = {root.path: root for root in pathed}
+    for node in descendants:
+        node.thread_replies = []
+        parent = by_path.get(parent_path(node.path))
+        if parent is not None:
+            parent.thread_replies.append(node)
+            by_path[node.path] = node
+    return roots
+
+
+def _own_segment():
+    return LPad(Cast('pk', output_field=CharField()), PATH_STEP, Value('0'))
+
+
+def rebuild_paths(model, queryset=None):
+    """
+    Recompute ``path``/``depth`` for ``queryset`` (default: every row) level
+    by level in SQL. Used to backfill rows written without ``save()``
+    (migrations, bulk_create); works with historical models.
+    """
+    queryset = model._default_manager.all() if queryset is None else queryset
+    queryset.update(path='')
+    queryset.filter(parent__isnull=True).update(path=_own_segment(), depth=0)
+
+    # Each pass fills the rows whose parent already has a path
+    parent = model._default_manager.filter(pk=OuterRef('parent_id'))
+    for _ in range(MAX_DEPTH):
+        updated = queryset.filter(path='', parent__isnull=False).exclude(parent__path='').update(
+            path=Concat(Subquery(parent.values('path')[:1]), _own_segment(), output_field=CharField()),
+            depth=Subquery(parent.values('depth')[:1]) + 1
+        )
+        if not updated:
+            break
+
+
+def move_subtree(model, old_path, new_path, depth_change):
+    """Re-root every row under ``old_path`` at ``new_path``"""
+    model._default_manager.filter(path__startswith=old_path).update(
+        path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=CharField()),
+        depth=F('depth') + depth_change
+    )
@@ -8,6 +8,8 @@ urlpatterns = [
     path('about/', views.AboutView.as_view(), name='about'),
     path('privacy/', views.PrivacyPolicyView.as_view(), name='privacy'),
     path('terms/', views.TermsOfServiceView.as_view(), name='terms'),
-    path('sitemap/', views.SitemapView.as_view(), name='sitemap'),
+    path('sitemap.xml', views.SitemapIndexView.as_view(), name='sitemap'),
+    path('sitemap/', views.SitemapIndexView.as_view(), name='sitemap_legacy'),
+    path('sitemap-<slug:section>-<int:page>.xml', views.SitemapSectionView.as_view(), name='sitemap_section'),
     path('robots.txt', views.RobotsTxtView.as_view(), name='robots'),
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import re
 import hashlib
 from datetime import datetime
 from django.core.files import File
@@ -7,19 +8,41 @@ from PIL import Image
 from io import BytesIO
 
 
+def allocate_unique_slug(model_class, value, slug_field='slug', exclude_pk=None):
+    """
+    Return a free slug for ``value`` using a single prefix query.
+
+    Existing "<slug>" / "<slug>-<n>" values are fetched in one go and the
+    next number after the highest suffix is used. Another writer can still
+    take the same slug before we insert; UniqueSlugMixin retries on that.
+    """
+    max_length = model_class._meta.get_field(slug_field).max_length
+    base = slugify(value)[:max_length].strip('-') or 'item'
+
+    queryset = model_class._default_manager.filter(**{f'{slug_field}__startswith': base})
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    taken = set(queryset.values_list(slug_field, flat=True))
+    if base not in taken:
+        return base
+
+    suffix_re = re.compile(rf'^{re.escape(base)}-(\d+)$')
+    numbers = [int(match.group(1)) for match in map(suffix_re.match, taken) if match]
+    suffix = f'-{max(numbers, default=0) + 1}'
+    if len(base) + len(suffix) <= max_length:
+        return f'{base}{suffix}'
+
+    # Too long to append a suffix: shorten the base and scan again
+    return allocate_unique_slug(
+        model_class, base[:max_length - len(suffix)], slug_field, exclude_pk
+    )
+
+
 def generate_unique_slug(model_class, title, slug_field='slug'):
     """
     Generate a unique slug for a model instance
     """
-    slug = slugify(title)
-    unique_slug = slug
-    counter = 1
-    
-    while model_class.objects.filter(**{slug_field: unique_slug}).exists():
-        unique_slug = f"{slug}-{counter}"
-        counter += 1
-    
-    return unique_slug
+    return allocate_unique_slug(model_class, title, slug_field)
 
 
 def get_file_hash(file):
@@ -138,4 +161,69 @@ def send_email_notification(subject, message, recipient_list, from_email=None):
         )
         return True
     except:
-        return False
\ No newline at end of file
+        return False
+
+RENDITION_FORMATS = {
+    'webp': {'format': 'WEBP', 'options': {'quality': 80, 'method': 6}},
+    'avif': {'format': 'AVIF', 'options': {'quality': 60}},
+}
+
+
+def supported_rendition_formats(formats=('webp', 'avif')):
+    """
+    Return the formats this Pillow build can encode (AVIF needs libavif)
+    """
+    from PIL import features
+
+    supported = []
+    for fmt in formats:
+        try:
+            if features.check(fmt):
+                supported.append(fmt)
+        except ValueError:
+            # Unknown feature name in this Pillow version
+            pass
+    return supported
+
+
+def open_image(file):
+    """
+    Open an image from any file-like object (e.g. a storage file) as RGB/RGBA
+    """
+    from PIL import ImageOps
+
+    img = Image.open(file)
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+    return img
+
+
+def encode_rendition(img, width, fmt):
+    """
+    Resize an image to ``width`` (never upscaling) and encode it.
+    Returns (bytes, width, height).
+    """
+    spec = RENDITION_FORMATS[fmt]
+    if img.width > width:
+        height = round(img.height * width / img.width)
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, format=spec['format'], **spec['options'])
+    return output.getvalue(), img.width, img.height
+
+
+def encode_blur_placeholder(img, size=(20, 20), blur_radius=10):
+    """
+    Tiny blurred JPEG used as a lazy-loading placeholder
+    """
+    from PIL import ImageFilter
+
+    placeholder = img.convert('RGB')
+    placeholder.thumbnail(size, Image.Resampling.LANCZOS)
+    placeholder = placeholder.filter(ImageFilter.GaussianBlur(blur_radius))
+
+    output = BytesIO()
+    placeholder.save(output, format='JPEG', quality=60)
+    return output.getvalue()
@@ -0,0 +1,205 @@
+"""
+Write-behind view counter.
+
+Detail views record views here instead of issuing an UPDATE per request.
+Pending increments live in the shared cache, grouped into numbered
+generations, and are flushed to the database in bulk by the
+``flush_view_counts`` Celery task.
+"""
+import re
+import logging
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .conditional import touch_model
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'viewcounts'
+
+DEFAULT_BOT_PATTERN = (
+    r'bot|crawl|spider|slurp|bingpreview|facebookexternalhit|embedly|'
+    r'headless|lighthouse|pingdom|uptime|monitor|curl|wget|python-requests|httpx'
+)
+
+_bot_regex = None
+
+
+def _get_bot_regex():
+    global _bot_regex
+    if _bot_regex is None:
+        pattern = getattr(settings, 'VIEW_COUNT_BOT_PATTERN', DEFAULT_BOT_PATTERN)
+        _bot_regex = re.compile(pattern, re.IGNORECASE)
+    return _bot_regex
+
+
+def is_crawler(request):
+    """Return True if the request comes from a known crawler or monitor"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent:
+        return True
+    return bool(_get_bot_regex().search(user_agent))
+
+
+def _pending_timeout():
+    # Pending counts must survive a few missed flushes
+    return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 60) * 10
+
+
+def _generation_key():
+    return f'{KEY_PREFIX}:generation'
+
+
+def _flushed_key():
+    return f'{KEY_PREFIX}:flushed'
+
+
+def _count_key(generation, label, pk):
+    return f'{KEY_PREFIX}:{generation}:{label}:{pk}'
+
+
+def _index_size_key(generation, label):
+    return f'{KEY_PREFIX}:{generation}:{label}:size'
+
+
+def _index_slot_key(generation, label, slot):
+    return f'{KEY_PREFIX}:{generation}:{label}:slot:{slot}'
+
+
+def _tracked_labels():
+    labels = getattr(settings, 'VIEW_COUNT_MODELS', ('projects.project', 'media.mediaitem'))
+    return [label.lower() for label in labels]
+
+
+def _get_generation():
+    generation = cache.get(_generation_key())
+    if generation is None:
+        cache.add(_generation_key(), 1, None)
+        generation = cache.get(_generation_key(), 1)
+    return generation
+
+
+def _incr(key, delta=1, timeout=None):
+    """Atomic increment that creates the key if it does not exist"""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout):
+            return delta
+        return cache.incr(key, delta)
+
+
+def record_view(instance, request=None):
+    """
+    Buffer a view for ``instance``.
+
+    The instance's model must have an integer ``view_count`` field. Returns
+    False when the view was ignored (crawler), True otherwise.
+    """
+    if request is not None and is_crawler(request):
+        return False
+
+    label = instance._meta.label_lower
+    if label not in _tracked_labels():
+        raise ValueError(f"{label} is not listed in VIEW_COUNT_MODELS")
+
+    generation = _get_generation()
+    timeout = _pending_timeout()
+    key = _count_key(generation, label, instance.pk)
+
+    if cache.add(key, 1, timeout):
+        # First view of this object in the current generation: register it
+        # in the generation's index so the flusher can find it.
+        slot = _incr(_index_size_key(generation, label), timeout=timeout)
+        cache.set(_index_slot_key(generation, label, slot), instance.pk, timeout)
+    else:
+        _incr(key, timeout=timeout)
+    return True
+
+
+def get_pending_views(model, pks):
+    """
+    Return {pk: pending_count} for views not yet written to the database
+    """
+    label = model._meta.label_lower
+    current = _get_generation()
+    flushed = cache.get(_flushed_key(), current - 2)
+
+    keys = {}
+    for generation in range(flushed + 1, current + 1):
+        for pk in pks:
+            keys[_count_key(generation, label, pk)] = pk
+
+    pending = defaultdict(int)
+    for key, value in cache.get_many(list(keys)).items():
+        pending[keys[key]] += value or 0
+    return dict(pending)
+
+
+def get_live_view_count(instance):
+    """Persisted view count plus any increments still waiting to be flushed"""
+    pending = get_pending_views(type(instance), [instance.pk])
+    return instance.view_count + pending.get(instance.pk, 0)
+
+
+def _collect_generation(generation):
+    """Read every pending counter of a generation: {label: {pk: count}}"""
+    collected = {}
+    for label in _tracked_labels():
+        size = cache.get(_index_size_key(generation, label)) or 0
+        slot_keys = [_index_slot_key(generation, label, slot) for slot in range(1, size + 1)]
+        pks = list(cache.get_many(slot_keys).values())
+        count_keys = {_count_key(generation, label, pk): pk for pk in pks}
+        counts = {
+            count_keys[key]: value
+            for key, value in cache.get_many(list(count_keys)).items()
+            if value
+        }
+        if counts:
+            collected[label] = counts
+        cache.delete_many(slot_keys + list(count_keys) + [_index_size_key(generation, label)])
+    return collected
+
+
+def _apply_counts(label, counts):
+    """Write {pk: increment} to the database, one UPDATE per distinct increment"""
+    try:
+        model = apps.get_model(label)
+    except LookupError:
+        logger.error(f"Dropping buffered view counts for unknown model {label}")
+        return 0
+
+    by_increment = defaultdict(list)
+    for pk, increment in counts.items():
+        by_increment[increment].append(pk)
+
+    with transaction.atomic():
+        for increment, pks in by_increment.items():
+            model.objects.filter(pk__in=pks).update(view_count=F('view_count') + increment)
+    # update() sends no signals; pages showing the counts must revalidate
+    touch_model(model)
+    return sum(counts.values())
+
+
+def flush_pending_views():
+    """
+    Close the current generation and write every finished generation to the
+    database. The generation that was current until now is only flushed on
+    the next run, which gives in-flight increments a full interval to land.
+    """
+    current = _get_generation()
+    flushed = cache.get(_flushed_key(), current - 2)
+    _incr(_generation_key())
+
+    total = 0
+    for generation in range(flushed + 1, current):
+        for label, counts in _collect_generation(generation).items():
+            total += _apply_counts(label, counts)
+    cache.set(_flushed_key(), current - 1, None)
+
+    if total:
+        logger.info(f"Flushed {total} buffered views")
+    return total
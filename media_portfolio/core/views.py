@@ -1,15 +1,28 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.views.generic import TemplateView, ListView
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
 from media_portfolio.media.models import MediaItem
-from media_portfolio.categories.models import Category
-from media_portfolio.comments.models import Testimonial
-from django.db import models
 from django.views.generic import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from .page_cache import cache_anonymous_page, THEME_COOKIE
+from .homepage import get_homepage_snapshot
+from .ratelimit import rate_limit
+from .sql_profile import get_profiles, get_sample_rate, get_nplusone_threshold, reset_profiles
+from .sitemaps import (
+    SECTIONS,
+    get_max_urls,
+    get_section_stats,
+    make_etag,
+    render_index,
+    render_section,
+    sitemap_response
+)
 
 
+@cache_anonymous_page()
 class HomeView(TemplateView):
     """
     Homepage view with featured content
@@ -19,40 +32,8 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get featured media
-        context['featured_media'] = MediaItem.objects.filter(
-            is_published=True,
-            featured=True
-        ).select_related().prefetch_related('categories')[:12]
-        
-        # Get recent media
-        context['recent_media'] = MediaItem.objects.filter(
-            is_published=True
-        ).select_related().prefetch_related('categories')[:8]
-        
-        # Get categories with counts
-        context['categories'] = Category.objects.filter(
-            is_active=True
-        ).annotate(
-            media_count=models.Count('media_items')
-        )[:10]
-        
-        # Get featured testimonials
-        context['testimonials'] = Testimonial.objects.filter(
-            featured=True
-        )[:6]
-        
-        # Get statistics
-        context['total_media'] = MediaItem.objects.filter(is_published=True).count()
-        context['total_categories'] = Category.objects.filter(is_active=True).count()
-        context['total_videos'] = MediaItem.objects.filter(
-            is_published=True, 
-            media_type='video'
-        ).count()
-        context['total_images'] = MediaItem.objects.filter(
-            is_published=True, 
-            media_type='image'
-        ).count()
+        # Every section and statistic comes from the precomputed snapshot
+        context.update(get_homepage_snapshot())
         
         return context
 
@@ -89,27 +70,45 @@ class TermsOfServiceView(TemplateView):
     template_name = 'core/terms.html'
 
 
-class SitemapView(TemplateView):
+class SitemapIndexView(View):
     """
-    XML sitemap for search engines
+    XML sitemap index for search engines
     """
-    template_name = 'core/sitemap.xml'
-    content_type = 'application/xml'
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Get all published media
-        context['media_items'] = MediaItem.objects.filter(is_published=True)
-        
-        # Get all active categories
-        context['categories'] = Category.objects.filter(is_active=True)
-        
-        # Get all published collections
-        from media_portfolio.collections.models import Collection
-        context['collections'] = Collection.objects.filter(is_published=True)
-        
-        return context
+
+    def get(self, request):
+        stats = get_section_stats()
+        lastmods = [section['lastmod'] for section in stats.values() if section['lastmod']]
+        # The body holds absolute URLs, so it differs per host and scheme
+        base_url = request.build_absolute_uri('/').rstrip('/')
+        etag = make_etag('index', base_url, get_max_urls(), *[
+            (name, section['count'], section['lastmod']) for name, section in stats.items()
+        ])
+        return sitemap_response(
+            request, etag, max(lastmods, default=None),
+            lambda: render_index(base_url, stats)
+        )
+
+
+class SitemapSectionView(View):
+    """
+    One page of a sitemap section
+    """
+
+    def get(self, request, section, page):
+        sitemap = SECTIONS.get(section)
+        if sitemap is None:
+            raise Http404('Unknown sitemap section')
+
+        stats = sitemap.stats()
+        if page < 1 or (page - 1) * get_max_urls() >= max(stats['count'], 1):
+            raise Http404('Sitemap page out of range')
+
+        base_url = request.build_absolute_uri('/').rstrip('/')
+        etag = make_etag(section, page, base_url, get_max_urls(), stats['count'], stats['lastmod'])
+        return sitemap_response(
+            request, etag, stats['lastmod'],
+            lambda: render_section(base_url, sitemap, page)
+        )
 
 
 class RobotsTxtView(TemplateView):
@@ -120,6 +119,7 @@ class RobotsTxtView(TemplateView):
     content_type = 'text/plain'
 
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(rate_limit('theme'), name='post')
 class SetThemeView(View):
     """
     View for setting theme preference
@@ -129,15 +129,36 @@ class SetThemeView(View):
         theme = request.POST.get('theme', 'system')
         
         if theme in ['light', 'dark', 'system']:
-            request.session['theme'] = theme
-            
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({
-                    'success': True,
-                    'theme': theme
-                })
+            # Stored in a cookie (not the session) so cached pages can be keyed by theme
+            response = JsonResponse({
+                'success': True,
+                'theme': theme
+            })
+            response.set_cookie(THEME_COOKIE, theme, max_age=365 * 24 * 3600, samesite='Lax')
+            return response
         
         return JsonResponse({
             'success': False,
             'error': 'Invalid theme'
-        }, status=400)
\ No newline at end of file
+        }, status=400)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class SQLProfileView(View):
+    """
+    Staff page ranking views by sampled DB cost
+    """
+
+    def get(self, request):
+        context = {
+            **admin.site.each_context(request),
+            'title': 'SQL profile',
+            'profiles': get_profiles(),
+            'sample_rate': get_sample_rate(),
+            'nplusone_threshold': get_nplusone_threshold(),
+        }
+        return render(request, 'admin/sql_profile.html', context)
+
+    def post(self, request):
+        reset_profiles()
+        return redirect('sql_profile')
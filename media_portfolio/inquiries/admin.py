@@ -5,10 +5,10 @@ from .models import Inquiry
 
 @admin.register(Inquiry)
 class InquiryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'inquiry_type', 'subject', 'status', 'created_at']
-    list_filter = ['inquiry_type', 'status', 'created_at']
+    list_display = ['name', 'email', 'inquiry_type', 'subject', 'status', 'spam_score', 'created_at']
+    list_filter = ['inquiry_type', 'status', 'is_spam', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
-    readonly_fields = ['ip_address', 'created_at', 'responded_at']
+    readonly_fields = ['spam_score', 'ip_address', 'created_at', 'responded_at']
     
     fieldsets = (
         ('Inquiry Details', {
@@ -22,7 +22,7 @@ class InquiryAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Status', {
-            'fields': ('status', 'responded_at', 'response_notes')
+            'fields': ('status', 'is_spam', 'spam_score', 'responded_at', 'response_notes')
         }),
         ('Legal', {
             'fields': ('accepted_terms', 'accepted_privacy')
@@ -33,7 +33,7 @@ class InquiryAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['mark_as_read', 'mark_as_replied', 'mark_as_archived']
+    actions = ['mark_as_read', 'mark_as_replied', 'mark_as_archived', 'mark_as_spam']
     
     def mark_as_read(self, request, queryset):
         queryset.update(status='read')
@@ -45,4 +45,8 @@ class InquiryAdmin(admin.ModelAdmin):
     
     def mark_as_archived(self, request, queryset):
         queryset.update(status='archived')
-    mark_as_archived.short_description = "Archive selected"
\ No newline at end of file
+    mark_as_archived.short_description = "Archive selected"
+    
+    def mark_as_spam(self, request, queryset):
+        queryset.update(is_spam=True, spam_auto_flagged=False)
+    mark_as_spam.short_description = "Mark selected as spam"
\ No newline at end of file
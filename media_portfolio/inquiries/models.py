@@ -1,10 +1,10 @@
 from django.db import models
 from django.core.validators import EmailValidator
-from media_portfolio.core.models import BaseModel
+from media_portfolio.core.models import BaseModel, SpamScoredModel
 from media_portfolio.media.models import MediaItem
 
 
-class Inquiry(BaseModel):
+class Inquiry(SpamScoredModel, BaseModel):
     """
     Model for client inquiries and messages
     """
@@ -74,6 +74,7 @@ class Inquiry(BaseModel):
         default='new'
     )
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    is_spam = models.BooleanField(default=False)
     
     # Response tracking
     responded_at = models.DateTimeField(null=True, blank=True)
@@ -93,5 +94,15 @@ class Inquiry(BaseModel):
             models.Index(fields=['inquiry_type', 'status']),
         ]
 
+    spam_text_fields = ('name', 'email', 'company', 'subject', 'message')
+
     def __str__(self):
-        return f"{self.get_inquiry_type_display()}: {self.subject} - {self.name}"
\ No newline at end of file
+        return f"{self.get_inquiry_type_display()}: {self.subject} - {self.name}"
+
+    @classmethod
+    def spam_label_filters(cls):
+        # Inquiries that got a reply are legitimate
+        return (
+            models.Q(is_spam=True, spam_auto_flagged=False),
+            models.Q(status__in=['replied', 'in_progress', 'completed'], is_spam=False),
+        )
\ No newline at end of file
@@ -3,9 +3,12 @@ from django.views.generic import FormView, TemplateView
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils.decorators import method_decorator
+from media_portfolio.core.ratelimit import rate_limit, get_client_ip
 from .forms import InquiryForm
 
 
+@method_decorator(rate_limit('contact'), name='post')
 class ContactView(FormView):
     """
     View for contact/inquiry form
@@ -19,11 +22,7 @@ class ContactView(FormView):
         inquiry = form.save(commit=False)
         
         # Capture IP address
-        x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            inquiry.ip_address = x_forwarded_for.split(',')[0]
-        else:
-            inquiry.ip_address = self.request.META.get('REMOTE_ADDR')
+        inquiry.ip_address = get_client_ip(self.request)
         
         inquiry.save()
         
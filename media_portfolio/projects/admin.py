@@ -4,6 +4,7 @@ from django.contrib import admin
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Project, ProjectLike, ProjectComment
+from media_portfolio.core.comment_counts import moderate_comments
 
 
 class ProjectLikeInline(admin.TabularInline):
@@ -27,7 +28,7 @@ class ProjectCommentInline(admin.TabularInline):
 class ProjectAdmin(admin.ModelAdmin):
     list_display = [
         'title', 'difficulty_level', 'is_featured', 'is_published',
-        'stars_count', 'view_count', 'thumbnail_preview'
+        'stars_count', 'view_count', 'like_count', 'thumbnail_preview'
     ]
     list_filter = [
         'difficulty_level', 'is_featured', 'is_published', 'license',
@@ -36,7 +37,8 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ['title', 'short_summary', 'description', 'tags']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = [
-        'stars_count', 'forks_count', 'last_github_sync', 'view_count',
+        'stars_count', 'forks_count', 'last_github_sync', 'view_count', 'like_count',
+        'approved_comment_count', 'approved_top_level_count',
         'thumbnail_preview', 'thumbnail_webp_preview', 'thumbnail_blur_preview'
     ]
     inlines = [ProjectLikeInline, ProjectCommentInline]
@@ -74,7 +76,7 @@ class ProjectAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Statistics', {
-            'fields': ('view_count',),
+            'fields': ('view_count', 'like_count', 'approved_comment_count', 'approved_top_level_count'),
             'classes': ('collapse',)
         }),
         ('Copyright', {
@@ -122,19 +124,19 @@ class ProjectAdmin(admin.ModelAdmin):
 
 @admin.register(ProjectComment)
 class ProjectCommentAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'project', 'is_approved', 'created_at']
-    list_filter = ['is_approved', 'is_spam', 'created_at']
+    list_display = ['name', 'email', 'project', 'is_approved', 'spam_score', 'created_at']
+    list_filter = ['is_approved', 'is_spam', 'spam_auto_flagged', 'created_at']
     search_fields = ['name', 'email', 'content']
-    readonly_fields = ['ip_address', 'user_agent', 'created_at']
+    readonly_fields = ['spam_score', 'ip_address', 'user_agent', 'created_at']
     
     actions = ['approve_comments', 'mark_as_spam']
     
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        moderate_comments(queryset, is_approved=True, is_spam=False, spam_auto_flagged=False)
     approve_comments.short_description = "Approve selected comments"
     
     def mark_as_spam(self, request, queryset):
-        queryset.update(is_spam=True, is_approved=False)
+        moderate_comments(queryset, is_spam=True, is_approved=False, spam_auto_flagged=False)
     mark_as_spam.short_description = "Mark selected as spam"
 
 
@@ -0,0 +1,140 @@
+"""
+Sidebar facet counts for the project list.
+
+All counts for a filtered queryset are computed with one conditional
+aggregation query and cached per normalized filter signature. The cache
+namespace is bumped by Project/Category signals (see signals.py).
+"""
+import json
+import hashlib
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from media_portfolio.categories.models import Category
+from media_portfolio.core.cache_versions import get_cache_version, bump_cache_version
+from .models import Project
+
+FACET_NAMESPACE = 'project_facets'
+FACET_CACHE_TIMEOUT = 60 * 60
+FACET_FILTERS = ('difficulty', 'category', 'search', 'featured_only')
+
+
+def invalidate_facets():
+    """
+    Drop every cached facet count once the current transaction commits, so
+    a concurrent request cannot cache the old counts under the new version
+    """
+    transaction.on_commit(lambda: bump_cache_version(FACET_NAMESPACE))
+
+
+def facet_signature(filters):
+    """Stable hash of the filters that affect counts (sort/page do not)"""
+    normalized = {}
+    for name in FACET_FILTERS:
+        value = (filters or {}).get(name)
+        if isinstance(value, str):
+            value = ' '.join(value.lower().split())
+        if value:
+            normalized[name] = value
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def _supports_json_containment():
+    return connection.vendor == 'postgresql'
+
+
+def get_facet_vocabulary():
+    """
+    Facet values that exist at all: active categories and every technology
+    used by a published project. Cached until the next Project/Category change.
+    """
+    version = get_cache_version(FACET_NAMESPACE)
+    key = f'{FACET_NAMESPACE}:{version}:vocabulary'
+    vocabulary = cache.get(key)
+    if vocabulary is None:
+        technologies = set()
+        for stack in Project.objects.filter(is_published=True).values_list('technical_stack', flat=True):
+            technologies.update(tech for tech in stack or [] if isinstance(tech, str))
+        vocabulary = {
+            'categories': list(
+                Category.objects.filter(is_active=True).values_list('id', 'name')
+            ),
+            'tech_stack': sorted(technologies, key=str.lower),
+        }
+        cache.set(key, vocabulary, FACET_CACHE_TIMEOUT)
+    return vocabulary
+
+
+def compute_project_facets(queryset):
+    """
+    Count projects in ``queryset`` per difficulty, license, category and
+    technology in a single query.
+    """
+    vocabulary = get_facet_vocabulary()
+    difficulties = [level for level, _ in Project.DIFFICULTY_LEVELS]
+    licenses = [value for value, _ in Project._meta.get_field('license').choices]
+    technologies = vocabulary['tech_stack'] if _supports_json_containment() else []
+
+    # Aggregate over a pk subquery so joins already present in the filtered
+    # queryset (e.g. a category filter) cannot restrict the category counts.
+    base = Project.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+    aggregates = {'total': Count('pk', distinct=True)}
+    for i, level in enumerate(difficulties):
+        aggregates[f'd{i}'] = Count('pk', filter=Q(difficulty_level=level), distinct=True)
+    for i, license in enumerate(licenses):
+        aggregates[f'l{i}'] = Count('pk', filter=Q(license=license), distinct=True)
+    for category_id, _ in vocabulary['categories']:
+        aggregates[f'c{category_id}'] = Count('pk', filter=Q(categories__id=category_id), distinct=True)
+    for i, tech in enumerate(technologies):
+        aggregates[f't{i}'] = Count('pk', filter=Q(technical_stack__contains=[tech]), distinct=True)
+
+    row = base.aggregate(**aggregates)
+
+    if technologies:
+        tech_counts = {tech: row[f't{i}'] for i, tech in enumerate(technologies)}
+    else:
+        # No JSON containment operator (SQLite): tally the stacks in Python
+        tech_counts = {}
+        for stack in base.values_list('technical_stack', flat=True):
+            for tech in set(stack or []):
+                if isinstance(tech, str):
+                    tech_counts[tech] = tech_counts.get(tech, 0) + 1
+
+    return {
+        'total': row['total'],
+        'difficulty': {level: row[f'd{i}'] for i, level in enumerate(difficulties)},
+        'license': {license: row[f'l{i}'] for i, license in enumerate(licenses)},
+        'categories': [
+            {'id': category_id, 'name': name, 'project_count': row[f'c{category_id}']}
+            for category_id, name in vocabulary['categories']
+        ],
+        'tech_stack': sorted(
+            ({'name': tech, 'count': count} for tech, count in tech_counts.items() if count),
+            key=lambda item: (-item['count'], item['name'].lower())
+        ),
+    }
+
+
+def get_project_facets(queryset, filters):
+    """Cached facet counts for a queryset built from ``filters``"""
+    version = get_cache_version(FACET_NAMESPACE)
+    key = f'{FACET_NAMESPACE}:{version}:{facet_signature(filters)}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_project_facets(queryset)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
+
+
+def get_featured_projects(limit=3):
+    """Featured sidebar projects, cached with the facets"""
+    version = get_cache_version(FACET_NAMESPACE)
+    key = f'{FACET_NAMESPACE}:{version}:featured:{limit}'
+    projects = cache.get(key)
+    if projects is None:
+        projects = list(Project.objects.filter(is_published=True, is_featured=True)[:limit])
+        cache.set(key, projects, FACET_CACHE_TIMEOUT)
+    return projects
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, F
+from django.db.models.functions import Coalesce
+
+from media_portfolio.projects.models import Project, ProjectLike
+
+
+class Command(BaseCommand):
+    help = 'Recompute Project.like_count from the ProjectLike table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        likes = ProjectLike.objects.filter(
+            project=OuterRef('pk')
+        ).order_by().values('project').annotate(total=Count('pk')).values('total')
+
+        drifted = Project.objects.annotate(
+            actual_likes=Coalesce(Subquery(likes), 0)
+        ).exclude(
+            like_count=F('actual_likes')
+        ).values_list('pk', 'like_count', 'actual_likes')
+
+        drifted_pks = []
+        for pk, stored, actual in drifted:
+            self.stdout.write(f"Project {pk}: like_count={stored}, actual={actual}")
+            drifted_pks.append(pk)
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(drifted_pks)} projects need reconciliation")
+            return
+
+        # Recount inside the UPDATE so likes toggled since the scan are included
+        Project.objects.filter(pk__in=drifted_pks).update(
+            like_count=Coalesce(Subquery(likes), 0)
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled like counts for {len(drifted_pks)} projects"))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_like_count(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectLike = apps.get_model('projects', 'ProjectLike')
+    likes = ProjectLike.objects.filter(
+        project=OuterRef('pk')
+    ).order_by().values('project').annotate(total=Count('pk')).values('total')
+    Project.objects.update(like_count=Coalesce(Subquery(likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of likes, kept in sync by toggle_like'),
+        ),
+        migrations.RunPython(populate_like_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 10:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_COLUMNS = [('title', 'A'), ('tags', 'B'), ('short_summary', 'B'), ('description', 'C')]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+            for column, weight in SEARCH_COLUMNS
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS projects_project_search_gin '
+            'ON projects_project USING GIN (search_vector)'
+        )
+        schema_editor.execute(f'UPDATE projects_project SET search_vector = {vector}')
+    elif vendor == 'sqlite':
+        columns = ', '.join(column for column, _ in SEARCH_COLUMNS)
+        values = ', '.join(f"COALESCE({column}, '')" for column, _ in SEARCH_COLUMNS)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS projects_project_fts '
+            f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO projects_project_fts (rowid, {columns}) '
+            f'SELECT id, {values} FROM projects_project'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS projects_project_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS projects_project_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_like_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
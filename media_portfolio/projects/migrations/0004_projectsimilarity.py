@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-17 11:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Weighted feature overlap')),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 for the closest neighbor')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='projects.project')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Project Similarity',
+                'verbose_name_plural': 'Project Similarities',
+                'ordering': ['project', 'rank'],
+                'unique_together': {('project', 'similar')},
+                'indexes': [models.Index(fields=['project', 'rank'], name='projects_similarity_rank_idx')],
+            },
+        ),
+    ]
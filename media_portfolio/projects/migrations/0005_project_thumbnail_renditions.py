@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-17 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import media_portfolio.projects.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_projectsimilarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='thumbnail_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of the thumbnail the renditions were built from', max_length=32),
+        ),
+        migrations.CreateModel(
+            name='ProjectThumbnailRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(db_index=True, max_length=32)),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('avif', 'AVIF')], max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file', models.ImageField(upload_to=media_portfolio.projects.models.project_rendition_path)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Project Thumbnail Rendition',
+                'verbose_name_plural': 'Project Thumbnail Renditions',
+                'ordering': ['project', 'format', 'width'],
+                'unique_together': {('project', 'source_hash', 'format', 'width')},
+            },
+        ),
+    ]
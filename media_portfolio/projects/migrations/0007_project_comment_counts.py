@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-17 15:40
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectComment = apps.get_model('projects', 'ProjectComment')
+
+    def approved(**filters):
+        return Coalesce(Subquery(
+            ProjectComment.objects.filter(
+                project=OuterRef('pk'), is_approved=True, **filters
+            ).order_by().values('project').annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ), 0)
+
+    Project.objects.update(
+        approved_comment_count=approved(),
+        approved_top_level_count=approved(parent__isnull=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_projectcomment_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of approved comments (see core/comment_counts.py)'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='approved_top_level_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of approved comments that are not replies'),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-17 16:40
+
+from django.db import migrations
+import media_portfolio.core.search
+
+
+def drop_raw_index(apps, schema_editor):
+    # 0003 created the index with raw SQL; recreate it as a tracked index
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS projects_project_search_gin')
+
+
+def create_raw_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS projects_project_search_gin '
+            'ON projects_project USING GIN (search_vector)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_projectcomment_spam_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_raw_index, create_raw_index),
+        migrations.AddIndex(
+            model_name='project',
+            index=media_portfolio.core.search.SearchVectorIndex(fields=['search_vector'], name='projects_project_search_gin'),
+        ),
+    ]
@@ -1,9 +1,14 @@
 import os
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.utils import timezone
-from django.utils.text import slugify
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
-from media_portfolio.core.models import BaseModel
+from django.contrib.postgres.search import SearchVectorField
+from media_portfolio.core.models import BaseModel, UniqueSlugMixin, ThreadedModel, SpamScoredModel
+from media_portfolio.core.conditional import touch_model
+from media_portfolio.core.search import SearchVectorIndex
+from media_portfolio.core.view_counts import record_view, get_live_view_count
 from media_portfolio.categories.models import Category
 
 
@@ -14,7 +19,7 @@ def project_thumbnail_path(instance, filename):
     return f'projects/thumbnails/{instance.slug}_{timestamp}.{ext}'
 
 
-class Project(BaseModel):
+class Project(UniqueSlugMixin, BaseModel):
     """
     Enhanced Project model for portfolio with comprehensive fields
     """
@@ -73,6 +78,12 @@ class Project(BaseModel):
         null=True,
         help_text="Blurred placeholder for lazy loading"
     )
+    thumbnail_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        editable=False,
+        help_text="Content hash of the thumbnail the renditions were built from"
+    )
     
     # Links
     github_url = models.URLField(
@@ -137,6 +148,24 @@ class Project(BaseModel):
     is_published = models.BooleanField(default=True)
     published_date = models.DateTimeField(default=timezone.now)
     view_count = models.IntegerField(default=0, editable=False)
+    like_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of likes, kept in sync by toggle_like"
+    )
+    approved_comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of approved comments (see core/comment_counts.py)"
+    )
+    approved_top_level_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Denormalized number of approved comments that are not replies"
+    )
+    
+    # Full-text search (PostgreSQL; see core/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     # Copyright
     copyright_notice = models.CharField(
@@ -165,25 +194,20 @@ class Project(BaseModel):
             models.Index(fields=['difficulty_level', 'is_published']),
             models.Index(fields=['-stars_count']),
             models.Index(fields=['-published_date']),
+            SearchVectorIndex(fields=['search_vector'], name='projects_project_search_gin'),
         ]
 
+    # Fields indexed by the search backend, with their rank weight
+    search_fields = {
+        'title': 'A',
+        'tags': 'B',
+        'short_summary': 'B',
+        'description': 'C',
+    }
+
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        # Auto-generate slug if not provided
-        if not self.slug:
-            self.slug = slugify(self.title)
-        
-        # Ensure unique slug
-        original_slug = self.slug
-        counter = 1
-        while Project.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-            self.slug = f"{original_slug}-{counter}"
-            counter += 1
-        
-        super().save(*args, **kwargs)
-
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('projects:detail', args=[self.slug])
@@ -195,10 +219,46 @@ class Project(BaseModel):
             return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
         return []
 
-    def increment_view_count(self):
-        """Increment view count"""
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+    def increment_view_count(self, request=None):
+        """Buffer a view; written to the database by the flush task"""
+        return record_view(self, request)
+
+    @property
+    def live_view_count(self):
+        """View count including views not yet flushed to the database"""
+        return get_live_view_count(self)
+
+    def toggle_like(self, session_key, ip_address=None, user_agent=''):
+        """
+        Like or unlike this project for a session.
+        The like row and like_count change in the same transaction.
+        Returns (liked, like_count).
+        """
+        with transaction.atomic():
+            like, created = ProjectLike.objects.get_or_create(
+                project=self,
+                session_key=session_key,
+                defaults={
+                    'ip_address': ip_address,
+                    'user_agent': user_agent
+                }
+            )
+            if created:
+                delta = 1
+            else:
+                # Only decrement if this request actually removed the row
+                deleted, _ = ProjectLike.objects.filter(pk=like.pk).delete()
+                delta = -1 if deleted else 0
+
+            if delta:
+                # Clamped: likes deleted elsewhere (admin, cascades) can leave
+                # the counter behind, and it must never go below zero
+                Project.objects.filter(pk=self.pk).update(like_count=Greatest(F('like_count') + delta, 0))
+
+        if delta:
+            touch_model(Project)
+        self.refresh_from_db(fields=['like_count'])
+        return created, self.like_count
 
 
 class ProjectLike(BaseModel):
@@ -227,10 +287,85 @@ class ProjectLike(BaseModel):
         return f"Like for {self.project.title}"
 
 
-class ProjectComment(BaseModel):
+def project_rendition_path(instance, filename):
+    """Renditions are content-addressed so regenerating them is idempotent"""
+    return f'projects/thumbnails/renditions/{filename}'
+
+
+class ProjectThumbnailRendition(models.Model):
+    """
+    A resized, re-encoded copy of a project thumbnail (see projects/tasks.py)
+    """
+    FORMATS = [
+        ('webp', 'WebP'),
+        ('avif', 'AVIF'),
+    ]
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='renditions'
+    )
+    source_hash = models.CharField(max_length=32, db_index=True)
+    format = models.CharField(max_length=10, choices=FORMATS)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(upload_to=project_rendition_path)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'projects'
+        verbose_name = "Project Thumbnail Rendition"
+        verbose_name_plural = "Project Thumbnail Renditions"
+        ordering = ['project', 'format', 'width']
+        unique_together = ['project', 'source_hash', 'format', 'width']
+
+    def __str__(self):
+        return f"{self.project_id} {self.format} {self.width}w"
+
+
+class ProjectSimilarity(models.Model):
+    """
+    Precomputed related-project neighbors (see projects/similarity.py)
+    """
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='similarities'
+    )
+    similar = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='similar_to'
+    )
+    score = models.FloatField(help_text="Weighted feature overlap")
+    rank = models.PositiveSmallIntegerField(help_text="1 for the closest neighbor")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'projects'
+        verbose_name = "Project Similarity"
+        verbose_name_plural = "Project Similarities"
+        ordering = ['project', 'rank']
+        unique_together = ['project', 'similar']
+        indexes = [
+            models.Index(fields=['project', 'rank'], name='projects_similarity_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} -> {self.similar_id} ({self.score:.2f})"
+
+
+class ProjectComment(ThreadedModel, SpamScoredModel, BaseModel):
     """
     Model for comments on projects
     """
+    # Project.approved_comment_count & co. are kept in sync for this relation
+    counter_target = 'project'
+    # Replies are looked up within one project's thread
+    thread_scope = 'project'
+    spam_text_fields = ('name', 'email', 'website', 'content')
+
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -268,6 +403,7 @@ class ProjectComment(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['project', 'is_approved']),
+            models.Index(fields=['project', 'path']),
         ]
 
     def __str__(self):
@@ -1,88 +1,122 @@
-import os
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.files.base import ContentFile
-from django.conf import settings
-from .models import Project
-from media_portfolio.media.utils import (
-    optimize_image_to_webp,
-    create_blurred_placeholder
-)
+from .models import Project, ProjectSimilarity
+from .facets import invalidate_facets
+from .tasks import update_project_similarity, generate_project_renditions
+from media_portfolio.categories.models import Category
+from media_portfolio.core import search
 
 logger = logging.getLogger(__name__)
 
+# Keep the full-text index in sync with project saves/deletes
+search.register(Project)
+
+
+# Fields that feed the related-projects scores (categories are handled by m2m_changed)
+SIMILARITY_FIELDS = {'tags', 'technical_stack', 'api_integrations', 'is_published'}
+
 
 @receiver(pre_save, sender=Project)
 def project_pre_save(sender, instance, **kwargs):
     """
     Handle pre-save operations for projects
     """
-    # Check if thumbnail is being updated
+    old = None
     if instance.pk:
-        try:
-            old_instance = Project.objects.get(pk=instance.pk)
-            if old_instance.thumbnail != instance.thumbnail:
-                instance._thumbnail_changed = True
-            else:
-                instance._thumbnail_changed = False
-        except Project.DoesNotExist:
-            instance._thumbnail_changed = False
+        old = Project.objects.filter(pk=instance.pk).values('thumbnail', *SIMILARITY_FIELDS).first()
+
+    # Check if thumbnail is being updated
+    if old is not None:
+        instance._thumbnail_changed = old['thumbnail'] != instance.thumbnail.name
+    elif instance.pk:
+        instance._thumbnail_changed = False
     else:
         instance._thumbnail_changed = True if instance.thumbnail else False
 
+    # New rows, and rows whose similarity features changed, need rescoring
+    instance._similarity_changed = old is None or any(
+        old[field] != getattr(instance, field) for field in SIMILARITY_FIELDS
+    )
+
 
 @receiver(post_save, sender=Project)
-def project_post_save(sender, instance, created, **kwargs):
+def project_post_save(sender, instance, created, raw=False, **kwargs):
     """
-    Handle post-save operations: image optimization, WebP conversion, blur placeholders
+    Queue WebP/AVIF renditions and the blur placeholder once the save is committed
     """
-    if not hasattr(instance, '_thumbnail_changed') or not instance._thumbnail_changed:
+    if raw or not getattr(instance, '_thumbnail_changed', False):
         return
-    
+
     if not instance.thumbnail:
         return
-    
-    try:
-        # Get the thumbnail path
-        thumbnail_path = instance.thumbnail.path
-        
-        # Check if file exists
-        if not os.path.exists(thumbnail_path):
-            logger.error(f"Thumbnail file not found: {thumbnail_path}")
-            return
-        
-        # 1. Optimize and convert to WebP
-        webp_content = optimize_image_to_webp(thumbnail_path, quality=80)
-        if webp_content:
-            # Generate WebP filename
-            webp_filename = f"{os.path.splitext(os.path.basename(thumbnail_path))[0]}.webp"
-            
-            # Save WebP version
-            instance.thumbnail_webp.save(
-                webp_filename,
-                ContentFile(webp_content),
-                save=False
-            )
-            logger.info(f"Generated WebP for project {instance.id}: {webp_filename}")
-        
-        # 2. Create blurred placeholder
-        blur_content = create_blurred_placeholder(thumbnail_path, blur_radius=10, size=(20, 20))
-        if blur_content:
-            # Generate blur filename
-            blur_filename = f"{os.path.splitext(os.path.basename(thumbnail_path))[0]}_blur.jpg"
-            
-            # Save blur version
-            instance.thumbnail_blur.save(
-                blur_filename,
-                ContentFile(blur_content),
-                save=False
-            )
-            logger.info(f"Generated blur placeholder for project {instance.id}")
-        
-        # Save the instance with new images
-        if instance.thumbnail_webp or instance.thumbnail_blur:
-            instance.save(update_fields=['thumbnail_webp', 'thumbnail_blur'])
-        
-    except Exception as e:
-        logger.error(f"Error in project image optimization for {instance.id}: {str(e)}")
\ No newline at end of file
+
+    transaction.on_commit(lambda: generate_project_renditions.delay(instance.pk))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_project_facets(sender, **kwargs):
+    """
+    Drop cached sidebar facet counts when projects or categories change
+    """
+    invalidate_facets()
+
+
+@receiver(m2m_changed, sender=Project.categories.through)
+def project_categories_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_facets()
+
+
+def schedule_similarity_update(project_ids):
+    project_ids = list(project_ids)
+    transaction.on_commit(lambda: update_project_similarity.delay(project_ids))
+
+
+@receiver(post_save, sender=Project)
+def project_similarity_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SIMILARITY_FIELDS.intersection(update_fields):
+        return
+    if not getattr(instance, '_similarity_changed', True):
+        # Counters, sync metadata or other fields only
+        return
+    schedule_similarity_update([instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.categories.through)
+def project_similarity_on_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # post_clear has no pk_set; note the projects about to lose the category
+        instance._similarity_cleared_ids = list(
+            sender.objects.filter(category_id=instance.pk).values_list('project_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Category side: every project that gained or lost the category
+        if action == 'post_clear':
+            pk_set = instance.__dict__.pop('_similarity_cleared_ids', None)
+        if pk_set:
+            schedule_similarity_update(pk_set)
+    else:
+        schedule_similarity_update([instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+def project_similarity_on_delete(sender, instance, **kwargs):
+    """
+    Projects that listed the deleted one as a neighbor lose a row to the
+    cascade; recompute them once the delete is committed
+    """
+    referrers = set(
+        ProjectSimilarity.objects.filter(similar=instance).values_list('project_id', flat=True)
+    )
+    if referrers:
+        schedule_similarity_update(referrers)
@@ -0,0 +1,222 @@
+"""
+Related-project scoring.
+
+Each published project becomes a sparse feature vector over its categories,
+tags, technical stack and API integrations. Entries hold the square root of
+the feature's weight, so the dot product of two vectors is the weighted
+number of features they share. The top neighbors of every project are
+stored in ``ProjectSimilarity`` and read by the detail view.
+"""
+import json
+import logging
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from .models import Project, ProjectSimilarity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {
+    'category': 3.0,
+    'tech': 2.0,
+    'api': 1.5,
+    'tag': 1.0,
+}
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'PROJECT_SIMILARITY_WEIGHTS', {})}
+
+
+def get_top_k():
+    return getattr(settings, 'PROJECT_SIMILARITY_TOP_K', 6)
+
+
+def _normalize(value):
+    return str(value).strip().lower()
+
+
+def _project_features(project, category_ids):
+    """Return the set of (kind, value) features of a project"""
+    features = {('category', pk) for pk in category_ids}
+    features.update(('tag', _normalize(tag)) for tag in project.tag_list)
+    for kind, values in (('tech', project.technical_stack), ('api', project.api_integrations)):
+        if isinstance(values, list):
+            features.update((kind, _normalize(value)) for value in values if str(value).strip())
+    return features
+
+
+def build_feature_matrix(project_ids=None):
+    """
+    Return (project_ids, matrix) for all published projects (or the
+    published ones among ``project_ids``), where row i of the CSR matrix is
+    the feature vector of project_ids[i]
+    """
+    queryset = Project.objects.filter(is_published=True)
+    if project_ids is not None:
+        queryset = queryset.filter(pk__in=list(project_ids))
+    projects = list(queryset.only('id', 'tags', 'technical_stack', 'api_integrations'))
+    project_ids = [project.id for project in projects]
+
+    categories = {}
+    for project_id, category_id in Project.categories.through.objects.filter(
+        project_id__in=project_ids
+    ).values_list('project_id', 'category_id'):
+        categories.setdefault(project_id, []).append(category_id)
+
+    weights = get_weights()
+    vocabulary = {}
+    rows, cols, data = [], [], []
+    for row, project in enumerate(projects):
+        for feature in _project_features(project, categories.get(project.id, ())):
+            col = vocabulary.setdefault(feature, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+            data.append(np.sqrt(weights.get(feature[0], 1.0)))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float64), (rows, cols)),
+        shape=(len(projects), len(vocabulary))
+    )
+    return project_ids, matrix
+
+
+def _contains_any(field, values):
+    """Q matching rows whose ``field`` text contains any of ``values``"""
+    query = Q()
+    for value in values:
+        query |= Q(**{f'{field}__icontains': value})
+        # JSON stored as text escapes non-ASCII characters
+        encoded = json.dumps(value)[1:-1]
+        if encoded != value:
+            query |= Q(**{f'{field}__icontains': encoded})
+    return query
+
+
+def sharing_features(project_ids):
+    """
+    Ids of the published projects that may share a feature with one of
+    ``project_ids``. Categories match exactly; tags, technologies and APIs
+    match as substrings, so this is a superset and the feature matrix
+    decides the actual overlap.
+    """
+    projects = list(
+        Project.objects.filter(pk__in=list(project_ids)).only('id', 'tags', 'technical_stack', 'api_integrations')
+    )
+    through = Project.categories.through.objects
+    category_ids = through.filter(project_id__in=[project.id for project in projects]).values('category_id')
+    query = Q(pk__in=through.filter(category_id__in=category_ids).values('project_id'))
+
+    tags, values = set(), {'technical_stack': set(), 'api_integrations': set()}
+    for project in projects:
+        tags.update(project.tag_list)
+        for field, found in values.items():
+            items = getattr(project, field)
+            if isinstance(items, list):
+                found.update(str(item).strip() for item in items if str(item).strip())
+    query |= _contains_any('tags', tags)
+    for field, found in values.items():
+        query |= _contains_any(field, found)
+
+    return set(Project.objects.filter(query, is_published=True).values_list('id', flat=True))
+
+
+def _top_neighbors(scores, row_ids, project_ids, top_k):
+    """
+    Pick the top-k neighbors for each row of a sparse score matrix.
+    Returns {project_id: [(neighbor_id, score), ...]} best first.
+    """
+    scores = scores.tocsr()
+    ids = np.asarray(project_ids)
+    neighbors = {}
+    for i, project_id in enumerate(row_ids):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        cols = scores.indices[start:end]
+        values = scores.data[start:end]
+
+        keep = (values > 0) & (ids[cols] != project_id)
+        cols, values = cols[keep], values[keep]
+        if len(values) > top_k:
+            best = np.argpartition(-values, top_k - 1)[:top_k]
+            cols, values = cols[best], values[best]
+        order = np.argsort(-values, kind='stable')
+        neighbors[project_id] = [(project_ids[cols[j]], float(values[j])) for j in order]
+    return neighbors
+
+
+def _store(neighbors):
+    """Replace the stored neighbor rows of the given projects"""
+    rows = [
+        ProjectSimilarity(project_id=project_id, similar_id=similar_id, score=score, rank=rank)
+        for project_id, items in neighbors.items()
+        for rank, (similar_id, score) in enumerate(items, start=1)
+    ]
+    with transaction.atomic():
+        ProjectSimilarity.objects.filter(project_id__in=list(neighbors)).delete()
+        ProjectSimilarity.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def rebuild_similarities():
+    """Recompute the neighbor table for every published project"""
+    project_ids, matrix = build_feature_matrix()
+    top_k = get_top_k()
+
+    with transaction.atomic():
+        ProjectSimilarity.objects.exclude(project_id__in=project_ids).delete()
+        if not project_ids:
+            return 0
+        neighbors = _top_neighbors(matrix @ matrix.T, project_ids, project_ids, top_k)
+        return _store(neighbors)
+
+
+def update_similarities(changed_ids):
+    """
+    Incrementally refresh the table after ``changed_ids`` were saved, edited
+    or deleted.
+
+    Only rows that can be affected are recomputed: the changed projects, the
+    projects that currently list one of them as a neighbor, and the projects
+    sharing at least one feature with them. Those rows are scored against
+    the projects sharing a feature with any of them rather than against
+    every published project.
+    """
+    changed_ids = set(changed_ids)
+
+    affected = set(changed_ids)
+    affected.update(
+        ProjectSimilarity.objects.filter(
+            similar_id__in=changed_ids
+        ).values_list('project_id', flat=True)
+    )
+
+    # Changed projects and their possible overlaps; keep the actual ones
+    project_ids, matrix = build_feature_matrix(changed_ids | sharing_features(changed_ids))
+    positions = {project_id: i for i, project_id in enumerate(project_ids)}
+    changed_rows = [positions[pk] for pk in changed_ids if pk in positions]
+    if changed_rows:
+        overlap = matrix[changed_rows] @ matrix.T
+        affected.update(project_ids[col] for col in np.unique(overlap.indices))
+
+    # Every neighbor an affected project can have shares a feature with it
+    project_ids, matrix = build_feature_matrix(affected | sharing_features(affected))
+    positions = {project_id: i for i, project_id in enumerate(project_ids)}
+
+    # Projects that are gone or unpublished lose their own rows
+    ProjectSimilarity.objects.filter(
+        project_id__in=[pk for pk in affected if pk not in positions]
+    ).delete()
+    ProjectSimilarity.objects.filter(
+        similar_id__in=[pk for pk in changed_ids if pk not in positions]
+    ).delete()
+
+    row_ids = [pk for pk in affected if pk in positions]
+    if not row_ids:
+        return 0
+    scores = matrix[[positions[pk] for pk in row_ids]] @ matrix.T
+    neighbors = _top_neighbors(scores, row_ids, project_ids, get_top_k())
+    count = _store(neighbors)
+    logger.info(f"Refreshed related projects for {len(row_ids)} projects")
+    return count
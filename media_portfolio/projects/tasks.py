@@ -0,0 +1,168 @@
+import logging
+from celery import shared_task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from media_portfolio.core.page_cache import invalidate_page_cache
+from media_portfolio.core.conditional import touch_model
+from media_portfolio.core.utils import (
+    get_file_hash,
+    open_image,
+    encode_rendition,
+    encode_blur_placeholder,
+    supported_rendition_formats
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RENDITION_WIDTHS = (320, 640, 1280)
+
+
+@shared_task
+def update_project_similarity(project_ids):
+    """
+    Celery task to refresh related projects after the given projects changed
+    """
+    from .similarity import update_similarities
+
+    try:
+        count = update_similarities(project_ids)
+        # Neighbor rows are bulk-written without signals
+        invalidate_page_cache()
+        return count
+    except Exception as e:
+        logger.error(f"Related projects update failed for {project_ids}: {str(e)}")
+        raise
+
+
+@shared_task
+def rebuild_project_similarity():
+    """
+    Celery task to recompute the whole related-projects table
+    """
+    from .similarity import rebuild_similarities
+
+    try:
+        count = rebuild_similarities()
+        invalidate_page_cache()
+        logger.info(f"Rebuilt related projects table ({count} rows)")
+        return count
+    except Exception as e:
+        logger.error(f"Related projects rebuild failed: {str(e)}")
+        raise
+
+
+@shared_task
+def generate_project_renditions(project_id):
+    """
+    Celery task to build responsive thumbnail renditions and the blur
+    placeholder for a project.
+
+    Renditions are keyed by the thumbnail's content hash: running the task
+    twice for the same image does no work, and files already present in
+    storage are reused.
+    """
+    from .models import Project, ProjectThumbnailRendition, project_rendition_path
+
+    try:
+        project = Project.objects.get(pk=project_id)
+    except Project.DoesNotExist:
+        return
+    if not project.thumbnail:
+        return
+
+    thumbnail_name = project.thumbnail.name
+    storage = project.thumbnail.storage
+    widths = getattr(settings, 'PROJECT_THUMBNAIL_WIDTHS', DEFAULT_RENDITION_WIDTHS)
+    formats = supported_rendition_formats()
+
+    try:
+        with storage.open(thumbnail_name, 'rb') as source:
+            source_hash = get_file_hash(source)
+            existing = set(
+                project.renditions.filter(source_hash=source_hash).values_list('format', 'width')
+            )
+            if project.thumbnail_hash == source_hash and existing:
+                return
+
+            source.seek(0)
+            img = open_image(source)
+            img.load()
+    except Exception as e:
+        logger.error(f"Could not read thumbnail for project {project_id}: {str(e)}")
+        raise
+
+    renditions = []
+    for fmt in formats:
+        # Never upscale: widths above the original collapse into one rendition
+        for width in sorted({min(w, img.width) for w in widths}):
+            name = project_rendition_path(None, f'{source_hash}_{width}.{fmt}')
+            height = round(img.height * width / img.width)
+            if not storage.exists(name):
+                content, width, height = encode_rendition(img, width, fmt)
+                name = storage.save(name, ContentFile(content))
+            renditions.append(ProjectThumbnailRendition(
+                project=project,
+                source_hash=source_hash,
+                format=fmt,
+                width=width,
+                height=height,
+                file=name
+            ))
+
+    blur_name = f'projects/thumbnails/blur/{source_hash}_blur.jpg'
+    if not storage.exists(blur_name):
+        blur_name = storage.save(blur_name, ContentFile(encode_blur_placeholder(img)))
+
+    webp = [r for r in renditions if r.format == 'webp']
+    webp_name = max(webp, key=lambda r: r.width).file.name if webp else None
+
+    with transaction.atomic():
+        current = Project.objects.select_for_update().filter(pk=project_id).values(
+            'thumbnail', 'thumbnail_webp', 'thumbnail_blur'
+        ).first()
+        if current is None or current['thumbnail'] != thumbnail_name:
+            # The thumbnail was replaced meanwhile; its own task will run
+            logger.info(f"Thumbnail changed during rendition build for project {project_id}")
+            return
+
+        stale = list(project.renditions.exclude(source_hash=source_hash).values_list('file', flat=True))
+        # Superseded WebP/blur files, including ones from before renditions existed
+        stale.extend(
+            name for name in (current['thumbnail_webp'], current['thumbnail_blur'])
+            if name and name not in (webp_name, blur_name)
+        )
+        project.renditions.exclude(source_hash=source_hash).delete()
+        ProjectThumbnailRendition.objects.bulk_create(renditions, ignore_conflicts=True)
+        Project.objects.filter(pk=project_id).update(
+            thumbnail_hash=source_hash,
+            thumbnail_webp=webp_name,
+            thumbnail_blur=blur_name
+        )
+        transaction.on_commit(lambda: _delete_unreferenced_files(storage, stale))
+        transaction.on_commit(invalidate_page_cache)
+        # bulk_create/update skip the signals that maintain the ETag stamps
+        transaction.on_commit(lambda: touch_model(ProjectThumbnailRendition))
+        transaction.on_commit(lambda: touch_model(Project))
+
+    logger.info(f"Generated {len(renditions)} thumbnail renditions for project {project_id}")
+    return len(renditions)
+
+
+def _delete_unreferenced_files(storage, names):
+    """Remove rendition files no project points at any more (files are shared by hash)"""
+    from .models import Project, ProjectThumbnailRendition
+
+    names = set(names)
+    referenced = set(
+        ProjectThumbnailRendition.objects.filter(file__in=names).values_list('file', flat=True)
+    )
+    for field in ('thumbnail_webp', 'thumbnail_blur'):
+        referenced.update(
+            Project.objects.filter(**{f'{field}__in': names}).values_list(field, flat=True)
+        )
+    for name in names - referenced:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete stale rendition {name}: {str(e)}")
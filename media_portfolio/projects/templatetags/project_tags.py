@@ -0,0 +1,63 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+# Preferred first: browsers take the first <source> they can decode
+SOURCE_TYPES = (
+    ('avif', 'image/avif'),
+    ('webp', 'image/webp'),
+)
+
+
+def _renditions_by_format(project):
+    # .all() so list views can prefetch_related('renditions')
+    renditions = {}
+    for rendition in project.renditions.all():
+        if rendition.source_hash == project.thumbnail_hash:
+            renditions.setdefault(rendition.format, []).append(rendition)
+    return renditions
+
+
+@register.simple_tag
+def thumbnail_srcset(project, fmt='webp'):
+    """
+    Returns a srcset attribute value for a project's thumbnail renditions
+    Usage: <img srcset="{% thumbnail_srcset project 'webp' %}" ...>
+    """
+    renditions = sorted(_renditions_by_format(project).get(fmt, []), key=lambda r: r.width)
+    return ', '.join(f'{r.file.url} {r.width}w' for r in renditions)
+
+
+@register.simple_tag
+def responsive_thumbnail(project, sizes='100vw', css_class='', style=''):
+    """
+    Renders a <picture> with AVIF/WebP srcsets, falling back to the original upload
+    Usage: {% responsive_thumbnail project sizes="(min-width: 992px) 33vw, 100vw" css_class="w-100" %}
+    """
+    if not project.thumbnail:
+        return ''
+
+    renditions = _renditions_by_format(project)
+    sources = []
+    for fmt, mime_type in SOURCE_TYPES:
+        items = sorted(renditions.get(fmt, []), key=lambda r: r.width)
+        if items:
+            srcset = ', '.join(f'{r.file.url} {r.width}w' for r in items)
+            sources.append((mime_type, srcset, sizes))
+
+    placeholder = ''
+    if project.thumbnail_blur:
+        placeholder = format_html(
+            'background-image: url({}); background-size: cover; ', project.thumbnail_blur.url
+        )
+
+    return format_html(
+        '<picture>{}<img src="{}" class="{}" style="{}{}" alt="{}" loading="lazy" decoding="async"></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', sources),
+        project.thumbnail.url,
+        css_class,
+        placeholder,
+        style,
+        project.title
+    )
@@ -1,3 +1,223 @@
-from django.test import TestCase
+from contextlib import contextmanager
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from media_portfolio.categories.models import Category
+from media_portfolio.core.comment_counts import moderate_comments
+from media_portfolio.core.threads import MAX_DEPTH, PATH_STEP, path_segment
+from .facets import facet_signature, get_project_facets
+from .models import Project, ProjectComment
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@contextmanager
+def committed(test_case):
+    """Run the block's on_commit callbacks, without queueing Celery tasks"""
+    with mock.patch('celery.app.task.Task.apply_async'), test_case.captureOnCommitCallbacks(execute=True):
+        yield
+
+
+def make_project(title='Project', **kwargs):
+    return Project.objects.create(title=title, short_summary='Summary', **kwargs)
+
+
+def make_comment(project, parent=None, **kwargs):
+    kwargs.setdefault('content', 'Nice work')
+    return ProjectComment.objects.create(
+        project=project, parent=parent, name='Visitor', email='visitor@example.com', **kwargs
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UniqueSlugMixinTests(TestCase):
+    def test_blank_slug_is_generated_and_suffixed(self):
+        first = make_project('Media Server')
+        second = make_project('Media Server')
+        self.assertEqual(first.slug, 'media-server')
+        self.assertEqual(second.slug, 'media-server-1')
+
+    def test_slug_race_is_retried(self):
+        Category.objects.create(name='Taken', category_type='medium')
+        # A concurrent insert took the slug between allocation and INSERT
+        with mock.patch('media_portfolio.core.models.allocate_unique_slug', side_effect=['taken', 'taken-1']) as allocate:
+            category = Category.objects.create(name='Taken', category_type='genre')
+        self.assertEqual(allocate.call_count, 2)
+        self.assertEqual(category.slug, 'taken-1')
+
+    def test_unchanged_slug_is_not_reallocated(self):
+        project = Project.objects.get(pk=make_project('Stable').pk)
+        with mock.patch('media_portfolio.core.models.allocate_unique_slug') as allocate:
+            project.short_summary = 'Edited'
+            project.save()
+        allocate.assert_not_called()
+        self.assertEqual(project.slug, 'stable')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ToggleLikeTests(TestCase):
+    def setUp(self):
+        self.project = make_project()
+
+    def test_like_and_unlike(self):
+        self.assertEqual(self.project.toggle_like('session-a'), (True, 1))
+        self.assertEqual(self.project.toggle_like('session-b'), (True, 2))
+        self.assertEqual(self.project.toggle_like('session-a'), (False, 1))
+        self.assertEqual(Project.objects.get(pk=self.project.pk).like_count, 1)
+
+    def test_unlike_never_goes_below_zero(self):
+        self.project.toggle_like('session-a')
+        # Counter drifted behind the like rows
+        Project.objects.filter(pk=self.project.pk).update(like_count=0)
+        self.assertEqual(self.project.toggle_like('session-a'), (False, 0))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ThreadedModelTests(TestCase):
+    def setUp(self):
+        self.project = make_project()
+
+    def test_path_and_depth(self):
+        root = make_comment(self.project)
+        reply = make_comment(self.project, parent=root)
+        nested = make_comment(self.project, parent=reply)
+
+        self.assertEqual((root.path, root.depth), (path_segment(root.pk), 0))
+        self.assertEqual(reply.path, root.path + path_segment(reply.pk))
+        self.assertEqual(nested.depth, 2)
+        self.assertEqual(len(nested.path), 3 * PATH_STEP)
+        self.assertEqual(ProjectComment.objects.get(pk=nested.pk).path, nested.path)
+
+    def test_move_rewrites_subtree(self):
+        first, second = make_comment(self.project), make_comment(self.project)
+        reply = make_comment(self.project, parent=first)
+        nested = make_comment(self.project, parent=reply)
+
+        reply = ProjectComment.objects.get(pk=reply.pk)
+        reply.parent = second
+        reply.save()
+
+        nested.refresh_from_db()
+        self.assertEqual(reply.path, second.path + path_segment(reply.pk))
+        self.assertEqual(nested.path, reply.path + path_segment(nested.pk))
+        self.assertEqual(nested.depth, 2)
+
+    def test_reply_past_max_depth_is_flattened(self):
+        parent = make_comment(self.project)
+        for _ in range(MAX_DEPTH):
+            parent = make_comment(self.project, parent=parent)
+        self.assertEqual(parent.depth, MAX_DEPTH)
+
+        with self.assertLogs('media_portfolio.core.models', 'WARNING'):
+            reply = make_comment(self.project, parent=parent)
+        self.assertEqual(reply.parent_id, parent.parent_id)
+        self.assertEqual(reply.depth, MAX_DEPTH)
+
+    def test_move_cannot_push_replies_past_max_depth(self):
+        deep = make_comment(self.project)
+        for _ in range(MAX_DEPTH - 1):
+            deep = make_comment(self.project, parent=deep)
+        # A comment with one reply, moved under a comment at MAX_DEPTH - 1
+        other = make_comment(self.project)
+        make_comment(self.project, parent=other)
+
+        other = ProjectComment.objects.get(pk=other.pk)
+        other.parent = deep
+        with self.assertRaises(ValueError):
+            other.save()
+        self.assertEqual(ProjectComment.objects.get(pk=other.pk).parent_id, None)
+
+    def test_cannot_move_under_own_reply(self):
+        root = make_comment(self.project)
+        reply = make_comment(self.project, parent=root)
+        root = ProjectComment.objects.get(pk=root.pk)
+        root.parent = reply
+        with self.assertRaises(ValueError):
+            root.save()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ModerateCommentsTests(TestCase):
+    def test_counters_follow_moderation(self):
+        project = make_project()
+        root = make_comment(project)
+        make_comment(project, parent=root)
+        make_comment(project, is_approved=True)
+
+        # Pending comments are not counted
+        project.refresh_from_db()
+        self.assertEqual((project.approved_comment_count, project.approved_top_level_count), (1, 1))
+
+        updated = moderate_comments(ProjectComment.objects.filter(is_approved=False), is_approved=True)
+        self.assertEqual(updated, 2)
+        project.refresh_from_db()
+        self.assertEqual((project.approved_comment_count, project.approved_top_level_count), (3, 2))
+
+        moderate_comments(ProjectComment.objects.filter(pk=root.pk), is_approved=False, is_spam=True)
+        project.refresh_from_db()
+        self.assertEqual((project.approved_comment_count, project.approved_top_level_count), (2, 1))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FacetTests(TestCase):
+    def published(self):
+        return Project.objects.filter(is_published=True)
+
+    def test_signature_ignores_case_spacing_and_paging(self):
+        self.assertEqual(
+            facet_signature({'search': '  Django   API', 'sort': 'stars', 'page': '3'}),
+            facet_signature({'search': 'django api'})
+        )
+        self.assertNotEqual(facet_signature({'difficulty': 'beginner'}), facet_signature({}))
+
+    def test_counts_are_cached_until_a_project_changes(self):
+        make_project('One', difficulty_level='beginner', technical_stack=['Django'])
+        facets = get_project_facets(self.published(), {})
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(facets['difficulty']['beginner'], 1)
+        self.assertEqual(facets['tech_stack'], [{'name': 'Django', 'count': 1}])
+
+        # A raw update sends no signal: the cached counts are served
+        Project.objects.update(difficulty_level='expert')
+        self.assertEqual(get_project_facets(self.published(), {})['difficulty']['beginner'], 1)
+
+        # A save bumps the version once the transaction commits
+        with committed(self):
+            make_project('Two', difficulty_level='beginner')
+        facets = get_project_facets(self.published(), {})
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual((facets['difficulty']['beginner'], facets['difficulty']['expert']), (1, 1))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LoadCommentsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = make_project('Media Server')
+        self.url = reverse('projects:load_comments', args=[self.project.slug])
+        make_comment(self.project, content='First comment', is_approved=True)
+
+    def test_unchanged_page_is_answered_with_304(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'First comment')
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A comment awaiting moderation shows nowhere
+        with committed(self):
+            make_comment(self.project, content='Pending comment')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_new_approved_comment_changes_the_page(self):
+        etag = self.client.get(self.url)['ETag']
+        with committed(self):
+            make_comment(self.project, content='Second comment', is_approved=True)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Second comment')
+        self.assertNotEqual(response['ETag'], etag)
@@ -2,19 +2,30 @@ from django.shortcuts import render, get_object_or_404, redirect  # Added redire
 from django.views.generic import ListView, DetailView, View
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.contrib import messages
-from django.db.models import Q, Count
 from django.core.paginator import Paginator
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import never_cache
 from django.utils import timezone
 import json
 
-from .models import Project, ProjectLike, ProjectComment
+from .models import Project, ProjectComment
 from .forms import ProjectCommentForm, ProjectFilterForm
-from media_portfolio.categories.models import Category
+from .facets import get_project_facets, get_featured_projects
+from media_portfolio.core.search import get_search_backend
+from media_portfolio.core.pagination import CursorPaginator, InvalidCursor, CursorPaginationMixin
+from media_portfolio.core.page_cache import cache_anonymous_page
+from media_portfolio.core.conditional import conditional_models
+from media_portfolio.core.navigation import AdjacentNavigationMixin
+from media_portfolio.core.seen_filter import SeenFilter
+from media_portfolio.core.threads import attach_replies
+from media_portfolio.core.comment_fragments import cached_comment_page, get_target_id
+from media_portfolio.core.ratelimit import rate_limit, get_client_ip
 
 
-class ProjectListView(ListView):
+@conditional_models('projects.Project', 'categories.Category', 'projects.ProjectThumbnailRendition')
+@cache_anonymous_page()
+class ProjectListView(CursorPaginationMixin, ListView):
     """
     View for listing all projects with filtering
     """
@@ -22,13 +33,23 @@ class ProjectListView(ListView):
     template_name = 'projects/project_list.html'
     context_object_name = 'projects'
     paginate_by = 9
+    cursor_ordering = ('-is_featured', '-published_date', 'id')
+
+    def get_cursor_ordering(self):
+        # Keyset pagination only applies to the default ordering; custom
+        # sorts and relevance-ranked searches keep page numbers
+        if self.facet_filters.get('sort') or self.facet_filters.get('search'):
+            return None
+        return self.cursor_ordering
 
     def get_queryset(self):
         queryset = Project.objects.filter(is_published=True)
+        self.facet_filters = {}
         
         # Apply filters
         form = ProjectFilterForm(self.request.GET)
         if form.is_valid():
+            self.facet_filters = form.cleaned_data
             difficulty = form.cleaned_data.get('difficulty')
             category_id = form.cleaned_data.get('category')
             search = form.cleaned_data.get('search')
@@ -42,48 +63,34 @@ class ProjectListView(ListView):
                 queryset = queryset.filter(categories__id=category_id)
             
             if search:
-                queryset = queryset.filter(
-                    Q(title__icontains=search) |
-                    Q(short_summary__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(tags__icontains=search)
-                )
+                # Full-text match, ordered by relevance
+                queryset = get_search_backend().search(queryset, search)
             
             if featured_only:
                 queryset = queryset.filter(is_featured=True)
             
             if sort:
                 queryset = queryset.order_by(sort)
-            else:
+            elif not (search and get_search_backend().ranked):
                 queryset = queryset.order_by('-is_featured', '-published_date')
         
-        # Annotate with like count
-        queryset = queryset.annotate(like_count=Count('likes'))
-        
-        return queryset.prefetch_related('categories')
+        return queryset.prefetch_related('categories', 'renditions')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = ProjectFilterForm(self.request.GET or None)
-        context['categories'] = Category.objects.filter(
-            is_active=True
-        ).annotate(
-            project_count=Count('projects')
-        )
-        context['difficulty_counts'] = {
-            level: Project.objects.filter(
-                is_published=True,
-                difficulty_level=level
-            ).count()
-            for level, _ in Project.DIFFICULTY_LEVELS
-        }
-        context['featured_projects'] = Project.objects.filter(
-            is_published=True,
-            is_featured=True
-        )[:3]
+        
+        # Sidebar counts for the current filters, computed in one query
+        facets = get_project_facets(self.object_list, self.facet_filters)
+        context['facets'] = facets
+        context['categories'] = facets['categories']
+        context['difficulty_counts'] = facets['difficulty']
+        context['featured_projects'] = get_featured_projects(3)
         return context
 
 
+@conditional_models('projects.Project', 'projects.ProjectThumbnailRendition')
+@cache_anonymous_page()
 class FeaturedProjectsView(ListView):
     """
     View for featured projects
@@ -97,11 +104,11 @@ class FeaturedProjectsView(ListView):
         return Project.objects.filter(
             is_published=True,
             is_featured=True
-        ).annotate(
-            like_count=Count('likes')
-        ).order_by('-performance_score', '-published_date')
+        ).order_by('-performance_score', '-published_date').prefetch_related('renditions')
 
 
+@conditional_models('projects.Project', 'projects.ProjectThumbnailRendition')
+@cache_anonymous_page()
 class ProjectsByDifficultyView(ListView):
     """
     View for projects filtered by difficulty level
@@ -116,9 +123,7 @@ class ProjectsByDifficultyView(ListView):
         return Project.objects.filter(
             is_published=True,
             difficulty_level=level
-        ).annotate(
-            like_count=Count('likes')
-        ).order_by('-is_featured', '-published_date')
+        ).order_by('-is_featured', '-published_date').prefetch_related('renditions')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -129,7 +134,8 @@ class ProjectsByDifficultyView(ListView):
         return context
 
 
-class ProjectDetailView(DetailView):
+@cache_anonymous_page()
+class ProjectDetailView(AdjacentNavigationMixin, DetailView):
     """
     View for displaying a single project
     """
@@ -142,63 +148,73 @@ class ProjectDetailView(DetailView):
     def get_queryset(self):
         return Project.objects.filter(is_published=True)
 
-    def get(self, request, *args, **kwargs):
-        response = super().get(request, *args, **kwargs)
-        
-        # Increment view count
-        if not request.session.get(f'viewed_project_{self.object.id}'):
-            self.object.increment_view_count()
-            request.session[f'viewed_project_{self.object.id}'] = True
-        
-        return response
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         project = self.object
         
-        # Get like count and check if user liked
-        context['like_count'] = project.likes.count()
-        session_key = self.request.session.session_key
-        if session_key:
-            context['user_liked'] = project.likes.filter(session_key=session_key).exists()
-        else:
-            context['user_liked'] = False
+        # Liked state and view recording are per visitor: see ProjectFragmentsView
+        context['like_count'] = project.like_count
         
-        # Get approved comments
-        context['comments'] = project.comments.filter(
-            is_approved=True,
-            parent=None
-        ).prefetch_related('replies')[:10]
+        # Get approved comments, with their approved replies in one query
+        approved = project.comments.filter(is_approved=True)
+        context['comments'] = attach_replies(approved.filter(parent=None)[:10], approved)
         
         # Comment form
         context['comment_form'] = ProjectCommentForm()
         
-        # Related projects (same categories)
-        category_ids = project.categories.values_list('id', flat=True)
-        related = Project.objects.filter(
-            is_published=True,
-            categories__in=category_ids
-        ).exclude(
-            id=project.id
-        ).annotate(
-            like_count=Count('likes')
-        ).distinct()[:4]
+        # Related projects, precomputed by the similarity task
+        related = list(
+            Project.objects.filter(
+                similar_to__project=project,
+                is_published=True
+            ).order_by('similar_to__rank')[:4]
+        )
+        if not related:
+            # Table not populated yet for this project: same categories
+            category_ids = project.categories.values_list('id', flat=True)
+            related = Project.objects.filter(
+                is_published=True,
+                categories__in=category_ids
+            ).exclude(
+                id=project.id
+            ).distinct()[:4]
         context['related_projects'] = related
         
-        # Next/Previous navigation
-        context['next_project'] = Project.objects.filter(
-            is_published=True,
-            published_date__gt=project.published_date
-        ).order_by('published_date').first()
-        
-        context['prev_project'] = Project.objects.filter(
-            is_published=True,
-            published_date__lt=project.published_date
-        ).order_by('-published_date').first()
-        
+        # prev_project/next_project come from AdjacentNavigationMixin
         return context
 
 
+@method_decorator(never_cache, name='dispatch')
+class ProjectFragmentsView(View):
+    """
+    Per-visitor parts of the (possibly cached) detail page, fetched by its JS.
+    Also records the page view, once per visitor (tracked in a cookie so
+    browsing never creates a session).
+    """
+
+    def get(self, request, slug):
+        project = get_object_or_404(Project, slug=slug, is_published=True)
+
+        seen = SeenFilter.from_request(request)
+        if seen.add(project):
+            project.increment_view_count(request)
+
+        # Only visitors who liked something have a session; reading the key
+        # from the cookie does not load it
+        session_key = request.session.session_key
+        liked = bool(session_key) and project.likes.filter(session_key=session_key).exists()
+
+        response = JsonResponse({
+            'success': True,
+            'liked': liked,
+            'like_count': project.like_count,
+            'view_count': project.live_view_count
+        })
+        seen.save(response)
+        return response
+
+
+@method_decorator(rate_limit('like'), name='post')
 class LikeProjectView(View):
     """
     View for liking/unliking a project (AJAX)
@@ -212,27 +228,13 @@ class LikeProjectView(View):
             request.session.save()
         session_key = request.session.session_key
         
-        # Check if already liked
-        like, created = ProjectLike.objects.get_or_create(
-            project=project,
-            session_key=session_key,
-            defaults={
-                'ip_address': self.get_client_ip(request),
-                'user_agent': request.META.get('HTTP_USER_AGENT', '')[:255]
-            }
+        # Like, or unlike if already liked
+        liked, like_count = project.toggle_like(
+            session_key,
+            ip_address=get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')[:255]
         )
-        
-        if not created:
-            # Unlike
-            like.delete()
-            liked = False
-            message = 'Project unliked'
-        else:
-            liked = True
-            message = 'Project liked'
-        
-        # Get updated count
-        like_count = project.likes.count()
+        message = 'Project liked' if liked else 'Project unliked'
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
@@ -244,14 +246,9 @@ class LikeProjectView(View):
         
         messages.success(request, message)
         return redirect('projects:detail', slug=project.slug)
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            return x_forwarded_for.split(',')[0]
-        return request.META.get('REMOTE_ADDR')
 
 
+@method_decorator(rate_limit('comment'), name='post')
 class AddCommentView(View):
     """
     View for adding comments to projects
@@ -274,7 +271,7 @@ class AddCommentView(View):
                     pass
             
             # Capture IP and user agent
-            comment.ip_address = self.get_client_ip(request)
+            comment.ip_address = get_client_ip(request)
             comment.user_agent = request.META.get('HTTP_USER_AGENT', '')[:255]
             
             comment.save()
@@ -303,12 +300,6 @@ class AddCommentView(View):
                     for error in errors:
                         messages.error(request, f"{field}: {error}")
                 return redirect('projects:detail', slug=project.slug)
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            return x_forwarded_for.split(',')[0]
-        return request.META.get('REMOTE_ADDR')
 
 
 class LoadCommentsView(View):
@@ -317,32 +308,53 @@ class LoadCommentsView(View):
     """
     
     def get(self, request, slug):
-        project = get_object_or_404(Project, slug=slug, is_published=True)
-        
+        # Cached per project and page; moderation bumps the version
+        project_id = get_target_id(Project, slug=slug, is_published=True)
+        return cached_comment_page(request, ProjectComment, project_id, lambda: self.render_page(request, project_id))
+
+    def render_page(self, request, project_id):
         # Get approved comments
-        comments = project.comments.filter(
-            is_approved=True,
-            parent=None
-        ).prefetch_related('replies')
+        approved = ProjectComment.objects.filter(project_id=project_id, is_approved=True)
+        comments = approved.filter(parent=None)
         
-        # Paginate
-        page = int(request.GET.get('page', 1))
         per_page = 10
-        start = (page - 1) * per_page
-        end = start + per_page
-        
-        comments_page = comments[start:end]
-        has_next = comments.count() > end
-        
+        next_page = next_cursor = None
+        paginator = CursorPaginator(comments, per_page, ('-created_at', '-id'))
+
+        if 'page' in request.GET:
+            # Offset pagination for old clients; one extra row tells us if
+            # there is more, and the cursor lets them switch to keyset paging
+            try:
+                page = int(request.GET.get('page', 1))
+            except ValueError:
+                page = 0
+            if page < 1:
+                return JsonResponse({'success': False, 'error': 'Invalid page'}, status=400)
+            start = (page - 1) * per_page
+            rows = list(comments.order_by(*paginator.ordering)[start:start + per_page + 1])
+            has_next = len(rows) > per_page
+            comments_page = rows[:per_page]
+            if has_next:
+                next_page = page + 1
+                next_cursor = paginator.encode_cursor(comments_page[-1], 'next')
+        else:
+            try:
+                comments_page = paginator.page(request.GET.get('cursor'))
+            except InvalidCursor:
+                return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+            has_next = comments_page.has_next()
+            next_cursor = comments_page.next_cursor
+
         # Render comments HTML
         from django.template.loader import render_to_string
         html = render_to_string('projects/comment_list_items.html', {
-            'comments': comments_page
+            'comments': attach_replies(comments_page, approved)
         })
-        
-        return JsonResponse({
+
+        return {
             'success': True,
             'html': html,
             'has_next': has_next,
-            'next_page': page + 1 if has_next else None
-        })
\ No newline at end of file
+            'next_page': next_page,
+            'next_cursor': next_cursor
+        }
\ No newline at end of file